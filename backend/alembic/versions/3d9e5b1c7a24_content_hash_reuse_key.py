@@ -0,0 +1,27 @@
+"""job_files.content_hash / job_targets.reuse_key
+
+Revision ID: 3d9e5b1c7a24
+Revises: f4d7a2c9b813
+Create Date: 2025-10-30 14:12:37.284615
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '3d9e5b1c7a24'
+down_revision = 'f4d7a2c9b813'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('job_files', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    op.create_index('ix_job_files_content_hash', 'job_files', ['content_hash'])
+    op.add_column('job_targets', sa.Column('reuse_key', sa.String(length=64), nullable=True))
+    op.create_index('ix_job_targets_reuse_key', 'job_targets', ['reuse_key'])
+
+def downgrade():
+    op.drop_index('ix_job_targets_reuse_key', table_name='job_targets')
+    op.drop_column('job_targets', 'reuse_key')
+    op.drop_index('ix_job_files_content_hash', table_name='job_files')
+    op.drop_column('job_files', 'content_hash')
@@ -0,0 +1,27 @@
+"""job_targets: colunas de lease da fila
+
+Revision ID: 4c1e9a7d2b10
+Revises: dab49256035f
+Create Date: 2025-10-20 09:12:44.102311
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '4c1e9a7d2b10'
+down_revision = 'dab49256035f'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('job_targets', sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('job_targets', sa.Column('locked_by', sa.String(length=100), nullable=True))
+    op.add_column('job_targets', sa.Column('lease_expires_at', sa.DateTime(), nullable=True))
+    op.create_index(op.f('ix_job_targets_lease_expires_at'), 'job_targets', ['lease_expires_at'], unique=False)
+
+def downgrade():
+    op.drop_index(op.f('ix_job_targets_lease_expires_at'), table_name='job_targets')
+    op.drop_column('job_targets', 'lease_expires_at')
+    op.drop_column('job_targets', 'locked_by')
+    op.drop_column('job_targets', 'attempts')
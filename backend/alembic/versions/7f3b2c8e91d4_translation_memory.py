@@ -0,0 +1,33 @@
+"""translation_memory
+
+Revision ID: 7f3b2c8e91d4
+Revises: 4c1e9a7d2b10
+Create Date: 2025-10-21 14:03:17.554120
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '7f3b2c8e91d4'
+down_revision = '4c1e9a7d2b10'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('translation_memory',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('provider', sa.String(length=20), nullable=False),
+    sa.Column('model', sa.String(length=100), nullable=False),
+    sa.Column('source_lang', sa.String(length=20), nullable=False),
+    sa.Column('target_lang', sa.String(length=20), nullable=False),
+    sa.Column('segment_hash', sa.String(length=64), nullable=False),
+    sa.Column('source_text', sa.Text(), nullable=False),
+    sa.Column('target_text', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('provider', 'model', 'source_lang', 'target_lang', 'segment_hash', name='uq_translation_memory_key')
+    )
+
+def downgrade():
+    op.drop_table('translation_memory')
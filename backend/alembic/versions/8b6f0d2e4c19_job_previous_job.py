@@ -0,0 +1,25 @@
+"""jobs.previous_job_id (retradução incremental)
+
+Revision ID: 8b6f0d2e4c19
+Revises: 3d9e5b1c7a24
+Create Date: 2025-11-03 11:26:52.907431
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '8b6f0d2e4c19'
+down_revision = '3d9e5b1c7a24'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('jobs', sa.Column('previous_job_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'fk_jobs_previous_job_id', 'jobs', 'jobs', ['previous_job_id'], ['id'], ondelete='SET NULL'
+    )
+
+def downgrade():
+    op.drop_constraint('fk_jobs_previous_job_id', 'jobs', type_='foreignkey')
+    op.drop_column('jobs', 'previous_job_id')
@@ -0,0 +1,29 @@
+"""job_targets: colunas de progresso
+
+Revision ID: b52d0e6a7c39
+Revises: 7f3b2c8e91d4
+Create Date: 2025-10-22 10:41:05.310927
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'b52d0e6a7c39'
+down_revision = '7f3b2c8e91d4'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('job_targets', sa.Column('segments_total', sa.Integer(), nullable=True))
+    op.add_column('job_targets', sa.Column('segments_done', sa.Integer(), nullable=True))
+    op.add_column('job_targets', sa.Column('chars_total', sa.Integer(), nullable=True))
+    op.add_column('job_targets', sa.Column('chars_done', sa.Integer(), nullable=True))
+    op.add_column('job_targets', sa.Column('started_at', sa.DateTime(), nullable=True))
+
+def downgrade():
+    op.drop_column('job_targets', 'started_at')
+    op.drop_column('job_targets', 'chars_done')
+    op.drop_column('job_targets', 'chars_total')
+    op.drop_column('job_targets', 'segments_done')
+    op.drop_column('job_targets', 'segments_total')
@@ -0,0 +1,33 @@
+"""jobs: índice (updated_at, id) para listagem por cursor
+
+Revision ID: c8a41f0e2d57
+Revises: b52d0e6a7c39
+Create Date: 2025-10-23 16:20:48.771203
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c8a41f0e2d57'
+down_revision = 'b52d0e6a7c39'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # linhas antigas sem updated_at ficariam fora da paginação por cursor; com
+    # NOT NULL o ORDER BY updated_at DESC, id DESC é o índice lido de trás
+    # para frente (sem NULLS LAST, que o índice ascendente não atende)
+    op.execute("UPDATE jobs SET updated_at = COALESCE(created_at, now()) WHERE updated_at IS NULL")
+    op.alter_column('jobs', 'updated_at', existing_type=sa.DateTime(), nullable=False)
+    # CONCURRENTLY não roda dentro de transação e não trava escritas em jobs
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_jobs_updated_at_id', 'jobs', ['updated_at', 'id'], unique=False,
+            postgresql_concurrently=True,
+        )
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_jobs_updated_at_id', table_name='jobs', postgresql_concurrently=True)
+    op.alter_column('jobs', 'updated_at', existing_type=sa.DateTime(), nullable=True)
@@ -0,0 +1,26 @@
+"""busca: índices pg_trgm em jobs.title e job_files.filename
+
+Revision ID: e19f6b3d4a82
+Revises: c8a41f0e2d57
+Create Date: 2025-10-24 11:05:32.418876
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'e19f6b3d4a82'
+down_revision = 'c8a41f0e2d57'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index('ix_jobs_title_trgm', 'jobs', ['title'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'})
+    op.create_index('ix_job_files_filename_trgm', 'job_files', ['filename'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'filename': 'gin_trgm_ops'})
+
+def downgrade():
+    op.drop_index('ix_job_files_filename_trgm', table_name='job_files')
+    op.drop_index('ix_jobs_title_trgm', table_name='jobs')
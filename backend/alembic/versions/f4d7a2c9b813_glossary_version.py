@@ -0,0 +1,23 @@
+"""glossaries: version/updated_at
+
+Revision ID: f4d7a2c9b813
+Revises: e19f6b3d4a82
+Create Date: 2025-10-27 09:48:10.603512
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'f4d7a2c9b813'
+down_revision = 'e19f6b3d4a82'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('glossaries', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('glossaries', sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+def downgrade():
+    op.drop_column('glossaries', 'updated_at')
+    op.drop_column('glossaries', 'version')
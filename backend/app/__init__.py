@@ -57,6 +57,16 @@ def create_app():
     app.config["SECRET_KEY"] = os.getenv("SECRET_KEY", "dev-secret")
     app.config["ACCESS_TOKEN_EXPIRES_MIN"] = int(os.getenv("ACCESS_TOKEN_EXPIRES_MIN", "120"))
 
+    # Fila de jobs / workers (ver worker.py)
+    app.config["WORKER_CONCURRENCY"] = int(os.getenv("WORKER_CONCURRENCY", "2"))
+    app.config["WORKER_POLL_SECONDS"] = float(os.getenv("WORKER_POLL_SECONDS", "2"))
+    app.config["JOB_LEASE_SECONDS"] = int(os.getenv("JOB_LEASE_SECONDS", "300"))
+    app.config["JOB_MAX_ATTEMPTS"] = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    # tamanho máximo do corpo da requisição (uploads recusados com 413 antes de gravar)
+    app.config["MAX_CONTENT_LENGTH"] = int(os.getenv("MAX_UPLOAD_MB", "100")) * 1024 * 1024
+    # orçamento de tempo da tradução de um job, em segundos (0 = sem limite)
+    app.config["JOB_TIME_BUDGET"] = int(os.getenv("JOB_TIME_BUDGET", "0"))
+
     # 3) i18n (Babel 4.x)
     app.config.setdefault("BABEL_DEFAULT_LOCALE", "pt")
     app.config.setdefault("BABEL_DEFAULT_TIMEZONE", "UTC")
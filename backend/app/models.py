@@ -22,6 +22,9 @@ class Glossary(db.Model):
     locale_dst = db.Column(db.String(10), nullable=False)  # ex: en-US
     created_by = db.Column(db.Integer, db.ForeignKey("users.id"))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # incrementado a cada import/edição de termos (invalida o cache de glossários compilados)
+    version    = db.Column(db.Integer, default=1, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     terms = db.relationship("GlossaryTerm", cascade="all, delete-orphan", backref="glossary")
 
@@ -48,12 +51,24 @@ class Job(db.Model):
     # CSV dos destinos selecionados (compatibilidade com UI/listagem)
     target_lang = db.Column(db.Text, nullable=True)
     glossary_id = db.Column(db.Integer, db.ForeignKey("glossaries.id"))
+    # atualização de um documento revisado: reaproveita as traduções deste job
+    previous_job_id = db.Column(db.Integer, db.ForeignKey("jobs.id", ondelete="SET NULL"))
     created_by  = db.Column(db.Integer, db.ForeignKey("users.id"))
     created_at  = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at  = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # NOT NULL: a listagem por cursor anda pelo índice (updated_at, id) de trás para frente
+    updated_at  = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
-    files   = db.relationship("JobFile",   cascade="all, delete-orphan", backref="job")
-    targets = db.relationship("JobTarget", cascade="all, delete-orphan", backref="job")
+    files   = db.relationship("JobFile",   cascade="all, delete-orphan", backref="job", order_by="JobFile.id")
+    targets = db.relationship("JobTarget", cascade="all, delete-orphan", backref="job", order_by="JobTarget.id")
+
+    __table_args__ = (
+        # listagem: ORDER BY updated_at DESC, id DESC + paginação por cursor
+        db.Index("ix_jobs_updated_at_id", "updated_at", "id"),
+        # busca ILIKE '%q%' (pg_trgm)
+        db.Index(
+            "ix_jobs_title_trgm", "title", postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"}
+        ),
+    )
 
 class JobFile(db.Model):
     __tablename__ = "job_files"
@@ -61,11 +76,23 @@ class JobFile(db.Model):
     job_id     = db.Column(db.Integer, db.ForeignKey("jobs.id"), index=True, nullable=False)
     filename   = db.Column(db.String(255), nullable=False)
     input_path = db.Column(db.String(500), nullable=False)
+    # sha256 do arquivo enviado (o blob em uploads/ é compartilhado entre jobs)
+    content_hash = db.Column(db.String(64), index=True)
     output_path= db.Column(db.String(500))
     error      = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    # busca ILIKE '%q%' (pg_trgm)
+    __table_args__ = (
+        db.Index(
+            "ix_job_files_filename_trgm",
+            "filename",
+            postgresql_using="gin",
+            postgresql_ops={"filename": "gin_trgm_ops"},
+        ),
+    )
+
 class JobTarget(db.Model):
     __tablename__ = "job_targets"
     id          = db.Column(db.Integer, primary_key=True)
@@ -77,6 +104,18 @@ class JobTarget(db.Model):
     )
     output_path = db.Column(db.String(500))
     error       = db.Column(db.Text)
+    # saída reaproveitável por jobs idênticos (ver utils/content_store.py)
+    reuse_key   = db.Column(db.String(64), index=True)
+    # lease da fila (worker que pegou o destino + validade; vencido => reprocessa)
+    attempts         = db.Column(db.Integer, default=0, nullable=False)
+    locked_by        = db.Column(db.String(100))
+    lease_expires_at = db.Column(db.DateTime, index=True)
+    # progresso (atualizado pelo pipeline; ver utils/progress.py)
+    segments_total = db.Column(db.Integer)
+    segments_done  = db.Column(db.Integer)
+    chars_total    = db.Column(db.Integer)
+    chars_done     = db.Column(db.Integer)
+    started_at     = db.Column(db.DateTime)
     created_at  = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at  = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -88,3 +127,23 @@ class Metric(db.Model):
     key       = db.Column(db.String(100), nullable=False)
     value     = db.Column(db.String(200), nullable=False)
     created_at= db.Column(db.DateTime, default=datetime.utcnow)
+
+
+# ---------- Translation memory ----------
+class TranslationMemoryEntry(db.Model):
+    __tablename__ = "translation_memory"
+    id           = db.Column(db.Integer, primary_key=True)
+    provider     = db.Column(db.String(20), nullable=False)
+    model        = db.Column(db.String(100), nullable=False, default="")
+    source_lang  = db.Column(db.String(20), nullable=False)
+    target_lang  = db.Column(db.String(20), nullable=False)
+    segment_hash = db.Column(db.String(64), nullable=False)  # sha256 do segmento normalizado
+    source_text  = db.Column(db.Text, nullable=False)
+    target_text  = db.Column(db.Text, nullable=False)
+    created_at   = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "provider", "model", "source_lang", "target_lang", "segment_hash", name="uq_translation_memory_key"
+        ),
+    )
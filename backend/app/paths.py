@@ -0,0 +1,12 @@
+# backend/app/paths.py
+import os
+from pathlib import Path
+
+# Diretórios base (pasta backend/) — compartilhados entre API e worker
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+# DATA_DIR: raiz de uploads/ e outputs/ (ex.: um volume montado na API e no worker)
+DATA_DIR = Path(os.getenv("DATA_DIR") or PROJECT_ROOT).resolve()
+UPLOAD_DIR = DATA_DIR / "uploads"
+OUTPUT_DIR = DATA_DIR / "outputs"
+UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
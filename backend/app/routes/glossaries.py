@@ -1,51 +1,152 @@
 from flask import Blueprint, request, jsonify
+from sqlalchemy import func
 from ..auth import token_required
-import csv
-from io import StringIO
+from app.extensions import db
+from app.models import Glossary, GlossaryTerm, Job
+from app.utils.glossary_cache import bump_version, invalidate
+from app.utils.glossary_import import CsvImportError, import_terms_csv, term_error
 
 
 bp = Blueprint("glossaries", __name__)
 
 
-# memória (trocar por DB)
-GLOSSARIES = {
-    1: {
-        "name": "pt-BR→en-US",
-        "locale_src": "pt-BR",
-        "locale_dst": "en-US",
-        "terms": {"juros": "interest", "recurso": "appeal", "petição": "pleading"},
+def _glossary_to_dict(g: Glossary, terms) -> dict:
+    return {
+        "id": g.id,
+        "name": g.name,
+        "locale_src": g.locale_src,
+        "locale_dst": g.locale_dst,
+        "version": g.version,
+        "terms": terms,
     }
-}
 
 
 @bp.route("/glossaries", methods=["GET"])
 @token_required
 def list_glossaries():
-    return jsonify([{"id": k, **v, "terms": len(v["terms"]) } for k, v in GLOSSARIES.items()])
+    counts = (
+        db.session.query(Glossary, func.count(GlossaryTerm.id))
+        .outerjoin(GlossaryTerm, GlossaryTerm.glossary_id == Glossary.id)
+        .group_by(Glossary.id)
+        .order_by(Glossary.id.asc())
+        .all()
+    )
+    return jsonify([_glossary_to_dict(g, n) for g, n in counts])
+
+
+@bp.route("/glossaries", methods=["POST"])
+@token_required
+def create_glossary():
+    data = request.get_json(silent=True) or request.form or {}
+    name = (data.get("name") or "").strip()
+    locale_src = (data.get("locale_src") or "").strip()
+    locale_dst = (data.get("locale_dst") or "").strip()
+    if not name or not locale_src or not locale_dst:
+        return jsonify({"error": "name, locale_src and locale_dst are required"}), 400
+    g = Glossary(
+        name=name,
+        locale_src=locale_src,
+        locale_dst=locale_dst,
+        created_by=getattr(request, "user_id", None),
+    )
+    db.session.add(g)
+    db.session.commit()
+    return jsonify(_glossary_to_dict(g, 0)), 201
 
 
 @bp.route("/glossaries/<int:g_id>", methods=["GET"])
 @token_required
 def get_glossary(g_id):
-    g = GLOSSARIES.get(g_id)
+    g = db.session.get(Glossary, g_id)
+    if not g:
+        return jsonify({"error": "not found"}), 404
+    rows = (
+        db.session.query(GlossaryTerm.src, GlossaryTerm.dst)
+        .filter(GlossaryTerm.glossary_id == g_id)
+        .order_by(GlossaryTerm.src.asc())
+        .all()
+    )
+    return jsonify(_glossary_to_dict(g, {src: dst for src, dst in rows}))
+
+
+@bp.route("/glossaries/<int:g_id>", methods=["DELETE"])
+@token_required
+def delete_glossary(g_id):
+    g = db.session.get(Glossary, g_id)
+    if not g:
+        return jsonify({"error": "not found"}), 404
+    # jobs antigos mantêm o histórico, só perdem a referência
+    db.session.query(Job).filter(Job.glossary_id == g_id).update(
+        {Job.glossary_id: None}, synchronize_session=False
+    )
+    db.session.delete(g)
+    db.session.commit()
+    invalidate(g_id)
+    return jsonify({"ok": True})
+
+
+@bp.route("/glossaries/<int:g_id>/terms", methods=["PATCH"])
+@token_required
+def edit_terms(g_id):
+    """Edita termos: {"terms": {"src": "dst", "outro": null}} (null remove)."""
+    g = db.session.get(Glossary, g_id)
     if not g:
         return jsonify({"error": "not found"}), 404
-    return jsonify({"id": g_id, **g})
+    terms = (request.get_json(silent=True) or {}).get("terms") or {}
+    if not isinstance(terms, dict):
+        return jsonify({"error": "terms must be an object"}), 400
+
+    # normaliza antes da busca: " termo" e "termo" são a mesma linha (uq_glossary_src);
+    # dst vazio/null remove, o resto passa pelas mesmas regras do import
+    cleaned: dict[str, str | None] = {}
+    for src, dst in terms.items():
+        if dst is not None and not isinstance(dst, str):
+            return jsonify({"error": f"term {src[:50]!r}: dst must be a string or null"}), 400
+        src, dst = src.strip(), (dst or "").strip() or None
+        if not src:
+            continue
+        error = term_error(src, dst or src)  # remoção: só o src precisa ser válido
+        if error:
+            return jsonify({"error": f"term {src[:50]!r}: {error}"}), 400
+        cleaned[src] = dst
+
+    existing = {
+        t.src: t
+        for t in db.session.query(GlossaryTerm).filter(
+            GlossaryTerm.glossary_id == g_id, GlossaryTerm.src.in_(list(cleaned))
+        )
+    }
+    for src, dst in cleaned.items():
+        row = existing.get(src)
+        if dst is None:
+            if row:
+                db.session.delete(row)
+        elif row:
+            row.dst = dst
+        else:
+            db.session.add(GlossaryTerm(glossary_id=g_id, src=src, dst=dst))
+    bump_version(g)
+    db.session.commit()
+    return jsonify({"ok": True, "version": g.version})
 
 
 @bp.route("/glossaries/<int:g_id>/import", methods=["POST"])
 @token_required
 def import_csv(g_id):
-    if g_id not in GLOSSARIES:
+    """Import em streaming (lotes com upsert); devolve inserted/updated/rejected."""
+    g = db.session.get(Glossary, g_id)
+    if not g:
         return jsonify({"error": "not found"}), 404
     file = request.files.get("file")
     if not file:
         return jsonify({"error": "csv required"}), 400
-    data = file.read().decode("utf-8")
-    reader = csv.DictReader(StringIO(data))
-    for row in reader:
-        src = (row.get("src") or "").strip()
-        dst = (row.get("dst") or "").strip()
-        if src and dst:
-            GLOSSARIES[g_id]["terms"][src] = dst
-    return jsonify({"ok": True, "terms": len(GLOSSARIES[g_id]["terms"])})
\ No newline at end of file
+    try:
+        stats = import_terms_csv(g_id, file.stream)
+    except CsvImportError as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 400
+    bump_version(g)
+    db.session.commit()
+
+    total = db.session.query(func.count(GlossaryTerm.id)).filter(GlossaryTerm.glossary_id == g_id).scalar()
+    return jsonify({"ok": True, **stats, "terms": total, "version": g.version})
@@ -1,19 +1,30 @@
 # backend/app/routes/jobs.py
 from __future__ import annotations
 
+import base64
 import os
 from datetime import datetime
-from pathlib import Path
-from zipfile import ZipFile, ZIP_DEFLATED
-from io import BytesIO
 
-from flask import Blueprint, request, jsonify, send_file
+import jwt
+from flask import Blueprint, Response, current_app, request, jsonify, send_file, stream_with_context
+from werkzeug.exceptions import HTTPException
 from werkzeug.utils import secure_filename
-from sqlalchemy import or_, cast, String, asc
+from sqlalchemy import select, tuple_, union
+from sqlalchemy.orm import selectinload
 
 from app.extensions import db
+from app.paths import OUTPUT_DIR
 from app.utils.auth_middleware import token_required
-from app.utils.docx_pipeline import run_docx_to_docx
+from app.utils.content_store import reuse_key, target_glossary_key
+from app.utils.glossary_cache import get_matcher
+from app.utils.segment_reuse import pairs_path
+from app.utils.storage import STORAGE_URL_TTL, get_storage, verify_signed
+from app.utils.formats import is_supported, mimetype_for, supported_extensions
+from app.utils.job_queue import refresh_job_status
+from app.utils.progress import TooManyListeners, job_snapshot, progress_dict, stream_job_events
+from app.utils.translator import provider_key
+from app.utils.uploads import discard_uploads, parse_upload
+from app.utils.zip_stream import BUNDLE_DIR, DOWNLOAD_BUNDLE_CACHE, bundle_path, iter_cached, iter_zip
 
 # MODELOS
 from app.models import (
@@ -21,18 +32,12 @@ from app.models import (
     JobFile,
     Metric,
     JobTarget,
-    GlossaryTerm,  # se não existir, remova o bloco do glossário mais abaixo
 )
 
 #bp = Blueprint("jobs", __name__, url_prefix="/jobs")
 bp = Blueprint("jobs", __name__)
-
-# Diretórios base (pasta backend/)
-PROJECT_ROOT = Path(__file__).resolve().parents[2]
-UPLOAD_DIR = PROJECT_ROOT / "uploads"
-OUTPUT_DIR = PROJECT_ROOT / "outputs"
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+# uploads recusados/não usados não deixam temporários em uploads/
+bp.teardown_request(discard_uploads)
 
 
 # ----------------- Helpers -----------------
@@ -55,26 +60,51 @@ def target_to_dict(t: JobTarget) -> dict:
         "file_id": getattr(t, "file_id", None),
         "output_path": getattr(t, "output_path", None),
         "error": getattr(t, "error", None),
+        "progress": progress_dict(t),
         "created_at": t.created_at.isoformat() if getattr(t, "created_at", None) else None,
         "updated_at": t.updated_at.isoformat() if getattr(t, "updated_at", None) else None,
     }
 
 
+_MAX_INT = 2**31 - 1  # maior id que cabe na coluna integer do Postgres
+
+
+def _form_id(form, name: str) -> int | None:
+    """Id opcional de um campo do formulário; ValueError se não for um inteiro válido."""
+    raw = (form.get(name) or "").strip()
+    if not raw:
+        return None
+    if not (raw.isascii() and raw.isdigit()) or not 0 < int(raw) <= _MAX_INT:
+        raise ValueError(f"{name} must be a positive integer")
+    return int(raw)
+
+
+def _escape_like(v: str) -> str:
+    return v.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _encode_cursor(j: Job) -> str:
+    raw = f"{j.updated_at.isoformat()}|{j.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(v: str) -> tuple[datetime, int] | None:
+    try:
+        raw = base64.urlsafe_b64decode(v + "=" * (-len(v) % 4)).decode()
+        ts, job_id = raw.split("|", 1)
+        return datetime.fromisoformat(ts), int(job_id)
+    except Exception:
+        return None
+
+
 def _job_to_item(j: Job) -> dict:
-    """Serializa um Job para a lista (usa o primeiro arquivo como título)."""
-    jf = (
-        db.session.query(JobFile)
-        .filter(JobFile.job_id == j.id)
-        .order_by(JobFile.id.asc())
-        .first()
-    )
-    targets = (
-        db.session.query(JobTarget)
-        .filter(JobTarget.job_id == j.id)
-        .order_by(JobTarget.id.asc())
-        .all()
-    )
-    targets_ser = [target_to_dict(t) for t in targets]
+    """
+    Serializa um Job para a lista (usa o primeiro arquivo como título).
+    Usa os relacionamentos `files`/`targets`: carregue-os com selectinload
+    ao serializar vários jobs, para não gerar N+1 consultas.
+    """
+    jf = j.files[0] if j.files else None
+    targets_ser = [target_to_dict(t) for t in j.targets]
 
     return {
         "id": j.id,
@@ -96,33 +126,63 @@ def _job_to_item(j: Job) -> dict:
 @bp.get("/", strict_slashes=False)
 @token_required
 def list_jobs():
-    """Lista paginada com busca por ID (parcial) e filename."""
+    """
+    Lista paginada com busca por título/filename (ILIKE servido pelos
+    índices trigram: `id IN (títulos UNION arquivos)`, sem duplicar jobs
+    com vários arquivos) e, se q for numérico, também pelo ID exato (PK) —
+    "2024" acha o job 2024 e o arquivo "relatorio_2024.docx". Com menos de 3
+    caracteres o trigram não ajuda: o mesmo ILIKE roda sem índice.
+
+    Paginação por página (?page=, com total) ou por cursor (?cursor=, keyset
+    em (updated_at, id) — custo constante em qualquer profundidade; devolve
+    next_cursor e não calcula total). Arquivos e destinos vêm em 2 consultas
+    por página (selectinload), independente do tamanho da página.
+    """
     q = (request.args.get("q") or "").strip()
     page = _page_int(request.args.get("page"), 1)
     page_size = min(max(_page_int(request.args.get("page_size"), 10), 1), 100)
+    cursor_raw = (request.args.get("cursor") or "").strip()
 
     base = db.session.query(Job)
 
     if q:
-        like = f"%{q}%"
-        base = (
-            base.join(JobFile, JobFile.job_id == Job.id)
-            .filter(or_(
-                cast(Job.id, String).ilike(like),
-                JobFile.filename.ilike(like),
-            ))
-        )
+        like = f"%{_escape_like(q)}%"
+        branches = [
+            select(Job.id).where(Job.title.ilike(like, escape="\\")),
+            select(JobFile.job_id).where(JobFile.filename.ilike(like, escape="\\")),
+        ]
+        if q.isascii() and q.isdigit() and int(q) <= _MAX_INT:
+            # ramo próprio pela PK (num OR com os ILIKE o planner não combina os índices)
+            branches.append(select(Job.id).where(Job.id == int(q)))
+        base = base.filter(Job.id.in_(union(*branches)))
+
+    ordered = base.options(selectinload(Job.files), selectinload(Job.targets)).order_by(
+        Job.updated_at.desc(), Job.id.desc()
+    )
+
+    if cursor_raw:
+        cursor = _decode_cursor(cursor_raw)
+        if cursor is None:
+            return jsonify({"error": "invalid cursor"}), 400
+        rows = ordered.filter(tuple_(Job.updated_at, Job.id) < cursor).limit(page_size + 1).all()
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        next_cursor = _encode_cursor(rows[-1]) if has_more else None
+        items = [_job_to_item(j) for j in rows]
+        return jsonify({"items": items, "next_cursor": next_cursor, "page_size": page_size})
 
     total = base.count()
-    rows = (
-        base.order_by(Job.updated_at.desc().nullslast(), Job.id.desc())
-            .offset((page - 1) * page_size)
-            .limit(page_size)
-            .all()
-    )
+    rows = ordered.offset((page - 1) * page_size).limit(page_size).all()
 
     items = [_job_to_item(j) for j in rows]
-    return jsonify({"items": items, "total": total, "page": page, "page_size": page_size})
+    next_cursor = _encode_cursor(rows[-1]) if rows else None
+    return jsonify({
+        "items": items,
+        "total": total,
+        "page": page,
+        "page_size": page_size,
+        "next_cursor": next_cursor,
+    })
 
 
 # DETALHE: GET /api/jobs/<id>
@@ -158,15 +218,21 @@ def get_job(job_id: int):
 @bp.post("/")
 @token_required
 def create_job():
-    """Cria um job com 1 arquivo e N destinos (target_langs)."""
-    f = request.files.get("file")
+    """Cria um job com 1 arquivo e N destinos (target_langs) e o enfileira."""
+    # corpo lido em streaming: o arquivo vai direto para o armazenamento (ver utils/uploads.py)
+    try:
+        form, files = parse_upload(request)
+    except HTTPException as e:
+        return jsonify({"error": e.description}), e.code
+
+    f = files.get("file")
     if not f:
         return jsonify({"error": "file is required"}), 400
 
-    source_lang = (request.form.get("source_lang") or "pt-BR").strip()
+    source_lang = (form.get("source_lang") or "pt-BR").strip()
 
     # target_langs pode vir como múltiplos campos; cai para target_lang (singular) se preciso
-    raw_targets = request.form.getlist("target_langs") or []
+    raw_targets = form.getlist("target_langs") or []
     # normaliza, deduplica e BLOQUEIA De=Para
     uniq_targets = []
     seen = set()
@@ -181,78 +247,95 @@ def create_job():
     if not uniq_targets:
         return jsonify({"error": "Nenhum destino válido. Selecione idiomas diferentes de 'De'."}), 400
 
-    glossary_id_raw = request.form.get("glossary_id")
-    glossary_id = int(glossary_id_raw) if glossary_id_raw else None
+    try:
+        glossary_id = _form_id(form, "glossary_id")
+        previous_job_id = _form_id(form, "previous_job_id")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     user_id = getattr(request, "user_id", None)
 
+    # "atualizar a partir de um job anterior": só os segmentos alterados vão ao provedor
+    if previous_job_id is not None:
+        prev_job = db.session.get(Job, previous_job_id)
+        # job de outro usuário: mesma resposta de um id inexistente
+        if not prev_job or prev_job.created_by != user_id:
+            return jsonify({"error": "previous job not found"}), 404
+        # "mixed": os destinos concluídos servem, os que falharam são traduzidos do zero
+        if prev_job.status not in ("done", "mixed"):
+            return jsonify({"error": "O job anterior não tem traduções concluídas."}), 409
+        if prev_job.source_lang != source_lang:
+            return jsonify({"error": "O job anterior tem outro idioma de origem."}), 400
+
     filename = secure_filename(f.filename or "input.docx")
+    if not is_supported(filename):
+        return jsonify({"error": f"Formato não suportado. Use: {', '.join(supported_extensions())}"}), 400
 
     job = Job(
-        status="processing",
+        status="queued",
         source_lang=source_lang,
         target_lang=",".join(uniq_targets),  # compat (CSV)
         glossary_id=glossary_id,
+        previous_job_id=previous_job_id,
         created_by=user_id,
         title=filename,  # se sua tabela jobs tiver 'title'
     )
     db.session.add(job)
     db.session.flush()  # garante job.id
 
-    in_path = str(UPLOAD_DIR / f"{job.id}_{filename}")
-    f.save(in_path)
+    # blob endereçado por conteúdo: reenviar o mesmo arquivo não duplica disco
+    content_hash, in_path = f.stream.commit()
+    storage = get_storage()
+    in_key = storage.publish(in_path)  # backend remoto: sobe para o bucket (workers em outras máquinas)
 
-    db.session.add(JobFile(job_id=job.id, filename=filename, input_path=in_path))
+    db.session.add(JobFile(job_id=job.id, filename=filename, input_path=in_key, content_hash=content_hash))
     db.session.flush()
 
-    # Cria um JobTarget por idioma
+    # Mesma combinação (arquivo, idiomas, glossário/versão, provedor/modelo) já traduzida: reaproveita a saída
+    # (a chave é calculada como o worker a grava: glossário só nos destinos do par dele)
+    glossary = get_matcher(glossary_id)
+    provider, model = provider_key()
+    keys = {
+        lang: reuse_key(
+            content_hash, source_lang, lang, target_glossary_key(glossary, source_lang, lang), provider, model
+        )
+        for lang in uniq_targets
+    }
+    previous = {}
+    for prev in (
+        db.session.query(JobTarget)
+        .filter(JobTarget.reuse_key.in_(list(keys.values())), JobTarget.status == "done")
+        .order_by(JobTarget.id.desc())
+    ):
+        if prev.reuse_key not in previous and prev.output_path and storage.exists(prev.output_path):
+            previous[prev.reuse_key] = prev
+
+    # Cria um JobTarget por idioma; o processamento fica a cargo dos workers (worker.py)
     targets: list[JobTarget] = []
+    reused = 0
     for lang in uniq_targets:
-        jt = JobTarget(job_id=job.id, target_lang=lang, status="processing")
+        prev = previous.get(keys[lang])
+        jt = JobTarget(job_id=job.id, target_lang=lang, status="queued")
+        if prev is not None:
+            out_path = str(OUTPUT_DIR / f"{job.id}_{lang}_{filename}")
+            try:
+                # hard link no disco local, cópia no próprio bucket no S3
+                out_key = storage.copy(prev.output_path, out_path)
+                if storage.exists(pairs_path(prev.output_path)):
+                    storage.copy(pairs_path(prev.output_path), pairs_path(out_path))
+            except Exception:
+                prev = None  # saída anterior sumiu no meio do caminho: traduz de novo
+            else:
+                jt.status = "done"
+                jt.output_path = out_key
+                jt.reuse_key = prev.reuse_key
+                reused += 1
         db.session.add(jt)
         targets.append(jt)
 
-    db.session.commit()
-
-    # ---- Carrega glossário (se houver) ----
-    glossary = {}
-    if glossary_id:
-        try:
-            rows = (
-                db.session.query(GlossaryTerm.src, GlossaryTerm.dst)
-                .filter(GlossaryTerm.glossary_id == glossary_id)
-                .all()
-            )
-            glossary = {src: dst for src, dst in rows}
-        except Exception:
-            glossary = {}
-
-    # ---- Processamento sequencial (demo) ----
-    errors = []
-    for jt in targets:
-        try:
-            out_path = str(OUTPUT_DIR / f"{job.id}_{jt.target_lang}_{filename}")
-            metrics = run_docx_to_docx(
-                in_path=in_path,
-                out_path=out_path,
-                glossary=glossary,
-                source_lang=source_lang,
-                target_lang=jt.target_lang,
-            )
-            jt.output_path = out_path
-            jt.status = "done"
-
-            # métricas agregadas ao job (se quiser por destino, adicione job_target_id no modelo Metric)
-            for k, v in (metrics or {}).items():
-                db.session.add(Metric(job_id=job.id, key=str(k), value=str(v)))
-        except Exception as e:
-            jt.error = str(e)
-            jt.status = "failed"
-            errors.append(jt.target_lang)
-
-    # Status agregado do job
-    statuses = {t.status for t in targets}
-    job.status = "done" if statuses == {"done"} else ("failed" if statuses == {"failed"} else "mixed")
-    job.updated_at = datetime.utcnow()
+    if reused:
+        db.session.add(Metric(job_id=job.id, key="outputs_reused", value=str(reused)))
+        db.session.flush()
+        refresh_job_status(job.id)
 
     db.session.commit()
 
@@ -262,9 +345,11 @@ def create_job():
         "status": job.status,
         "source_lang": source_lang,
         "target_langs": uniq_targets,
+        "previous_job_id": previous_job_id,
         "targets": [target_to_dict(t) for t in targets],
-        "errors": errors,
-    }), 201
+        "reused": reused,
+        "errors": [],
+    }), 202
 
 
 # LISTAR TARGETS: GET /api/jobs/<id>/targets
@@ -302,7 +387,73 @@ def list_job_targets(job_id: int):
     return jsonify({"job_id": job_id, "status": agg, "targets": ser})
 
 
-# DOWNLOAD: GET /api/jobs/<id>/download[?lang=xx-YY]
+# EVENTOS (SSE): GET /api/jobs/<id>/events
+@bp.get("/<int:job_id>/events")
+@token_required
+def job_events(job_id: int):
+    """
+    Server-Sent Events com o progresso do job: um evento 'job' com o snapshot
+    inicial, eventos 'progress' por destino (segmentos/caracteres/ETA) e um
+    'job' final quando todos os destinos terminam. Substitui o polling.
+    """
+    if not db.session.get(Job, job_id):
+        return jsonify({"error": "not found"}), 404
+    engine = db.engine
+    db.session.close()  # não segura conexão da sessão durante o stream
+
+    def _snapshot():
+        try:
+            return job_snapshot(db.session, job_id)
+        finally:
+            db.session.close()
+
+    try:
+        events = stream_job_events(engine, job_id, _snapshot)
+    except TooManyListeners:
+        # o frontend cai para o polling de /status
+        return jsonify({"error": "too many event streams"}), 503
+    except ConnectionError:
+        current_app.logger.warning("eventos do job %s indisponíveis (conexão LISTEN)", job_id, exc_info=True)
+        return jsonify({"error": "event stream unavailable"}), 503
+
+    resp = Response(
+        stream_with_context(events),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    resp.call_on_close(events.close)  # libera a inscrição mesmo se o stream nem começar
+    return resp
+
+
+def _serve(storage, key: str, download_name: str, mimetype: str):
+    """Entrega pelo armazenamento; com ?link=1 devolve só uma URL assinada (JSON)."""
+    if request.args.get("link") == "1":
+        return jsonify({
+            "url": storage.signed_url(key, download_name, mimetype),
+            "filename": download_name,
+            "expires_in": STORAGE_URL_TTL,
+        })
+    return storage.send(key, download_name, mimetype)
+
+
+def _bundle(storage, job_id: int, keys: list[str]) -> str:
+    """Chave do .zip dos destinos no armazenamento; gera e publica na primeira vez."""
+    path = bundle_path(job_id, (f"{k}\x1f{storage.fingerprint(k)}" for k in keys))
+    bundle_key = storage.key_for(str(path))
+    if storage.exists(bundle_key):
+        return bundle_key
+    local = [storage.fetch(k) for k in keys]
+    try:
+        for _ in iter_cached(iter_zip((p, os.path.basename(k)) for p, k in zip(local, keys) if p), path):
+            pass
+    finally:
+        for p in local:
+            if p:
+                storage.release(p)
+    return storage.publish(str(path))
+
+
+# DOWNLOAD: GET /api/jobs/<id>/download[?lang=xx-YY][&link=1]
 @bp.get("/<int:job_id>/download")
 @token_required
 def download(job_id: int):
@@ -312,11 +463,16 @@ def download(job_id: int):
       - Sem lang:
           * Se houver 1 destino concluído => baixa o arquivo desse destino
           * Se houver >1 destinos concluídos => baixa .zip com todos
+      - Com ?link=1: em vez do arquivo, {"url": ...} assinada e com validade,
+        que o navegador baixa direto (proxy/bucket, sem passar pela API).
+        Sem proxy, o link do .zip leva ao mesmo streaming do download direto
+        (e ao cache de DOWNLOAD_BUNDLE_CACHE, se ligado).
     """
     job = db.session.get(Job, job_id)
     if not job:
         return jsonify({"error": "not found"}), 404
 
+    storage = get_storage()
     lang = (request.args.get("lang") or "").strip()
 
     if lang:
@@ -325,16 +481,11 @@ def download(job_id: int):
             .filter_by(job_id=job_id, target_lang=lang)
             .first()
         )
-        if not jt or jt.status != "done" or not jt.output_path or not os.path.exists(jt.output_path):
+        if not jt or jt.status != "done" or not jt.output_path or not storage.exists(jt.output_path):
             return jsonify({"error": "not ready"}), 400
 
-        return send_file(
-            jt.output_path,
-            as_attachment=True,
-            download_name=os.path.basename(jt.output_path),
-            mimetype="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-            max_age=0,
-        )
+        name = os.path.basename(jt.output_path)
+        return _serve(storage, jt.output_path, name, mimetype_for(name))
 
     # Sem lang: agrega todos os destinos concluídos
     targets = (
@@ -343,38 +494,79 @@ def download(job_id: int):
         .order_by(JobTarget.id.asc())
         .all()
     )
-    done_targets = [t for t in targets if t.status == "done" and t.output_path and os.path.exists(t.output_path)]
+    done_targets = [t for t in targets if t.status == "done" and t.output_path and storage.exists(t.output_path)]
 
     if not done_targets:
         return jsonify({"error": "not ready"}), 400
 
     if len(done_targets) == 1:
         t = done_targets[0]
+        name = os.path.basename(t.output_path)
+        return _serve(storage, t.output_path, name, mimetype_for(name))
+
+    download_name = f"job_{job_id}_outputs.zip"
+    keys = [t.output_path for t in done_targets]
+    if storage.offload:
+        # o .zip também sai pelo proxy/bucket: gerado uma vez e guardado no armazenamento
+        return _serve(storage, _bundle(storage, job_id, keys), download_name, "application/zip")
+    if request.args.get("link") == "1":
+        # sem proxy o link assinado leva ao mesmo zip em streaming (ver signed_download)
+        return jsonify({
+            "url": storage.signed_url({"job": job_id, "keys": keys}, download_name, "application/zip"),
+            "filename": download_name,
+            "expires_in": STORAGE_URL_TTL,
+        })
+    return _stream_zip(storage, job_id, keys, download_name)
+
+
+def _stream_zip(storage, job_id: int, keys: list[str], download_name: str):
+    """Zip de vários destinos gerado em streaming (memória constante, ver utils/zip_stream.py)."""
+    cached = bundle_path(job_id, (f"{k}\x1f{storage.fingerprint(k)}" for k in keys)) if DOWNLOAD_BUNDLE_CACHE else None
+    if cached is not None and cached.exists():
         return send_file(
-            t.output_path,
+            cached,
             as_attachment=True,
-            download_name=os.path.basename(t.output_path),
-            mimetype="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+            download_name=download_name,
+            mimetype="application/zip",
             max_age=0,
         )
 
-    # zip múltiplos
-    mem = BytesIO()
-    with ZipFile(mem, "w", ZIP_DEFLATED) as z:
-        for t in done_targets:
-            arcname = os.path.basename(t.output_path)  # ex: 5_fr-FR_sample_pt.docx
-            z.write(t.output_path, arcname=arcname)
-    mem.seek(0)
-
-    return send_file(
-        mem,
-        as_attachment=True,
-        download_name=f"job_{job_id}_outputs.zip",
+    # ex: 5_fr-FR_sample_pt.docx
+    chunks = iter_zip((k, os.path.basename(k)) for k in keys)
+    if cached is not None:
+        chunks = iter_cached(chunks, cached)
+    return Response(
+        chunks,
         mimetype="application/zip",
-        max_age=0,
+        headers={
+            "Content-Disposition": f'attachment; filename="{download_name}"',
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
     )
 
 
+# DOWNLOAD ASSINADO: GET /api/jobs/files/<token> — link de ?link=1 no backend local (sem Authorization)
+@bp.get("/files/<token>")
+def signed_download(token: str):
+    storage = get_storage()
+    if storage.name != "local":
+        return jsonify({"error": "not found"}), 404
+    try:
+        key, name, mimetype = verify_signed(token)
+    except jwt.ExpiredSignatureError:
+        return jsonify({"error": "link expired"}), 410
+    except jwt.InvalidTokenError:
+        return jsonify({"error": "invalid link"}), 403
+    if isinstance(key, dict):  # zip dos destinos de um job (download sem proxy)
+        if not all(storage.exists(k) for k in key["keys"]):
+            return jsonify({"error": "not found"}), 404
+        return _stream_zip(storage, key["job"], key["keys"], name)
+    if not storage.exists(key):
+        return jsonify({"error": "not found"}), 404
+    return storage.send(key, name, mimetype)
+
+
 # DELETE: /api/jobs/<id>  — apaga registros e arquivos do disco (best-effort)
 @bp.delete("/<int:job_id>")
 @token_required
@@ -383,34 +575,52 @@ def delete_job(job_id: int):
     if not job:
         return jsonify({"error": "not found"}), 404
 
-    # Coleta caminhos de arquivos para tentar remover do disco depois do commit
+    # Coleta chaves de arquivos para tentar remover do armazenamento depois do commit
     file_paths = []
     for jf in db.session.query(JobFile).filter_by(job_id=job_id).all():
-        if getattr(jf, "input_path", None):
+        if not getattr(jf, "input_path", None):
+            continue
+        # o blob do upload é compartilhado com outros jobs do mesmo conteúdo
+        shared = (
+            db.session.query(JobFile.id)
+            .filter(JobFile.input_path == jf.input_path, JobFile.job_id != job_id)
+            .first()
+        )
+        if not shared:
             file_paths.append(jf.input_path)
 
     for jt in db.session.query(JobTarget).filter_by(job_id=job_id).all():
         if getattr(jt, "output_path", None):
             file_paths.append(jt.output_path)
+            file_paths.append(pairs_path(jt.output_path))
 
     # Remove filhos (se você tiver FK com ON DELETE CASCADE isso seria opcional)
     db.session.query(Metric).filter(Metric.job_id == job_id).delete(synchronize_session=False)
     db.session.query(JobTarget).filter(JobTarget.job_id == job_id).delete(synchronize_session=False)
     db.session.query(JobFile).filter(JobFile.job_id == job_id).delete(synchronize_session=False)
 
+    # jobs que eram atualização deste perdem só a referência
+    db.session.query(Job).filter(Job.previous_job_id == job_id).update(
+        {Job.previous_job_id: None}, synchronize_session=False
+    )
+
     # Remove o job em si
     db.session.delete(job)
     db.session.commit()
 
-    # Remove arquivos do disco — melhor esforço
+    # Remove arquivos do armazenamento — melhor esforço
+    storage = get_storage()
     removed = 0
     for p in file_paths:
         try:
-            if p and os.path.exists(p):
-                os.remove(p)
+            if p and storage.delete(p):
                 removed += 1
         except Exception:
             # não falha a requisição por causa de erro de IO
             pass
+    try:
+        removed += storage.delete_prefix(str(BUNDLE_DIR / f"job_{job_id}_"))
+    except Exception:
+        pass
 
     return jsonify({"ok": True, "removed_files": removed})
@@ -0,0 +1,163 @@
+# backend/app/utils/batching.py
+"""
+Montagem de lotes por orçamento do provedor (em vez de 50 parágrafos fixos).
+
+Os segmentos são empacotados em ordem até o limite do provedor (itens,
+caracteres, bytes do corpo ou tokens estimados). Parágrafos que sozinhos
+estouram o limite são quebrados em fronteiras de frase e remontados depois
+— nunca dentro de um trecho <gN>...</gN>, que o provedor precisa receber
+com a tag aberta e fechada no mesmo texto.
+"""
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass
+from urllib.parse import quote_plus
+
+from app.utils.inline_tags import TAG_RE
+
+try:  # tokenizer local opcional; sem ele, estimativa por caracteres
+    import tiktoken
+
+    _ENC = tiktoken.get_encoding("cl100k_base")
+except Exception:  # pragma: no cover - depende do ambiente
+    _ENC = None
+
+OPENAI_BATCH_TOKENS = int(os.getenv("OPENAI_BATCH_TOKENS", "3000"))
+
+
+@dataclass(frozen=True)
+class BatchLimits:
+    max_items: int
+    max_chars: int
+    max_bytes: int | None = None   # corpo form-urlencoded (DeepL)
+    max_tokens: int | None = None  # tokens de entrada (OpenAI)
+
+
+# DeepL: 128 KiB de corpo / 50 textos; Azure: 1000 elementos / 50k caracteres
+PROVIDER_LIMITS: dict[str, BatchLimits] = {
+    "deepl": BatchLimits(max_items=50, max_chars=120_000, max_bytes=128 * 1024 - 2048),
+    "azure": BatchLimits(max_items=1000, max_chars=50_000),
+    "openai": BatchLimits(max_items=100, max_chars=4 * OPENAI_BATCH_TOKENS, max_tokens=OPENAI_BATCH_TOKENS),
+}
+DEFAULT_LIMITS = BatchLimits(max_items=50, max_chars=50_000)
+
+
+def limits_for(provider: str) -> BatchLimits:
+    return PROVIDER_LIMITS.get(provider, DEFAULT_LIMITS)
+
+
+def estimate_tokens(text: str) -> int:
+    if _ENC is not None:
+        return len(_ENC.encode(text))
+    return len(text) // 3 + 1  # conservador para línguas latinas
+
+
+def _cost(text: str, limits: BatchLimits) -> tuple[int, int, int]:
+    chars = len(text)
+    nbytes = len(quote_plus(text)) + 6 if limits.max_bytes else 0  # "&text=" + valor
+    tokens = estimate_tokens(text) + 4 if limits.max_tokens else 0  # + separador/estrutura
+    return chars, nbytes, tokens
+
+
+def _fits(total: tuple[int, int, int], limits: BatchLimits) -> bool:
+    chars, nbytes, tokens = total
+    return (
+        chars <= limits.max_chars
+        and (limits.max_bytes is None or nbytes <= limits.max_bytes)
+        and (limits.max_tokens is None or tokens <= limits.max_tokens)
+    )
+
+
+_SENTENCE = re.compile(r".+?(?:[.!?;]+(?=\s)|$)\s*", re.S)
+_WORD = re.compile(r"(?:<[^<>]*>|\S)+\s*")  # uma tag inline nunca é partida
+
+
+def _depth_change(unit: str) -> int:
+    """Quantos <gN> o trecho deixa abertos (negativo se fecha os de antes)."""
+    depth = 0
+    for closing, kind, _n, selfclosing in TAG_RE.findall(unit):
+        if kind == "g" and not selfclosing:
+            depth += -1 if closing else 1
+    return depth
+
+
+def _split_oversized(text: str, limits: BatchLimits) -> list[str]:
+    """
+    Quebra em frases (e, em último caso, palavras) agrupando até o limite.
+    Só corta onde nenhum <gN> está aberto: um trecho formatado maior que o
+    limite vai inteiro, mesmo estourando.
+    """
+    words: list[str] = []
+    for m in _SENTENCE.finditer(text):
+        sent = m.group(0)
+        if _fits(_cost(sent, limits), limits):
+            words.append(sent)
+        else:
+            words.extend(w.group(0) for w in _WORD.finditer(sent))
+
+    units: list[str] = []
+    cur, depth = "", 0
+    for w in words:
+        cur += w
+        depth += _depth_change(w)
+        if depth <= 0:
+            units.append(cur)
+            cur, depth = "", 0
+    if cur:
+        units.append(cur)
+
+    pieces: list[str] = []
+    cur = ""
+    for u in units:
+        if cur and not _fits(_cost(cur + u, limits), limits):
+            pieces.append(cur)
+            cur = ""
+        cur += u
+    if cur:
+        pieces.append(cur)
+    return pieces or [text]
+
+
+class BatchPlan:
+    """Lotes a enviar + como remontar a saída na ordem/segmentação original."""
+
+    def __init__(self, texts: list[str], limits: BatchLimits):
+        self.count = len(texts)
+        self.owners: list[int] = []  # índice do texto original de cada pedaço
+        self.tails: list[str] = []   # espaço final do pedaço (reposto na remontagem)
+        pieces: list[str] = []
+
+        for i, t in enumerate(texts):
+            parts = [t] if _fits(_cost(t, limits), limits) else _split_oversized(t, limits)
+            for part in parts:
+                body = part.rstrip() if len(parts) > 1 else part
+                pieces.append(body)
+                self.owners.append(i)
+                self.tails.append(part[len(body):])
+
+        self.batches: list[list[str]] = []
+        cur: list[str] = []
+        total = (0, 0, 0)
+        for p in pieces:
+            c = _cost(p, limits)
+            nxt = (total[0] + c[0], total[1] + c[1], total[2] + c[2])
+            if cur and (len(cur) >= limits.max_items or not _fits(nxt, limits)):
+                self.batches.append(cur)
+                cur, nxt = [], c
+            cur.append(p)
+            total = nxt
+        if cur:
+            self.batches.append(cur)
+
+    def merge(self, translated_batches: list[list[str]]) -> list[str]:
+        out = [""] * self.count
+        flat = [t for batch in translated_batches for t in batch]
+        for owner, tail, t in zip(self.owners, self.tails, flat):
+            out[owner] += t + tail
+        return out
+
+
+def plan_batches(texts: list[str], provider: str) -> BatchPlan:
+    return BatchPlan(list(texts), limits_for(provider))
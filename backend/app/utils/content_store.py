@@ -0,0 +1,79 @@
+# backend/app/utils/content_store.py
+"""
+Uploads endereçados por conteúdo e reaproveitamento de saídas.
+
+O arquivo enviado é gravado em UPLOAD_DIR/<sha[:2]>/<sha256><ext>, com o
+hash calculado enquanto os bytes chegam (uma passada só, ver uploads): o
+mesmo arquivo reenviado não ocupa disco de novo.
+
+Cada destino concluído guarda uma `reuse_key` = sha256 de (hash do
+conteúdo, origem, destino, glossário+versão, provedor, modelo). Um job
+novo com a mesma combinação reaproveita a saída pronta (hard link, sem
+cópia) em vez de rodar o pipeline. O glossário só entra na chave dos
+destinos do par de idiomas dele (target_glossary_key): é o mesmo cálculo
+na criação do job e no worker que grava a chave.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from app.paths import UPLOAD_DIR
+from app.utils.glossary_matcher import GlossaryMatcher
+
+
+def blob_path(content_hash: str, ext: str) -> Path:
+    return UPLOAD_DIR / content_hash[:2] / f"{content_hash}{ext.lower()}"
+
+
+def temp_file() -> tuple[int, str]:
+    """Arquivo temporário no mesmo disco dos blobs (o commit é um rename, sem cópia)."""
+    return tempfile.mkstemp(dir=UPLOAD_DIR, prefix=".upload-")
+
+
+def commit_blob(tmp: str, content_hash: str, filename: str) -> str:
+    """
+    Move o temporário já gravado para o blob do hash; se o conteúdo já
+    existe, descarta o temporário. Devolve o caminho do blob.
+    """
+    path = blob_path(content_hash, os.path.splitext(filename)[1])
+    path.parent.mkdir(exist_ok=True)
+    if path.exists():
+        os.remove(tmp)
+    else:
+        os.replace(tmp, path)  # atômico: leitores nunca veem o blob pela metade
+    return str(path)
+
+
+def reuse_key(
+    content_hash: str,
+    source_lang: str,
+    target_lang: str,
+    glossary_key: tuple | None,
+    provider: str,
+    model: str,
+) -> str:
+    """Chave de reaproveitamento de uma saída (ver docstring do módulo)."""
+    glossary = ":".join(map(str, glossary_key)) if glossary_key else ""
+    raw = "\x1f".join((content_hash, source_lang, target_lang, glossary, provider, model))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def target_glossary_key(glossary, source_lang: str, target_lang: str) -> tuple | None:
+    """(glossary_id, versão) que entra na reuse_key do destino; None se o glossário não se aplica a ele."""
+    if not isinstance(glossary, GlossaryMatcher) or not glossary.key:
+        return None
+    return glossary.key if glossary.applies_to(source_lang, target_lang) else None
+
+
+def link_output(src: str, dst: str) -> None:
+    """Publica `src` também em `dst` (hard link; cópia se o link não for possível)."""
+    if os.path.exists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
@@ -1,41 +1,251 @@
 # backend/app/utils/docx_pipeline.py
-from docx import Document
-from app.utils.translator import translate_text  # ✅ import absoluto
+import os
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+from app.utils.batching import plan_batches
+from app.utils.formats import open_handler
+from app.utils.glossary_matcher import GlossaryMatcher
+from app.utils.glossary_protect import only_placeholders, protect, restore
+from app.utils.inline_tags import Segment, strip_tags
+from app.utils.segment_filter import split_translatable
+from app.utils.segment_reuse import align, load_pairs, pairs_path, read_meta, write_pairs
+from app.utils.translator import deepl_glossary_id, provider_key, translate_batches  # ✅ import absoluto
+
+# Quantos destinos traduzir em paralelo num mesmo job (threads; o gargalo é I/O de rede)
+MAX_PARALLEL_TARGETS = int(os.getenv("PIPELINE_MAX_PARALLEL_TARGETS", "4"))
+
+def _protect_glossary(texts: list[str], source_lang: str, target_lang: str, matcher, stats: dict):
+    """
+    Etapa de glossário antes da tradução: glossário nativo do DeepL quando
+    disponível; senão os termos viram placeholders (ver glossary_protect).
+    Devolve (textos a enviar, Protected por texto ou None, glossary_id).
+    """
+    stats.update(glossary_mode="none", glossary_hits=0, glossary_lost=0)
+    if not matcher:
+        return texts, None, None
+    glossary_id = deepl_glossary_id(matcher, source_lang, target_lang)
+    if glossary_id:
+        stats["glossary_mode"] = "deepl"
+        return texts, None, glossary_id
+    protected = [protect(t, matcher) for t in texts]
+    stats["glossary_mode"] = "placeholder"
+    stats["glossary_hits"] = sum(len(p.terms) for p in protected)
+    return [p.text for p in protected], protected, None
+
+
+def _pairs_meta(matcher) -> dict:
+    """Com que glossário e provedor as traduções deste destino são feitas (cabeçalho dos pares)."""
+    provider, model = provider_key()
+    key = getattr(matcher, "key", None) if matcher else None
+    return {"glossary": list(key) if key else None, "provider": provider, "model": model}
+
+
+def _previous_pairs(previous: str, matcher, stats: dict):
+    """
+    Pares do job anterior, só se foram feitos com o mesmo glossário (id e
+    versão) que este destino usa; senão tudo vai ao provedor de novo. Outro
+    provedor/modelo não impede o reaproveitamento, mas fica nas métricas.
+    """
+    if not os.path.exists(pairs_path(previous)):
+        return None
+    meta, old = _pairs_meta(matcher), read_meta(previous)
+    if old is None or old.get("glossary") != meta["glossary"]:
+        stats["reuse_skipped"] = "glossary_mismatch" if old is not None else "glossary_unknown"
+        return None
+    if (old.get("provider"), old.get("model")) != (meta["provider"], meta["model"]):
+        stats["reuse_provider_mismatch"] = f"{old.get('provider')}/{old.get('model')}"
+    return load_pairs(previous)
+
+
+def _translate_segments(
+    segments: list[Segment],
+    source_lang: str,
+    target_lang: str,
+    memory=None,
+    progress=None,
+    matcher=None,
+    deadline: float | None = None,
+    previous: str | None = None,
+) -> tuple[dict[int, str], dict]:
+    """
+    Traduz os segmentos marcados; devolve {índice: tradução marcada} só dos
+    que foram traduzidos (os demais ficam intactos no documento) e as stats.
+    `previous` é a saída do mesmo destino num job anterior: os segmentos
+    inalterados reaproveitam a tradução de lá (ver segment_reuse), se o
+    glossário for o mesmo.
+    """
+    paras = [s.plain for s in segments]
+    # vazios, números, códigos etc. não vão ao provedor (copiados como estão)
+    keep, stats = split_translatable(paras, source_lang, target_lang)
+    stats.update(tm_hits=0, tm_misses=0)
+
+    reused: dict[int, str] = {}
+    pairs = _previous_pairs(previous, matcher, stats) if previous else None
+    if pairs is not None:
+        reused, align_stats = align(pairs, segments)
+        stats.update(align_stats)
+        keep = [i for i in keep if i not in reused]
+    reused_chars = sum(len(paras[i]) for i in reused)
+
+    texts, protected, glossary_id = _protect_glossary(
+        [segments[i].markup for i in keep], source_lang, target_lang, matcher, stats
+    )
+    # segmentos que são só termos do glossário se resolvem sem o provedor
+    local = {j for j, t in enumerate(texts) if protected and protected[j].terms and only_placeholders(t)}
+    send = [j for j in range(len(texts)) if j not in local]
+    stats["segments_skipped"] += len(local)
+    stats["chars_saved"] += sum(len(paras[keep[j]]) for j in local)
+
+    # lotes montados pelo orçamento do provedor; vão em paralelo e a ordem é preservada
+    plan = plan_batches([texts[j] for j in send], provider_key()[0])
+
+    on_batch_done = None
+    if progress is not None:
+        skipped = stats["segments_skipped"] + len(reused)
+        progress.start(
+            target_lang,
+            segments_total=skipped + sum(len(b) for b in plan.batches),
+            chars_total=sum(len(p) for p in paras),
+            segments_done=skipped,
+            chars_done=stats["chars_saved"] + reused_chars,
+        )
+
+        def on_batch_done(i: int) -> None:
+            b = plan.batches[i]
+            progress.advance(target_lang, len(b), sum(len(strip_tags(t)) for t in b))
+
+    out = translate_batches(
+        plan.batches,
+        source_lang,
+        target_lang,
+        memory=memory,
+        stats=stats,
+        on_batch_done=on_batch_done,
+        glossary_id=glossary_id,
+        markup=True,
+        deadline=deadline,
+    )
+    stats["batches"] = len(plan.batches)
+
+    done = list(texts)
+    for j, t in zip(send, plan.merge(out)):
+        done[j] = t
+    if protected:
+        for j, p in enumerate(protected):
+            done[j], lost = restore(done[j], p.terms)
+            stats["glossary_lost"] += lost
+
+    result = dict(zip(keep, done))
+    result.update(reused)
+    return result, stats
+
+
+def run_to_many(
+    in_path: str,
+    outputs: dict[str, str],
+    glossary: "dict[str, str] | GlossaryMatcher",
+    source_lang="pt-BR",
+    max_workers: int | None = None,
+    memory=None,
+    progress=None,
+    time_budget: float | None = None,
+    previous: dict[str, str] | None = None,
+) -> dict[str, dict | Exception]:
+    """
+    Lê o arquivo uma única vez e traduz para todos os destinos em paralelo.
+    O formato (DOCX, XLSX, PPTX, TXT, XLIFF) é escolhido pela extensão (ver
+    app.utils.formats); no DOCX cobre todas as partes com texto (corpo,
+    tabelas, caixas de texto, cabeçalhos, rodapés, notas e comentários) em
+    streaming. Textos repetidos são traduzidos uma vez só por destino.
+    `outputs` mapeia target_lang -> out_path. Retorna, por destino, as
+    métricas (dict) ou a exceção que fez aquele destino falhar.
+    `memory` (TranslationMemory) evita reenviar segmentos já traduzidos;
+    `progress` (ProgressReporter) recebe o avanço por destino. O glossário
+    entra antes da tradução (glossário nativo do DeepL ou placeholders), só
+    nos destinos do par de idiomas dele (GlossaryMatcher.applies_to).
+    `time_budget` (segundos) limita a tradução de todos os destinos; o
+    destino que não terminar a tempo falha com TranslatorError.
+    `previous` mapeia target_lang -> saída de um job anterior (atualização
+    de documento revisado: só os segmentos alterados vão ao provedor). Cada
+    saída ganha ao lado o arquivo de pares que um job futuro pode usar.
+    """
+    deadline = time.monotonic() + time_budget if time_budget else None
+    handler = open_handler(in_path)
+    # células/cabeçalhos repetidos: um segmento único por texto marcado
+    # (`slots[i]` = índice do parágrafo i em `unique`; a gravação percorre na mesma ordem)
+    seen: dict[Segment, int] = {}
+    slots = array("I")
+    for seg in handler.iter_segments():
+        slots.append(seen.setdefault(seg, len(seen)))
+    unique = list(seen)
+    # glossário compilado uma vez e reutilizado em todos os destinos do mesmo par
+    # de idiomas; os demais destinos vão sem glossário (nem placeholders nem DeepL)
+    matcher = glossary if isinstance(glossary, GlossaryMatcher) else GlossaryMatcher(glossary)
+    matchers = {lang: matcher if matcher.applies_to(source_lang, lang) else None for lang in outputs}
+
+    langs = list(outputs)
+    workers = max(1, min(len(langs), max_workers or MAX_PARALLEL_TARGETS))
+    results: dict[str, dict | Exception] = {}
+
+    previous = previous or {}
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="target") as pool:
+        futures = {
+            lang: pool.submit(
+                _translate_segments,
+                unique,
+                source_lang,
+                lang,
+                memory,
+                progress,
+                matchers[lang],
+                deadline,
+                previous.get(lang),
+            )
+            for lang in langs
+        }
+
+        # escreve cada saída (sequencial) relendo o arquivo original
+        for lang in langs:
+            try:
+                translated, tm_stats = futures[lang].result()
+                # tradução idêntica à origem não precisa reconstruir nada
+                changed = {k: t for k, t in translated.items() if t != unique[k].markup}
+                order = iter(slots)
+
+                # o handler pede a tradução de cada segmento na ordem de
+                # iter_segments; o glossário já foi aplicado antes da tradução
+                def translation(changed=changed, order=order) -> str | None:
+                    return changed.get(next(order))
+
+                handler.save(outputs[lang], translation, lang)
+                write_pairs(outputs[lang], unique, translated, _pairs_meta(matchers[lang]))
+                results[lang] = {
+                    "paragraphs": len(slots),
+                    "unique_segments": len(unique),
+                    "parts": handler.parts,
+                    "source_lang": source_lang,
+                    "target_lang": lang,
+                    "glossary_terms": matcher.size if matchers[lang] else 0,
+                    **tm_stats,
+                }
+                if matcher and not matchers[lang]:
+                    results[lang]["glossary_mode"] = "locale_mismatch"
+            except Exception as e:
+                results[lang] = e
+
+    return results
 
 
 def run_docx_to_docx(in_path: str, out_path: str, glossary: dict[str, str], source_lang="pt-BR", target_lang="en-US"):
     """
-    Lê DOCX, traduz parágrafos e aplica substituições de glossário
-    (após tradução). Salva em out_path. Retorna métricas simples.
-    """
-    doc = Document(in_path)
-    paras = [p.text or "" for p in doc.paragraphs]
-
-    # Tradução em lotes (lote de 50 para evitar payloads grandes)
-    translated = []
-    BATCH = 50
-    for i in range(0, len(paras), BATCH):
-        chunk = paras[i : i + BATCH]
-        translated.extend(translate_text(chunk, source_lang, target_lang))
-
-    # aplica glossário no texto traduzido
-    def apply_gloss(txt: str) -> str:
-        if not glossary:
-            return txt
-        out = txt
-        for k, v in glossary.items():
-            out = out.replace(k, v)
-        return out
-
-    # escreve de volta (perde formatação inline detalhada, mantém blocos)
-    for p, new_text in zip(doc.paragraphs, translated):
-        p.text = apply_gloss(new_text)
-
-    doc.save(out_path)
-
-    return {
-        "paragraphs": len(paras),
-        "source_lang": source_lang,
-        "target_lang": target_lang,
-        "glossary_terms": len(glossary or {}),
-    }
+    Lê DOCX, traduz todas as partes com texto preservando a formatação inline e respeitando
+    o glossário (aplicado antes da tradução). Salva em out_path. Retorna
+    métricas simples.
+    """
+    result = run_to_many(in_path, {target_lang: out_path}, glossary, source_lang)[target_lang]
+    if isinstance(result, Exception):
+        raise result
+    return result
@@ -0,0 +1,296 @@
+# backend/app/utils/docx_segments.py
+"""
+Segmentos de DOCX com a formatação inline preservada, direto na árvore lxml.
+
+Cada parágrafo (w:p) vira um segmento marcado (ver inline_tags): o texto
+na formatação predominante do parágrafo vai sem tags, trechos com outra
+formatação viram <gN>…</gN>, links/smartTags/inserções viram um grupo
+<gN>…</gN> e objetos sem texto (tab, quebra, nota de rodapé, imagem,
+campo) viram <xN/>. Na volta, os runs do parágrafo são reconstruídos a
+partir da tradução copiando o w:rPr de cada trecho, em vez de `p.text =`
+(que apaga negrito, itálico, links e referências).
+
+O mesmo modelo serve para outros vocabulários OOXML com parágrafos de runs
+(ver Dialect): DrawingML (a:p, slides do PPTX) e rich text do SpreadsheetML
+(si, sharedStrings do XLSX).
+"""
+from __future__ import annotations
+
+import copy
+from typing import NamedTuple
+
+from docx.oxml.ns import qn
+from lxml import etree
+
+from app.utils.inline_tags import Segment, escape_text, strip_tags, tokenize
+
+_XML_SPACE = "{http://www.w3.org/XML/1998/namespace}space"
+_A = "{http://schemas.openxmlformats.org/drawingml/2006/main}"
+_S = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+
+
+class Dialect(NamedTuple):
+    p: str
+    r: str
+    t: str
+    rpr: str
+    ppr: str | None
+    groups: frozenset        # contêineres de runs tratados como um trecho só (formatação interna achatada)
+    anchors: frozenset       # marcadores sem conteúdo: ficam onde estão, não são reconstruídos
+    preserve_space: bool     # xml:space="preserve" em textos com espaço nas pontas
+    bare_text: bool = False  # texto sem formatação vai direto no parágrafo (<si><t>)
+
+
+WORD = Dialect(
+    p=qn("w:p"),
+    r=qn("w:r"),
+    t=qn("w:t"),
+    rpr=qn("w:rPr"),
+    ppr=qn("w:pPr"),
+    groups=frozenset({qn("w:hyperlink"), qn("w:smartTag"), qn("w:ins")}),
+    anchors=frozenset({
+        qn("w:bookmarkStart"),
+        qn("w:bookmarkEnd"),
+        qn("w:proofErr"),
+        qn("w:commentRangeStart"),
+        qn("w:commentRangeEnd"),
+        qn("w:permStart"),
+        qn("w:permEnd"),
+    }),
+    preserve_space=True,
+)
+
+DRAWING = Dialect(
+    p=f"{_A}p",
+    r=f"{_A}r",
+    t=f"{_A}t",
+    rpr=f"{_A}rPr",
+    ppr=f"{_A}pPr",
+    groups=frozenset(),
+    anchors=frozenset({f"{_A}endParaRPr"}),
+    preserve_space=False,
+)
+
+SHEET = Dialect(
+    p=f"{_S}si",
+    r=f"{_S}r",
+    t=f"{_S}t",
+    rpr=f"{_S}rPr",
+    ppr=None,
+    groups=frozenset(),
+    anchors=frozenset({f"{_S}rPh", f"{_S}phoneticPr"}),
+    preserve_space=True,
+    bare_text=True,
+)
+
+
+def story_paragraphs(root, d: Dialect = WORD) -> list:
+    """
+    Todos os parágrafos de uma parte (corpo, tabelas, caixas de texto,
+    cabeçalho, notas...), em ordem de documento — a mesma na extração e na
+    escrita.
+    """
+    return list(root.iter(d.p))
+
+
+def _rpr_key(rpr) -> bytes:
+    return b"" if rpr is None else etree.tostring(rpr)
+
+
+def _add_text(out: list, rpr, text: str) -> None:
+    key = _rpr_key(rpr)
+    if out and out[-1][0] == "text" and out[-1][2] == key:
+        out[-1][3] += text  # runs vizinhos com a mesma formatação viram um trecho só
+    else:
+        out.append(["text", rpr, key, text])
+
+
+def _run_pieces(r, out: list, d: Dialect) -> None:
+    rpr = r.find(d.rpr)
+    for child in r:
+        if child.tag == d.rpr:
+            continue
+        if child.tag == d.t:
+            _add_text(out, rpr, child.text or "")
+        elif isinstance(child.tag, str):
+            out.append(["atom", rpr, child, True])
+
+
+def _group_pieces(group, out: list, d: Dialect) -> None:
+    # só runs do próprio grupo (não desce em caixas de texto dentro dos runs)
+    for child in group:
+        if child.tag == d.r:
+            _run_pieces(child, out, d)
+        elif child.tag in d.groups:
+            _group_pieces(child, out, d)
+
+
+def _is_content(el, d: Dialect) -> bool:
+    return isinstance(el.tag, str) and el.tag != d.ppr and el.tag not in d.anchors
+
+
+def _spans(p, d: Dialect) -> list:
+    """Trechos do parágrafo: ["text", rPr, chave, texto] | ["atom", rPr, el, de_run] | ["group", el, trechos]."""
+    spans: list = []
+    for child in p:
+        if not _is_content(child, d):
+            continue
+        if child.tag == d.r:
+            _run_pieces(child, spans, d)
+        elif child.tag == d.t:
+            _add_text(spans, None, child.text or "")  # <si><t>texto</t></si>
+        elif child.tag in d.groups:
+            inner: list = []
+            _group_pieces(child, inner, d)
+            spans.append(["group", child, inner])
+        else:
+            # w:del, m:oMath, w:fldSimple, w:sdt ...: copiados como estão
+            spans.append(["atom", None, child, False])
+    return spans
+
+
+def _layout(spans: list):
+    """(chave/rPr da formatação base, tabela id -> trecho). Determinístico: extração e escrita batem."""
+    weight: dict[bytes, int] = {}
+    rprs: dict[bytes, object] = {}
+    for s in spans:
+        if s[0] == "text":
+            weight[s[2]] = weight.get(s[2], 0) + len(s[3])
+            rprs.setdefault(s[2], s[1])
+    base_key = max(weight, key=weight.get) if weight else None
+    base_rpr = rprs.get(base_key)
+    if base_key is None:
+        first = next((x for s in spans if s[0] == "group" for x in s[2] if x[0] == "text"), None)
+        base_rpr = first[1] if first else None
+
+    table: dict[int, list] = {}
+    n = 0
+    for s in spans:
+        if s[0] == "text" and s[2] == base_key:
+            continue
+        n += 1
+        table[n] = s
+        if s[0] == "group":
+            for x in s[2]:
+                if x[0] == "atom":
+                    n += 1
+                    table[n] = x
+    return base_key, base_rpr, table
+
+
+def extract_segment(p, d: Dialect = WORD) -> Segment:
+    spans = _spans(p, d)
+    base_key, _, table = _layout(spans)
+    ids = {id(s): n for n, s in table.items()}
+    parts: list[str] = []
+    for s in spans:
+        if s[0] == "text":
+            text = escape_text(s[3])
+            parts.append(text if s[2] == base_key else f"<g{ids[id(s)]}>{text}</g{ids[id(s)]}>")
+        elif s[0] == "atom":
+            parts.append(f"<x{ids[id(s)]}/>")
+        else:
+            inner = "".join(
+                escape_text(x[3]) if x[0] == "text" else f"<x{ids[id(x)]}/>" for x in s[2]
+            )
+            parts.append(f"<g{ids[id(s)]}>{inner}</g{ids[id(s)]}>")
+    markup = "".join(parts)
+    return Segment(markup, strip_tags(markup))
+
+
+def extract_segments(paragraphs, d: Dialect = WORD) -> list[Segment]:
+    return [extract_segment(p, d) for p in paragraphs]
+
+
+def _make_text(text: str, d: Dialect):
+    t = etree.Element(d.t)
+    t.text = text
+    if d.preserve_space and text != text.strip():
+        t.set(_XML_SPACE, "preserve")
+    return t
+
+
+def _make_run(rpr, text: str, d: Dialect):
+    r = etree.Element(d.r)
+    if rpr is not None:
+        r.append(copy.deepcopy(rpr))
+    r.append(_make_text(text, d))
+    return r
+
+
+def _atom_element(span, d: Dialect):
+    _, rpr, el, from_run = span
+    if not from_run:
+        return el
+    r = etree.Element(d.r)
+    if rpr is not None:
+        r.append(copy.deepcopy(rpr))
+    r.append(el)  # move o objeto original (o run antigo sai da árvore)
+    return r
+
+
+def _group_shell(el):
+    shell = copy.deepcopy(el)
+    for child in list(shell):
+        if not child.tag.endswith("Pr"):
+            shell.remove(child)
+    return shell
+
+
+def apply_translation(p, markup: str, d: Dialect = WORD) -> None:
+    """Reconstrói os runs do parágrafo a partir da tradução marcada."""
+    spans = _spans(p, d)
+    _, base_rpr, table = _layout(spans)
+
+    originals = [el for el in p if _is_content(el, d)]
+    at = p.index(originals[0]) if originals else len(p)
+    for el in originals:
+        p.remove(el)
+
+    new: list = []
+    stack: list[tuple[int, object, object]] = []  # (id, contêiner ou None, rPr)
+    used: set[int] = set()
+
+    def emit(el) -> None:
+        holder = next((c for _, c, _ in reversed(stack) if c is not None), None)
+        (holder if holder is not None else new).append(el)
+
+    tokens = tokenize(markup)
+    if d.bare_text and base_rpr is None and all(k == "text" for k, _ in tokens):
+        # sem nenhuma formatação: volta ao formato simples (<si><t>...</t></si>)
+        text = "".join(v for _, v in tokens)
+        p.insert(at, _make_text(text, d))
+        return
+
+    for kind, val in tokens:
+        if kind == "text":
+            if val:
+                emit(_make_run(stack[-1][2] if stack else base_rpr, val, d))
+        elif kind == "open":
+            s = table.get(val)
+            if s is None or s[0] == "atom":
+                continue
+            if s[0] == "group":
+                shell = _group_shell(s[1])
+                emit(shell)
+                first = next((x for x in s[2] if x[0] == "text"), None)
+                stack.append((val, shell, first[1] if first else base_rpr))
+            else:
+                stack.append((val, None, s[1]))
+        elif kind == "close":
+            if any(n == val for n, _, _ in stack):
+                while stack and stack.pop()[0] != val:
+                    pass
+        elif kind == "atom":
+            s = table.get(val)
+            if s is not None and s[0] == "atom" and val not in used:
+                used.add(val)
+                emit(_atom_element(s, d))
+
+    # objetos que a tradução perdeu (nota de rodapé, imagem...) não podem sumir
+    for n, s in table.items():
+        if s[0] == "atom" and n not in used:
+            new.append(_atom_element(s, d))
+
+    for k, el in enumerate(new):
+        p.insert(at + k, el)
@@ -0,0 +1,72 @@
+# backend/app/utils/formats/__init__.py
+"""
+Registro de formatos de arquivo traduzíveis.
+
+Cada handler é uma classe registrada por extensão com a mesma interface:
+
+    handler = Handler(path)
+    handler.parts                      # quantas partes com texto
+    handler.iter_segments()            # Segment (markup + texto puro), em ordem
+    handler.save(out_path, translation, target_lang)
+
+`signature` diz como o conteúdo começa — "zip" (pacotes OOXML), "xml" ou
+"text" — e permite recusar um upload pelos primeiros bytes (ver uploads).
+
+Em `save`, o handler percorre os segmentos na mesma ordem de
+`iter_segments` e chama `translation()` uma vez por segmento: a tradução
+marcada ou None (manter a origem). Todos os formatos passam pelo mesmo
+núcleo de filtro/lotes/TM/glossário (ver docx_pipeline).
+"""
+from __future__ import annotations
+
+import os
+
+_HANDLERS: dict[str, type] = {}
+_MIMETYPES: dict[str, str] = {}
+_SIGNATURES: dict[str, str] = {}
+
+
+class UnsupportedFormat(ValueError):
+    """Extensão sem handler registrado."""
+
+
+def register(*extensions: str, mimetype: str, signature: str):
+    def deco(cls):
+        for ext in extensions:
+            _HANDLERS[ext] = cls
+            _MIMETYPES[ext] = mimetype
+            _SIGNATURES[ext] = signature
+        return cls
+
+    return deco
+
+
+def _ext(path: str) -> str:
+    return os.path.splitext(path or "")[1].lower()
+
+
+def supported_extensions() -> list[str]:
+    return sorted(_HANDLERS)
+
+
+def is_supported(filename: str) -> bool:
+    return _ext(filename) in _HANDLERS
+
+
+def mimetype_for(path: str) -> str:
+    return _MIMETYPES.get(_ext(path), "application/octet-stream")
+
+
+def signature_for(path: str) -> str | None:
+    return _SIGNATURES.get(_ext(path))
+
+
+def open_handler(path: str):
+    cls = _HANDLERS.get(_ext(path))
+    if cls is None:
+        raise UnsupportedFormat(f"unsupported file type: {_ext(path) or path}")
+    return cls(path)
+
+
+# registra os handlers (importados depois de `register` existir)
+from app.utils.formats import docx, pptx, txt, xliff, xlsx  # noqa: E402,F401
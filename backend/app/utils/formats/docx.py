@@ -0,0 +1,94 @@
+# backend/app/utils/formats/docx.py
+"""
+DOCX: todas as partes com texto ("stories": corpo, cabeçalhos, rodapés,
+notas de rodapé/fim e comentários), processadas em streaming (ver ooxml).
+Contêineres (w:body, w:tbl, w:tr, w:tc, w:sdt, w:footnote...) são escritos
+tag a tag; cada parágrafo é um bloco folha, então a memória não depende do
+número de páginas.
+"""
+from __future__ import annotations
+
+import zipfile
+from typing import Callable, Iterator
+
+from docx.oxml.ns import qn
+
+from app.utils.docx_segments import apply_translation, extract_segment, story_paragraphs
+from app.utils.formats import register
+from app.utils.formats.ooxml import part_names, rewrite_zip, stream_part
+from app.utils.inline_tags import Segment
+
+# sufixos dos content types das partes com texto traduzível
+_STORY_TYPES = (
+    ".main+xml",  # document / template / macroEnabled
+    ".header+xml",
+    ".footer+xml",
+    ".footnotes+xml",
+    ".endnotes+xml",
+    ".comments+xml",
+)
+# elementos escritos tag a tag (os filhos são blocos ou outros contêineres)
+_CONTAINERS = frozenset({
+    qn("w:body"),
+    qn("w:tbl"),
+    qn("w:tr"),
+    qn("w:tc"),
+    qn("w:sdt"),
+    qn("w:sdtContent"),
+    qn("w:customXml"),
+    qn("w:footnote"),
+    qn("w:endnote"),
+    qn("w:comment"),
+})
+
+
+def _is_story(ctype: str) -> bool:
+    return ("wordprocessingml" in ctype or "ms-word" in ctype) and ctype.endswith(_STORY_TYPES)
+
+
+@register(
+    ".docx",
+    mimetype="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    signature="zip",
+)
+class DocxPackage:
+    """DOCX de entrada; segmentos e gravação por destino, sempre em streaming."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with zipfile.ZipFile(path) as zf:
+            self.story_names = part_names(zf, _is_story)
+        if not self.story_names:
+            raise ValueError("not a DOCX package (no word/document.xml)")
+        self.parts = len(self.story_names)
+
+    def iter_segments(self) -> Iterator[Segment]:
+        """Segmentos de todos os parágrafos, em ordem de documento."""
+        with zipfile.ZipFile(self.path) as zf:
+            for name in self.story_names:
+                found: list[Segment] = []
+                with zf.open(name) as fp:
+                    stream_part(
+                        fp,
+                        lambda el: found.extend(extract_segment(p) for p in story_paragraphs(el)),
+                        containers=_CONTAINERS,
+                    )
+                yield from found
+
+    def save(self, out_path: str, translation: Callable[[], str | None], target_lang: str) -> None:
+        """
+        Grava o pacote: cada story é reescrita em streaming, reconstruindo os
+        runs dos parágrafos cuja tradução (`translation()`, na ordem de
+        iter_segments) não é None; as demais partes são copiadas byte a byte.
+        """
+
+        def _on_block(el) -> None:
+            for p in story_paragraphs(el):
+                markup = translation()
+                if markup is not None:
+                    apply_translation(p, markup)
+
+        def _rewrite(fin, fout) -> None:
+            stream_part(fin, _on_block, fout, containers=_CONTAINERS)
+
+        rewrite_zip(self.path, out_path, {name: _rewrite for name in self.story_names})
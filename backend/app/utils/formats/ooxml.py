@@ -0,0 +1,169 @@
+# backend/app/utils/formats/ooxml.py
+"""
+Utilitários de streaming para pacotes OOXML (DOCX, XLSX, PPTX).
+
+As partes XML com texto passam pelo lxml com iterparse: contêineres são
+escritos tag a tag e cada bloco folha é processado, serializado e
+descartado assim que termina — a memória fica limitada ao maior bloco. As
+demais partes do zip (estilos, imagens, rels...) são copiadas sem alteração,
+com os bytes já comprimidos (sem descomprimir e recomprimir).
+"""
+from __future__ import annotations
+
+import re
+import struct
+import zipfile
+from typing import Callable
+
+from lxml import etree
+
+_CT_NS = "{http://schemas.openxmlformats.org/package/2006/content-types}"
+_XML_DECL = b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\r\n'
+_FLUSH_BYTES = 1 << 20  # escreve no zip em pedaços de ~1 MiB
+
+
+def part_names(zf: zipfile.ZipFile, wanted_type: Callable[[str], bool]) -> list[str]:
+    """Partes cujo content type satisfaz `wanted_type`, na ordem do zip."""
+    root = etree.fromstring(zf.read("[Content_Types].xml"))
+    wanted = {
+        o.get("PartName", "").lstrip("/")
+        for o in root.iter(f"{_CT_NS}Override")
+        if wanted_type(o.get("ContentType", ""))
+    }
+    # na ordem do zip: a leitura dos segmentos e a gravação percorrem igual
+    return [i.filename for i in zf.infolist() if i.filename in wanted]
+
+
+def _inherited_ns_re(nsmap: dict) -> re.Pattern:
+    """Regex das declarações de namespace da raiz (exatamente como o lxml as serializa)."""
+    decls = [
+        (f'xmlns:{prefix}="{uri}"' if prefix else f'xmlns="{uri}"').encode()
+        for prefix, uri in nsmap.items()
+    ]
+    return re.compile(b"|".join(rb"\s" + re.escape(d) for d in decls) or rb"(?!)")
+
+
+def _strip_inherited_ns(raw: bytes, inherited: re.Pattern) -> bytes:
+    """
+    tostring() de um subelemento redeclara todos os namespaces em escopo;
+    tira da primeira tag os que já estão declarados na raiz.
+    """
+    end = raw.index(b">")
+    return inherited.sub(b"", raw[:end]) + raw[end:]
+
+
+def _open_tag(el, inherited: re.Pattern | None) -> bytes:
+    shell = etree.Element(el.tag, attrib=dict(el.attrib), nsmap=el.nsmap)
+    raw = etree.tostring(shell, encoding="UTF-8")
+    if inherited is not None:
+        raw = _strip_inherited_ns(raw, inherited)
+    return raw[:-2] + b">"  # "<w:tbl .../>" -> "<w:tbl ...>"
+
+
+def _close_tag(el) -> bytes:
+    local = etree.QName(el).localname
+    return (f"</{el.prefix}:{local}>" if el.prefix else f"</{local}>").encode()
+
+
+def stream_part(fp, on_block: Callable, out=None, containers: frozenset = frozenset()) -> None:
+    """
+    Percorre a parte em streaming chamando `on_block(el)` para cada bloco
+    folha completo (filho da raiz ou de um dos `containers`); com `out`,
+    escreve o XML (já com as alterações do bloco).
+    """
+    # sem huge_tree: o arquivo vem do usuário e os limites do libxml2 ficam valendo
+    events = etree.iterparse(fp, events=("start", "end"))
+    _, root = next(events)
+    ns = _inherited_ns_re(root.nsmap)
+    buf: list[bytes] = []
+    size = 0
+
+    def write(data: bytes) -> None:
+        nonlocal size
+        buf.append(data)
+        size += len(data)
+        if size >= _FLUSH_BYTES:
+            out.write(b"".join(buf))
+            buf.clear()
+            size = 0
+
+    if out is not None:
+        write(_XML_DECL)
+        write(_open_tag(root, None))
+    # contêineres abertos (o primeiro é a raiz); blocos dentro deles são folhas
+    open_containers = [root]
+    for ev, el in events:
+        parent = open_containers[-1]
+        if ev == "start":
+            if el.getparent() is parent and el.tag in containers:
+                open_containers.append(el)
+                if out is not None:
+                    write(_open_tag(el, ns))
+            continue
+        if el is parent:
+            open_containers.pop()
+            if out is not None:
+                write(_close_tag(el))
+            if open_containers:
+                open_containers[-1].remove(el)
+        elif el.getparent() is parent:
+            on_block(el)
+            if out is not None:
+                write(_strip_inherited_ns(etree.tostring(el, encoding="UTF-8"), ns))
+            el.clear()
+            parent.remove(el)
+    if out is not None and buf:
+        out.write(b"".join(buf))
+
+
+def _copy_raw(src: zipfile.ZipFile, dst: zipfile.ZipFile, info: zipfile.ZipInfo) -> None:
+    """
+    Copia um membro com os bytes comprimidos como estão (CRC e tamanhos já
+    conhecidos vão no cabeçalho local). O zipfile não tem API pública para
+    isso; o registro no diretório central segue o que ZipFile.write faz.
+    """
+    src.fp.seek(info.header_offset)
+    header = src.fp.read(zipfile.sizeFileHeader)
+    name_len, extra_len = struct.unpack("<HH", header[26:30])
+    data_start = info.header_offset + zipfile.sizeFileHeader + name_len + extra_len
+
+    zi = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+    zi.compress_type = info.compress_type
+    zi.external_attr = info.external_attr
+    zi.create_system = info.create_system
+    zi.flag_bits = info.flag_bits & 0x800  # só UTF-8; sem data descriptor
+    zi.CRC, zi.compress_size, zi.file_size = info.CRC, info.compress_size, info.file_size
+    zip64 = max(info.file_size, info.compress_size) > zipfile.ZIP64_LIMIT
+
+    zi.header_offset = dst.fp.tell()
+    dst.fp.write(zi.FileHeader(zip64))
+    src.fp.seek(data_start)
+    remaining = info.compress_size
+    while remaining:
+        chunk = src.fp.read(min(remaining, 1 << 20))
+        if not chunk:
+            raise zipfile.BadZipFile(f"membro truncado: {info.filename}")
+        dst.fp.write(chunk)
+        remaining -= len(chunk)
+    dst.filelist.append(zi)
+    dst.NameToInfo[zi.filename] = zi
+    dst.start_dir = dst.fp.tell()
+    dst._didModify = True
+
+
+def rewrite_zip(in_path: str, out_path: str, rewrite: dict[str, Callable]) -> None:
+    """
+    Copia o pacote; as partes em `rewrite` passam por `rewrite[nome](fin, fout)`,
+    as demais são copiadas sem recompressão (ver _copy_raw).
+    """
+    with zipfile.ZipFile(in_path) as src, zipfile.ZipFile(out_path, "w", zipfile.ZIP_DEFLATED) as dst:
+        for info in src.infolist():
+            fn = rewrite.get(info.filename)
+            if fn is None:
+                _copy_raw(src, dst, info)
+                continue
+            zi = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+            zi.compress_type = info.compress_type
+            zi.external_attr = info.external_attr
+            with src.open(info) as fin, dst.open(zi, "w", force_zip64=info.file_size > 2**30) as fout:
+                fn(fin, fout)
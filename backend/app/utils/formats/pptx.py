@@ -0,0 +1,60 @@
+# backend/app/utils/formats/pptx.py
+"""
+PPTX: parágrafos DrawingML (a:p) dos slides e das anotações do
+apresentador — caixas de texto, placeholders, tabelas e formas. Runs com
+formatação diferente viram tags inline como no DOCX; quebras (a:br) e
+campos (a:fld, ex.: número do slide) viram objetos <xN/>. Layouts e
+masters não são traduzidos (só têm textos de exemplo).
+"""
+from __future__ import annotations
+
+import zipfile
+from typing import Callable, Iterator
+
+from app.utils.docx_segments import DRAWING, apply_translation, extract_segment, story_paragraphs
+from app.utils.formats import register
+from app.utils.formats.ooxml import part_names, rewrite_zip, stream_part
+from app.utils.inline_tags import Segment
+
+_TEXT_TYPES = ("presentationml.slide+xml", "presentationml.notesSlide+xml")
+
+
+def _is_text_part(ctype: str) -> bool:
+    return ctype.endswith(_TEXT_TYPES)
+
+
+@register(
+    ".pptx",
+    mimetype="application/vnd.openxmlformats-officedocument.presentationml.presentation",
+    signature="zip",
+)
+class PptxPresentation:
+    def __init__(self, path: str):
+        self.path = path
+        with zipfile.ZipFile(path) as zf:
+            self.part_names = part_names(zf, _is_text_part)
+        if not self.part_names:
+            raise ValueError("not a PPTX package (no slides)")
+        self.parts = len(self.part_names)
+
+    def iter_segments(self) -> Iterator[Segment]:
+        with zipfile.ZipFile(self.path) as zf:
+            for name in self.part_names:
+                found: list[Segment] = []
+                with zf.open(name) as fp:
+                    stream_part(
+                        fp, lambda el: found.extend(extract_segment(p, DRAWING) for p in story_paragraphs(el, DRAWING))
+                    )
+                yield from found
+
+    def save(self, out_path: str, translation: Callable[[], str | None], target_lang: str) -> None:
+        def _on_block(el) -> None:
+            for p in story_paragraphs(el, DRAWING):
+                markup = translation()
+                if markup is not None:
+                    apply_translation(p, markup, DRAWING)
+
+        def _rewrite(fin, fout) -> None:
+            stream_part(fin, _on_block, fout)
+
+        rewrite_zip(self.path, out_path, {name: _rewrite for name in self.part_names})
@@ -0,0 +1,69 @@
+# backend/app/utils/formats/txt.py
+"""
+Texto puro: uma linha por segmento. Quebras de linha, indentação e
+espaços nas pontas são preservados. A entrada é lida como UTF-8 (com ou
+sem BOM) ou, se não for UTF-8 válido, Latin-1; a saída é sempre UTF-8 (com
+BOM só se a entrada tinha), já que a tradução pode ter caracteres que o
+Latin-1 não representa.
+"""
+from __future__ import annotations
+
+from typing import Callable, Iterator
+
+from app.utils.formats import register
+from app.utils.inline_tags import Segment, plain_segment, strip_tags
+
+
+def _detect_encoding(path: str) -> str:
+    with open(path, "rb") as f:
+        head = f.read(3)
+    try:
+        # leitura em streaming só para validar o UTF-8
+        with open(path, encoding="utf-8", errors="strict") as t:
+            for _ in t:
+                pass
+    except UnicodeDecodeError:
+        return "latin-1"
+    return "utf-8-sig" if head == b"\xef\xbb\xbf" else "utf-8"
+
+
+def _split_line(line: str) -> tuple[str, str, str]:
+    """(espaço inicial, conteúdo, espaço final + quebra de linha)."""
+    body = line.rstrip("\r\n")
+    ending = line[len(body):]
+    core = body.strip()
+    if not core:
+        return body, "", ending
+    lead = body[: len(body) - len(body.lstrip())]
+    trail = body[len(body.rstrip()):]
+    return lead, core, trail + ending
+
+
+@register(".txt", mimetype="text/plain", signature="text")
+class TextFile:
+    parts = 1
+
+    def __init__(self, path: str):
+        self.path = path
+        self.encoding = _detect_encoding(path)
+
+    @property
+    def _out_encoding(self) -> str:
+        return "utf-8-sig" if self.encoding == "utf-8-sig" else "utf-8"
+
+    def _lines(self):
+        return open(self.path, encoding=self.encoding, newline="")
+
+    def iter_segments(self) -> Iterator[Segment]:
+        with self._lines() as f:
+            for line in f:
+                yield plain_segment(_split_line(line)[1])
+
+    def save(self, out_path: str, translation: Callable[[], str | None], target_lang: str) -> None:
+        with self._lines() as fin, open(out_path, "w", encoding=self._out_encoding, newline="") as fout:
+            for line in fin:
+                lead, core, trail = _split_line(line)
+                markup = translation()
+                if markup is not None:
+                    core = strip_tags(markup).strip()
+                fout.write(lead + core + trail)
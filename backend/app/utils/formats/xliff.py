@@ -0,0 +1,178 @@
+# backend/app/utils/formats/xliff.py
+"""
+XLIFF 1.2 e 2.0 (exportados por ferramentas de CAT).
+
+Cada <source> vira um segmento: códigos inline em par (<g>, <pc>, <mrk>)
+viram <gN>…</gN> e os isolados (<x/>, <ph/>, <bx/>, <sc/>...) viram <xN/>;
+a tradução volta como <target> com os mesmos códigos. Unidades que já têm
+<target> preenchido (revisadas) e as marcadas translate="no" ficam como
+estão — dá para reimportar um arquivo revisado sem retraduzir nada.
+"""
+from __future__ import annotations
+
+import copy
+from typing import Callable, Iterator
+
+from lxml import etree
+
+from app.utils.formats import register
+from app.utils.inline_tags import Segment, escape_text, strip_tags, tokenize
+
+_NS12 = "urn:oasis:names:tc:xliff:document:1.2"
+_NS20 = "urn:oasis:names:tc:xliff:document:2.0"
+_PAIRED = {"g", "pc", "mrk"}
+
+
+def _local(el) -> str:
+    return etree.QName(el).localname
+
+
+class _Unit:
+    """Par source/target de uma trans-unit (1.2) ou segment (2.0)."""
+
+    def __init__(self, holder, ns: str):
+        self.holder = holder
+        self.source = holder.find(f"{{{ns}}}source")
+        self.target = holder.find(f"{{{ns}}}target")
+        self.ns = ns
+
+    def pending(self) -> bool:
+        if self.source is None:
+            return False
+        return self.target is None or not "".join(self.target.itertext()).strip()
+
+
+def _inline_table(source) -> dict[int, object]:
+    table: dict[int, object] = {}
+
+    def walk(el) -> None:
+        for child in el:
+            if not isinstance(child.tag, str):
+                continue
+            table[len(table) + 1] = child
+            if _local(child) in _PAIRED:
+                walk(child)
+
+    walk(source)
+    return table
+
+
+def _to_markup(source) -> str:
+    ids = {id(el): n for n, el in _inline_table(source).items()}
+    parts: list[str] = []
+
+    def walk(el) -> None:
+        if el.text:
+            parts.append(escape_text(el.text))
+        for child in el:
+            if isinstance(child.tag, str):
+                n = ids[id(child)]
+                if _local(child) in _PAIRED:
+                    parts.append(f"<g{n}>")
+                    walk(child)
+                    parts.append(f"</g{n}>")
+                else:
+                    parts.append(f"<x{n}/>")
+            if child.tail:
+                parts.append(escape_text(child.tail))
+
+    walk(source)
+    return "".join(parts)
+
+
+def _append_text(el, text: str) -> None:
+    if len(el):
+        el[-1].tail = (el[-1].tail or "") + text
+    else:
+        el.text = (el.text or "") + text
+
+
+def _build_target(unit: _Unit, markup: str) -> None:
+    table = _inline_table(unit.source)
+    if unit.target is None:
+        unit.target = etree.Element(f"{{{unit.ns}}}target")
+        unit.target.tail = unit.source.tail
+        unit.source.addnext(unit.target)
+    target = unit.target
+    for child in list(target):
+        target.remove(child)
+    target.text = None
+
+    stack = [target]
+    used: set[int] = set()
+    for kind, val in tokenize(markup):
+        cur = stack[-1]
+        if kind == "text":
+            _append_text(cur, val)
+        elif kind == "open":
+            el = table.get(val)
+            if el is not None and _local(el) in _PAIRED:
+                stack.append(etree.SubElement(cur, el.tag, attrib=dict(el.attrib)))
+        elif kind == "close":
+            if len(stack) > 1:
+                stack.pop()
+        elif kind == "atom":
+            el = table.get(val)
+            if el is not None and val not in used:
+                used.add(val)
+                atom = copy.deepcopy(el)
+                atom.tail = None
+                cur.append(atom)
+    # códigos isolados que a tradução perdeu vão para o fim
+    for n, el in table.items():
+        if n not in used and _local(el) not in _PAIRED:
+            atom = copy.deepcopy(el)
+            atom.tail = None
+            target.append(atom)
+
+
+def _pending_units(tree, ns: str) -> list[_Unit]:
+    """Unidades a traduzir, em ordem de documento."""
+    if ns == _NS12:
+        holders = [tu for tu in tree.iter(f"{{{ns}}}trans-unit") if tu.get("translate", "yes") != "no"]
+    else:
+        holders = [
+            seg
+            for unit in tree.iter(f"{{{ns}}}unit")
+            if unit.get("translate", "yes") != "no"
+            for seg in unit.iter(f"{{{ns}}}segment")
+        ]
+    return [u for u in (_Unit(h, ns) for h in holders) if u.pending()]
+
+
+@register(".xlf", ".xliff", mimetype="application/xliff+xml", signature="xml")
+class XliffFile:
+    parts = 1
+
+    def __init__(self, path: str):
+        self.path = path
+        self.tree = etree.parse(path)
+        root = self.tree.getroot()
+        ns = etree.QName(root).namespace
+        if ns not in (_NS12, _NS20):
+            raise ValueError("not an XLIFF 1.2/2.0 file")
+        self.ns = ns
+
+    def iter_segments(self) -> Iterator[Segment]:
+        for u in _pending_units(self.tree, self.ns):
+            markup = _to_markup(u.source)
+            yield Segment(markup, strip_tags(markup))
+
+    def save(self, out_path: str, translation: Callable[[], str | None], target_lang: str) -> None:
+        tree = copy.deepcopy(self.tree)
+        root = tree.getroot()
+        if self.ns == _NS12:
+            for f in root.iter(f"{{{self.ns}}}file"):
+                f.set("target-language", target_lang)
+        else:
+            root.set("trgLang", target_lang)
+
+        for u in _pending_units(tree, self.ns):
+            markup = translation()
+            _build_target(u, markup if markup is not None else _to_markup(u.source))
+            # sem tradução (copiado da origem) a unidade continua pendente para o revisor
+            if self.ns == _NS12:
+                u.target.set("state", "translated" if markup is not None else "needs-translation")
+            else:
+                u.holder.set("state", "translated" if markup is not None else "initial")
+        tree.write(out_path, xml_declaration=True, encoding="UTF-8")
@@ -0,0 +1,75 @@
+# backend/app/utils/formats/xlsx.py
+"""
+XLSX: o texto das células fica na tabela de shared strings
+(xl/sharedStrings.xml), onde cada string aparece uma vez só por mais
+células que a usem — então é traduzida uma vez. Planilhas geradas por
+bibliotecas costumam gravar o texto direto na célula (t="inlineStr");
+essas células também são traduzidas. Rich text (runs com formatação) vira
+tags inline como no DOCX. Fórmulas e números não são tocados.
+"""
+from __future__ import annotations
+
+import zipfile
+from typing import Callable, Iterator
+
+from app.utils.docx_segments import SHEET, apply_translation, extract_segment
+from app.utils.formats import register
+from app.utils.formats.ooxml import part_names, rewrite_zip, stream_part
+from app.utils.inline_tags import Segment
+
+_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_SI = f"{{{_MAIN}}}si"
+_INLINE = f"{{{_MAIN}}}c[@t='inlineStr']/{{{_MAIN}}}is"
+# nas planilhas, cada <row> de <sheetData> é um bloco folha
+_CONTAINERS = frozenset({f"{{{_MAIN}}}sheetData"})
+_TEXT_TYPES = ("spreadsheetml.sharedStrings+xml", "spreadsheetml.worksheet+xml")
+
+
+def _is_text_part(ctype: str) -> bool:
+    return ctype.endswith(_TEXT_TYPES)
+
+
+def _strings(block) -> list:
+    """Itens de texto do bloco: o próprio <si> ou os <is> das células inline da linha."""
+    if block.tag == _SI:
+        return [block]
+    return block.findall(_INLINE)
+
+
+@register(
+    ".xlsx",
+    mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    signature="zip",
+)
+class XlsxWorkbook:
+    def __init__(self, path: str):
+        self.path = path
+        with zipfile.ZipFile(path) as zf:
+            if "[Content_Types].xml" not in zf.NameToInfo:
+                raise ValueError("not an XLSX package")
+            self.part_names = part_names(zf, _is_text_part)
+        self.parts = len(self.part_names)
+
+    def iter_segments(self) -> Iterator[Segment]:
+        with zipfile.ZipFile(self.path) as zf:
+            for name in self.part_names:
+                found: list[Segment] = []
+                with zf.open(name) as fp:
+                    stream_part(
+                        fp,
+                        lambda el: found.extend(extract_segment(s, SHEET) for s in _strings(el)),
+                        containers=_CONTAINERS,
+                    )
+                yield from found
+
+    def save(self, out_path: str, translation: Callable[[], str | None], target_lang: str) -> None:
+        def _on_block(el) -> None:
+            for s in _strings(el):
+                markup = translation()
+                if markup is not None:
+                    apply_translation(s, markup, SHEET)
+
+        def _rewrite(fin, fout) -> None:
+            stream_part(fin, _on_block, fout, containers=_CONTAINERS)
+
+        rewrite_zip(self.path, out_path, {name: _rewrite for name in self.part_names})
@@ -0,0 +1,90 @@
+# backend/app/utils/glossary_cache.py
+"""
+Cache de glossários compilados (GlossaryMatcher) por processo.
+
+A chave é (glossary_id, version): cada job faz só uma consulta de 1 linha
+para ler a versão; os termos só são recarregados e recompilados quando o
+glossário muda (bump_version em import/edição) — inclusive em outros
+processos, que enxergam a versão nova no banco.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from sqlalchemy import func, update
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.extensions import db
+from app.models import Glossary, GlossaryTerm
+from app.utils.glossary_matcher import GlossaryMatcher
+
+GLOSSARY_CACHE_SIZE = int(os.getenv("GLOSSARY_CACHE_SIZE", "32"))
+
+_lock = threading.Lock()
+_cache: OrderedDict[int, tuple[int, GlossaryMatcher]] = OrderedDict()
+
+
+def get_matcher(glossary_id: int | None) -> GlossaryMatcher | None:
+    """Matcher compilado do glossário (None se não existir)."""
+    if not glossary_id:
+        return None
+    row = (
+        db.session.query(Glossary.version, Glossary.locale_src, Glossary.locale_dst)
+        .filter(Glossary.id == glossary_id)
+        .first()
+    )
+    if row is None:
+        return None
+    version, locale_src, locale_dst = row
+
+    with _lock:
+        hit = _cache.get(glossary_id)
+        if hit and hit[0] == version:
+            _cache.move_to_end(glossary_id)
+            return hit[1]
+
+    rows = (
+        db.session.query(GlossaryTerm.src, GlossaryTerm.dst)
+        .filter(GlossaryTerm.glossary_id == glossary_id)
+        .all()
+    )
+    matcher = GlossaryMatcher(
+        {src: dst for src, dst in rows}, key=(glossary_id, version), locales=(locale_src, locale_dst)
+    )
+
+    with _lock:
+        cur = _cache.get(glossary_id)
+        if not cur or cur[0] <= version:
+            _cache[glossary_id] = (version, matcher)
+            _cache.move_to_end(glossary_id)
+        while len(_cache) > GLOSSARY_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return matcher
+
+
+def invalidate(glossary_id: int) -> None:
+    with _lock:
+        _cache.pop(glossary_id, None)
+
+
+def bump_version(g: Glossary) -> int:
+    """
+    Marca o glossário como alterado (chamar na mesma transação da edição).
+    O incremento é feito no banco: a linha fica travada até o commit, então
+    duas edições concorrentes nunca terminam com a mesma versão.
+    """
+    now = datetime.utcnow()
+    version = db.session.execute(
+        update(Glossary)
+        .where(Glossary.id == g.id)
+        .values(version=func.coalesce(Glossary.version, 0) + 1, updated_at=now)
+        .returning(Glossary.version)
+        .execution_options(synchronize_session=False)
+    ).scalar_one()
+    set_committed_value(g, "version", version)
+    set_committed_value(g, "updated_at", now)
+    invalidate(g.id)
+    return version
@@ -1,28 +1,20 @@
-from collections import defaultdict
+from collections import Counter
 from docx import Document
 
+from app.utils.glossary_matcher import GlossaryMatcher
 
-def enforce_glossary(input_docx: str, output_docx: str, glossary_map: dict[str, str]) -> dict:
+
+def enforce_glossary(input_docx: str, output_docx: str, glossary_map: "dict[str, str] | GlossaryMatcher") -> dict:
     """Simple DOCX→DOCX pass: replaces occurrences from glossary_map (src→dst),
-    case-insensitive, returns basic metrics.
+    case-insensitive (whole words, longest term wins, case preserved), returns
+    basic metrics. Accepts a pre-built GlossaryMatcher to reuse across calls.
     """
     doc = Document(input_docx)
-    replacements = defaultdict(int)
+    replacements = Counter()
+    matcher = glossary_map if isinstance(glossary_map, GlossaryMatcher) else GlossaryMatcher(glossary_map)
+
     def replace_in_run(run_text: str) -> str:
-        new_text = run_text
-        for src, dst in glossary_map.items():
-            if not src:
-                continue
-            # naive case-insensitive replace preserving basic case
-            new_text_lower = new_text.lower()
-            src_lower = src.lower()
-            if src_lower in new_text_lower:
-                count = new_text_lower.count(src_lower)
-                replacements[src] += count
-                new_text = new_text.replace(src, dst)
-                new_text = new_text.replace(src.capitalize(), dst)
-                new_text = new_text.replace(src.upper(), dst.upper())
-        return new_text
+        return matcher.replace(run_text, replacements)
 
 
     for para in doc.paragraphs:
@@ -41,4 +33,4 @@ def enforce_glossary(input_docx: str, output_docx: str, glossary_map: dict[str,
     doc.save(output_docx)
 
     metrics = {"replacements": dict(replacements), "unique_terms": len(replacements)}
-    return metrics
\ No newline at end of file
+    return metrics
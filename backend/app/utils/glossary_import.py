@@ -0,0 +1,92 @@
+# backend/app/utils/glossary_import.py
+"""
+Import de glossário em streaming: lê o CSV aos poucos e grava em lotes com
+INSERT ... ON CONFLICT (glossary_id, src) DO UPDATE. A memória usada
+depende do tamanho do lote, não do tamanho do arquivo.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import os
+
+from sqlalchemy import literal_column
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.extensions import db
+from app.models import GlossaryTerm
+
+IMPORT_BATCH_SIZE = int(os.getenv("GLOSSARY_IMPORT_BATCH_SIZE", "5000"))
+
+MAX_TERM_LENGTH = GlossaryTerm.__table__.c.src.type.length  # 400
+
+
+class CsvImportError(ValueError):
+    """CSV inválido (ex.: sem as colunas src/dst)."""
+
+
+def term_error(src: str, dst: str, notes: str | None = None) -> str | None:
+    """Motivo para recusar o termo (já sem espaços nas pontas), ou None se ele cabe no banco."""
+    if not src or not dst:
+        return "src and dst are required"
+    if len(src) > MAX_TERM_LENGTH or len(dst) > MAX_TERM_LENGTH:
+        return f"terms are limited to {MAX_TERM_LENGTH} characters"
+    if "\x00" in src or "\x00" in dst or (notes and "\x00" in notes):
+        # text do Postgres não guarda NUL (o csv do 3.11+ aceita)
+        return "terms cannot contain NUL characters"
+    return None
+
+
+def _flush(glossary_id: int, batch: dict[str, tuple[str, str | None]], stats: dict) -> None:
+    if not batch:
+        return
+    table = GlossaryTerm.__table__
+    stmt = pg_insert(table).values(
+        [{"glossary_id": glossary_id, "src": src, "dst": dst, "notes": notes} for src, (dst, notes) in batch.items()]
+    )
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_glossary_src",
+        set_={"dst": stmt.excluded.dst, "notes": stmt.excluded.notes},
+    ).returning(literal_column("(xmax = 0)").label("inserted"))  # xmax = 0 => linha nova
+
+    for (inserted,) in db.session.execute(stmt):
+        stats["inserted" if inserted else "updated"] += 1
+    batch.clear()
+
+
+def import_terms_csv(glossary_id: int, stream, batch_size: int | None = None) -> dict:
+    """
+    Importa termos (colunas src, dst e opcionalmente notes) de um stream
+    binário. Não faz commit. Devolve contagens: inserted, updated, rejected
+    (linhas inválidas) e duplicates (src repetido dentro do mesmo lote).
+    """
+    size = batch_size or IMPORT_BATCH_SIZE
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", errors="strict", newline="")
+    reader = csv.DictReader(text)
+    stats = {"inserted": 0, "updated": 0, "rejected": 0, "duplicates": 0}
+    batch: dict[str, tuple[str, str | None]] = {}
+    try:
+        fields = {(f or "").strip().lower() for f in (reader.fieldnames or [])}
+        if not {"src", "dst"} <= fields:
+            raise CsvImportError("csv must have 'src' and 'dst' columns")
+
+        for row in reader:
+            row = {(k or "").strip().lower(): v for k, v in row.items()}
+            src = (row.get("src") or "").strip()
+            dst = (row.get("dst") or "").strip()
+            notes = (row.get("notes") or "").strip() or None
+            if term_error(src, dst, notes):
+                stats["rejected"] += 1
+                continue
+            if src in batch:
+                stats["duplicates"] += 1  # o último vence (o ON CONFLICT não aceita 2x a mesma linha)
+            batch[src] = (dst, notes)
+            if len(batch) >= size:
+                _flush(glossary_id, batch, stats)
+    except UnicodeDecodeError as e:
+        raise CsvImportError("csv must be UTF-8") from e
+    except csv.Error as e:
+        # ex.: byte NUL, campo acima de csv.field_size_limit()
+        raise CsvImportError(f"invalid csv (line {reader.line_num}): {e}") from e
+    _flush(glossary_id, batch, stats)
+    return stats
@@ -0,0 +1,121 @@
+# backend/app/utils/glossary_matcher.py
+"""
+Glossário compilado: acha todos os termos numa única passada pelo texto.
+
+Os termos viram um trie e o trie vira uma única regex (prefixos comuns
+fatorados), então o custo é ~O(tamanho do texto) e não O(termos × texto).
+Regras: o termo mais longo vence, só casa palavra inteira e a caixa do
+trecho original é preservada (TUDO MAIÚSCULO / Inicial maiúscula).
+"""
+from __future__ import annotations
+
+import re
+from collections import Counter
+
+
+def _trie_pattern(node: dict) -> str:
+    """Converte o trie em regex; '' marca fim de termo."""
+    terminal = "" in node
+    branches = []
+    for ch in sorted(k for k in node if k != ""):
+        child = node[ch]
+        # comprime cadeias sem ramificação num literal só
+        lit = re.escape(ch)
+        while len(child) == 1 and "" not in child:
+            (nxt, child), = child.items()
+            lit += re.escape(nxt)
+        branches.append(lit + _trie_pattern(child))
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if terminal:
+        # opcional guloso: tenta o termo mais longo antes de parar aqui
+        return body + "?" if len(branches) == 1 and len(body) == 1 else f"(?:{body})?"
+    return body
+
+
+def _match_case(found: str, dst: str) -> str:
+    if found.isupper() and any(c.isalpha() for c in found):
+        return dst.upper()
+    if found[:1].isupper() and not dst[:1].isupper():
+        return dst[:1].upper() + dst[1:]
+    return dst
+
+
+def _same_locale(a: str, b: str) -> bool:
+    """Mesmo idioma (pt-BR ~ pt); se os dois trazem região, ela também precisa bater."""
+    a_lang, _, a_region = a.replace("_", "-").lower().partition("-")
+    b_lang, _, b_region = b.replace("_", "-").lower().partition("-")
+    return a_lang == b_lang and (not a_region or not b_region or a_region == b_region)
+
+
+class GlossaryMatcher:
+    """
+    Compile uma vez por glossário e reutilize em todos os runs, parágrafos e
+    idiomas de destino (é imutável e thread-safe).
+    """
+
+    def __init__(
+        self,
+        glossary: dict[str, str],
+        whole_words: bool = True,
+        key: tuple | None = None,
+        locales: tuple[str, str] | None = None,
+    ):
+        self.key = key  # (glossary_id, version) quando vem do banco
+        self.locales = locales  # (locale_src, locale_dst); None = vale para qualquer par
+        self.exact: dict[str, str] = {}
+        self.folded: dict[str, tuple[str, str]] = {}  # lower(src) -> (src, dst)
+        root: dict = {}
+        for src, dst in (glossary or {}).items():
+            if not src or dst is None:
+                continue
+            self.exact[src] = dst
+            key = src.lower()
+            self.folded.setdefault(key, (src, dst))
+            node = root
+            for ch in key:
+                node = node.setdefault(ch, {})
+            node[""] = True
+
+        self.size = len(self.exact)
+        if not self.size:
+            self._re = None
+            return
+        body = _trie_pattern(root)
+        if whole_words:
+            body = rf"(?<!\w)(?:{body})(?!\w)"
+        self._re = re.compile(body, re.IGNORECASE)
+
+    def __bool__(self) -> bool:
+        return self._re is not None
+
+    def applies_to(self, source_lang: str, target_lang: str) -> bool:
+        """True se o glossário foi feito para este par de idiomas."""
+        if not self.locales:
+            return True
+        src, dst = self.locales
+        return _same_locale(src, source_lang or "") and _same_locale(dst, target_lang or "")
+
+    def _resolve(self, found: str) -> tuple[str, str]:
+        """(termo de origem, texto de destino com a caixa ajustada)."""
+        if found in self.exact:
+            return found, self.exact[found]
+        src, dst = self.folded.get(found.lower(), (found, found))
+        return src, _match_case(found, dst)
+
+    def sub(self, text: str, repl) -> str:
+        """Troca cada termo encontrado por `repl(src, dst)` numa passada."""
+        if not text or self._re is None:
+            return text
+        return self._re.sub(lambda m: repl(*self._resolve(m.group(0))), text)
+
+    def replace(self, text: str, counts: Counter | None = None) -> str:
+        """Substitui todos os termos numa passada; `counts[src]` += ocorrências."""
+
+        def _sub(src: str, dst: str) -> str:
+            if counts is not None:
+                counts[src] += 1
+            return dst
+
+        return self.sub(text, _sub)
@@ -0,0 +1,69 @@
+# backend/app/utils/glossary_protect.py
+"""
+Proteção de termos de glossário antes da tradução.
+
+Cada termo de origem encontrado vira um placeholder estável (⟦0⟧, ⟦1⟧, ...)
+que os provedores copiam como está; depois da tradução o placeholder é
+trocado pelo termo de destino. A terminologia sai certa numa passada só,
+sem varrer o texto traduzido procurando termos de origem.
+
+Os segmentos chegam marcados (ver inline_tags): só o texto fora das tags
+é mascarado, e o termo de destino volta escapado.
+"""
+from __future__ import annotations
+
+import re
+from typing import NamedTuple
+
+from app.utils.glossary_matcher import GlossaryMatcher
+from app.utils.inline_tags import escape_text, split_markup, strip_tags, unescape_text
+
+_OPEN, _CLOSE = "⟦", "⟧"
+# tolerante a espaços que alguns provedores inserem dentro dos colchetes
+_PLACEHOLDER_RE = re.compile(rf"{_OPEN}\s*(\d+)\s*{_CLOSE}")
+
+
+class Protected(NamedTuple):
+    text: str         # texto com placeholders (é o que vai ao provedor e à TM)
+    terms: list[str]  # terms[n] = termo de destino do placeholder ⟦n⟧
+
+
+def protect(text: str, matcher: GlossaryMatcher) -> Protected:
+    """Mascara os termos do glossário; numeração por segmento (chave de TM estável)."""
+    if not matcher or not text or _OPEN in text:
+        return Protected(text, [])
+    terms: list[str] = []
+
+    def _mask(src: str, dst: str) -> str:
+        terms.append(dst)
+        return f"{_OPEN}{len(terms) - 1}{_CLOSE}"
+
+    parts = split_markup(text)
+    for k in range(0, len(parts), 2):  # posições pares = texto fora das tags
+        raw = unescape_text(parts[k])
+        masked = matcher.sub(raw, _mask)
+        if masked != raw:
+            parts[k] = escape_text(masked)
+    return Protected("".join(parts), terms)
+
+
+def only_placeholders(text: str) -> bool:
+    """True se não sobra nada a traduzir além dos termos (resolve sem o provedor)."""
+    return not any(c.isalpha() for c in strip_tags(_PLACEHOLDER_RE.sub("", text)))
+
+
+def restore(text: str, terms: list[str]) -> tuple[str, int]:
+    """Troca os placeholders pelos termos de destino; devolve (texto, termos perdidos)."""
+    if not terms:
+        return text, 0
+    seen: set[int] = set()
+
+    def _unmask(m: re.Match) -> str:
+        n = int(m.group(1))
+        if n >= len(terms):
+            return m.group(0)
+        seen.add(n)
+        return escape_text(terms[n])
+
+    out = _PLACEHOLDER_RE.sub(_unmask, text)
+    return out, len(terms) - len(seen)
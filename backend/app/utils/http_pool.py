@@ -0,0 +1,71 @@
+# backend/app/utils/http_pool.py
+"""
+Clientes HTTP compartilhados por provedor de tradução.
+
+Cada provedor tem uma requests.Session própria (keep-alive, pool de conexões
+reaproveitado entre lotes, jobs e threads) e um semáforo que limita quantas
+requisições ficam em voo ao mesmo tempo no processo.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from contextlib import contextmanager
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Máximo de requisições simultâneas por provedor (override: OPENAI_MAX_CONCURRENCY etc.)
+PROVIDER_MAX_CONCURRENCY = int(os.getenv("PROVIDER_MAX_CONCURRENCY", "4"))
+
+_lock = threading.Lock()
+_sessions: dict[str, requests.Session] = {}
+_slots: dict[str, threading.BoundedSemaphore] = {}
+
+
+def max_concurrency(provider: str) -> int:
+    raw = os.getenv(f"{provider.upper()}_MAX_CONCURRENCY")
+    return max(int(raw), 1) if raw else max(PROVIDER_MAX_CONCURRENCY, 1)
+
+
+def get_session(provider: str) -> requests.Session:
+    """Session keep-alive do provedor (criada na primeira chamada)."""
+    with _lock:
+        s = _sessions.get(provider)
+        if s is None:
+            size = max_concurrency(provider)
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=size, pool_block=True)
+            s = requests.Session()
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            _sessions[provider] = s
+        return s
+
+
+class SlotTimeout(TimeoutError):
+    """Nenhuma vaga do provedor liberou dentro do tempo pedido."""
+
+
+@contextmanager
+def provider_slot(provider: str, timeout: float | None = None):
+    """
+    Ocupa uma das `max_concurrency(provider)` vagas de requisição em voo,
+    esperando no máximo `timeout` segundos (None = sem limite).
+    """
+    with _lock:
+        sem = _slots.get(provider)
+        if sem is None:
+            sem = _slots[provider] = threading.BoundedSemaphore(max_concurrency(provider))
+    if not sem.acquire(timeout=None if timeout is None else max(timeout, 0.0)):
+        raise SlotTimeout(f"{provider}: no free request slot")
+    try:
+        yield
+    finally:
+        sem.release()
+
+
+def close_all() -> None:
+    with _lock:
+        for s in _sessions.values():
+            s.close()
+        _sessions.clear()
@@ -0,0 +1,77 @@
+# backend/app/utils/inline_tags.py
+"""
+Marcação inline dos segmentos enviados aos provedores.
+
+O texto vai escapado como XML (&amp; &lt; &gt;) e a formatação vira tags
+neutras: <gN>...</gN> para um trecho com formatação própria (negrito,
+link, ...) e <xN/> para um objeto inline sem texto (quebra, tab, nota de
+rodapé, imagem). DeepL (tag_handling=xml), Azure (textType=html) e o
+prompt da OpenAI preservam essas tags; o tokenizer da volta é tolerante a
+tags desconhecidas ou desbalanceadas.
+"""
+from __future__ import annotations
+
+import html
+import re
+from typing import NamedTuple
+from xml.sax.saxutils import escape
+
+TAG_RE = re.compile(r"<(/?)([gx])(\d+)\s*(/?)>")
+
+
+class Segment(NamedTuple):
+    markup: str  # texto escapado com tags inline (vai ao provedor)
+    plain: str   # texto puro (filtro, progresso)
+
+
+def plain_segment(text: str) -> Segment:
+    """Segmento de texto sem formatação (TXT, XLIFF sem tags...)."""
+    return Segment(escape_text(text), text)
+
+
+def escape_text(text: str) -> str:
+    return escape(text)
+
+
+def unescape_text(text: str) -> str:
+    # html.unescape também aceita texto que voltou sem escape (ex.: "&" cru)
+    return html.unescape(text)
+
+
+def strip_tags(markup: str) -> str:
+    """Texto puro de um segmento marcado."""
+    return unescape_text(TAG_RE.sub("", markup))
+
+
+def split_markup(markup: str) -> list[str]:
+    """Alterna [texto, tag, texto, tag, ..., texto] (texto ainda escapado)."""
+    out, pos = [], 0
+    for m in TAG_RE.finditer(markup):
+        out.append(markup[pos:m.start()])
+        out.append(m.group(0))
+        pos = m.end()
+    out.append(markup[pos:])
+    return out
+
+
+def tokenize(markup: str) -> list[tuple[str, object]]:
+    """
+    Tokens da tradução: ("text", str já sem escape), ("open", n), ("close", n)
+    e ("atom", n).
+    """
+    tokens: list[tuple[str, object]] = []
+    pos = 0
+    for m in TAG_RE.finditer(markup):
+        if m.start() > pos:
+            tokens.append(("text", unescape_text(markup[pos:m.start()])))
+        closing, kind, n, selfclosing = m.groups()
+        if kind == "x":
+            tokens.append(("atom", int(n)))
+        elif closing:
+            tokens.append(("close", int(n)))
+        elif not selfclosing:
+            tokens.append(("open", int(n)))
+        pos = m.end()
+    if pos < len(markup):
+        tokens.append(("text", unescape_text(markup[pos:])))
+    return tokens
@@ -0,0 +1,369 @@
+# backend/app/utils/job_queue.py
+"""
+Fila de jobs apoiada nas próprias tabelas do Postgres (sem serviço extra).
+
+A API grava cada destino (JobTarget) como 'queued' e retorna na hora; os
+workers (processo separado, ver worker.py) reivindicam destinos com
+SELECT ... FOR UPDATE SKIP LOCKED e mantêm um lease renovado por heartbeat.
+Se um worker morrer, o lease vence e o destino volta a ser elegível.
+"""
+from __future__ import annotations
+
+import logging
+import multiprocessing as mp
+import os
+import signal
+import socket
+import threading
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import and_, or_, update
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm.exc import ObjectDeletedError
+
+from app.extensions import db
+from app.models import Job, JobFile, JobTarget, Metric
+from app.paths import OUTPUT_DIR
+from app.utils.content_store import reuse_key, target_glossary_key
+from app.utils.docx_pipeline import run_to_many
+from app.utils.glossary_cache import get_matcher
+from app.utils.progress import ProgressReporter, job_snapshot, publish
+from app.utils.segment_reuse import PAIRS_SUFFIX, pairs_path
+from app.utils.storage import get_storage
+from app.utils.translation_memory import TranslationMemory
+from app.utils.translator import provider_key
+
+log = logging.getLogger(__name__)
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _lease_delta() -> timedelta:
+    return timedelta(seconds=current_app.config["JOB_LEASE_SECONDS"])
+
+
+def refresh_job_status(job_id: int) -> None:
+    """Recalcula o status agregado do Job a partir dos seus destinos."""
+    job = db.session.get(Job, job_id)
+    statuses = {s for (s,) in db.session.query(JobTarget.status).filter(JobTarget.job_id == job_id)}
+    if not job or not statuses:
+        return
+
+    if statuses == {"done"}:
+        job.status = "done"
+    elif statuses == {"failed"}:
+        job.status = "failed"
+    elif statuses == {"queued"}:
+        job.status = "queued"
+    elif statuses & {"queued", "processing"}:
+        job.status = "processing"
+    else:
+        job.status = "mixed"
+    job.updated_at = datetime.utcnow()
+
+
+def _eligible(now: datetime):
+    # 'queued' ou 'processing' com lease vencido (worker caiu)
+    return or_(
+        JobTarget.status == "queued",
+        # sem lease: destinos 'processing' de antes da migração do lease
+        and_(
+            JobTarget.status == "processing",
+            or_(JobTarget.lease_expires_at < now, JobTarget.lease_expires_at.is_(None)),
+        ),
+    )
+
+
+def _take(jt: JobTarget, wid: str, now: datetime) -> bool:
+    """Marca o destino como do worker `wid`; False se esgotou as tentativas."""
+    if (jt.attempts or 0) >= current_app.config["JOB_MAX_ATTEMPTS"]:
+        # lease venceu vezes demais: desiste do destino
+        jt.status = "failed"
+        jt.error = jt.error or "worker lease expired too many times"
+        jt.locked_by = None
+        jt.lease_expires_at = None
+        return False
+    jt.status = "processing"
+    jt.attempts = (jt.attempts or 0) + 1
+    jt.locked_by = wid
+    jt.lease_expires_at = now + _lease_delta()
+    return True
+
+
+def claim_next_targets(wid: str) -> list[JobTarget]:
+    """
+    Reivindica o próximo destino livre e, na mesma transação, os demais
+    destinos livres do mesmo job — o documento é lido uma vez só e traduzido
+    para todos eles. Linhas travadas por outro worker são puladas.
+    """
+    while True:
+        now = datetime.utcnow()
+        first = (
+            db.session.query(JobTarget)
+            .filter(_eligible(now))
+            .order_by(JobTarget.id.asc())
+            .with_for_update(skip_locked=True)
+            .first()
+        )
+        if first is None:
+            db.session.rollback()
+            return []
+
+        siblings = (
+            db.session.query(JobTarget)
+            .filter(JobTarget.job_id == first.job_id, JobTarget.id != first.id, _eligible(now))
+            .order_by(JobTarget.id.asc())
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        claimed = [jt for jt in [first, *siblings] if _take(jt, wid, now)]
+        db.session.flush()
+        refresh_job_status(first.job_id)
+        publish_job(first.job_id)
+        db.session.commit()
+        if claimed:
+            return claimed
+
+
+class _Heartbeat(threading.Thread):
+    """Renova o lease dos destinos enquanto o worker trabalha neles."""
+
+    def __init__(self, engine, target_ids: list[int], wid: str, lease: timedelta):
+        super().__init__(daemon=True)
+        self.engine = engine
+        self.target_ids = target_ids
+        self.wid = wid
+        self.lease = lease
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        interval = max(self.lease.total_seconds() / 3, 1.0)
+        table = JobTarget.__table__
+        while not self._stopped.wait(interval):
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(
+                        update(table)
+                        .where(table.c.id.in_(self.target_ids), table.c.locked_by == self.wid)
+                        .values(lease_expires_at=datetime.utcnow() + self.lease)
+                    )
+            except Exception:
+                log.exception("heartbeat falhou para destinos %s", self.target_ids)
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join(timeout=5)
+
+
+def publish_job(job_id: int) -> None:
+    """Notifica (no commit) os clientes SSE do job com o snapshot atual."""
+    try:
+        with db.session.begin_nested():  # falha no NOTIFY não aborta a transação do worker
+            publish(db.session, job_id, "job", job_snapshot(db.session, job_id))
+    except Exception:
+        log.exception("falha ao publicar status do job %s", job_id)
+
+
+def _finish_target(
+    jt: JobTarget, wid: str, result: dict | Exception, out_key: str | None, key: str | None = None
+) -> bool:
+    try:
+        db.session.refresh(jt)
+    except (ObjectDeletedError, InvalidRequestError):
+        # job apagado (delete_job) enquanto o destino era processado
+        log.warning("destino %s removido durante o processamento; descartando resultado", jt.id)
+        return False
+    # se o lease foi perdido (ex.: pausa longa), outro worker já assumiu o destino
+    if jt.locked_by != wid:
+        log.warning("lease do destino %s perdido; descartando resultado", jt.id)
+        return False
+
+    if isinstance(result, Exception):
+        jt.status = "failed"
+        jt.error = str(result)
+    else:
+        jt.status = "done"
+        jt.output_path = out_key  # chave no armazenamento (ver storage.py)
+        jt.error = None
+        jt.reuse_key = key
+        # métricas agregadas ao job (se quiser por destino, adicione job_target_id no modelo Metric)
+        for k, v in (result or {}).items():
+            db.session.add(Metric(job_id=jt.job_id, key=str(k), value=str(v)))
+    jt.locked_by = None
+    jt.lease_expires_at = None
+    return True
+
+
+def process_targets(targets: list[JobTarget], wid: str) -> None:
+    """Executa o pipeline para os destinos (de um mesmo job) já reivindicados."""
+    job_id = targets[0].job_id
+    job = db.session.get(Job, job_id)
+    jf = (
+        db.session.query(JobFile)
+        .filter(JobFile.job_id == job_id)
+        .order_by(JobFile.id.asc())
+        .first()
+    )
+    try:
+        # compilado uma vez por versão do glossário e reaproveitado entre jobs
+        glossary = get_matcher(job.glossary_id if job else None) or {}
+    except Exception:
+        log.exception("falha ao carregar glossário do job %s", job_id)
+        glossary = {}
+    outputs = {
+        jt.target_lang: str(OUTPUT_DIR / f"{job_id}_{jt.target_lang}_{jf.filename if jf else ''}")
+        for jt in targets
+    }
+    storage = get_storage()
+    # atualização de documento: saídas do job anterior, por destino
+    previous_keys = {}
+    if job and job.previous_job_id:
+        for lang, key in db.session.query(JobTarget.target_lang, JobTarget.output_path).filter(
+            JobTarget.job_id == job.previous_job_id,
+            JobTarget.status == "done",
+            JobTarget.target_lang.in_(list(outputs)),
+        ):
+            if key:
+                previous_keys[lang] = key
+
+    hb = _Heartbeat(db.engine, [jt.id for jt in targets], wid, _lease_delta())
+    hb.start()
+    in_path = None
+    previous = {}
+    try:
+        if not job or not jf:
+            raise RuntimeError("job sem arquivo de entrada")
+        # com backend remoto, o worker baixa o upload (e os pares anteriores) para o disco local
+        in_path = storage.fetch(jf.input_path)
+        if not in_path:
+            raise RuntimeError("arquivo de entrada não encontrado no armazenamento")
+        for lang, key in previous_keys.items():
+            local = storage.fetch(pairs_path(key))
+            if local:
+                previous[lang] = local.removesuffix(PAIRS_SUFFIX)
+        results = run_to_many(
+            in_path=in_path,
+            outputs=outputs,
+            glossary=glossary,
+            source_lang=job.source_lang,
+            memory=TranslationMemory(db.engine),
+            progress=ProgressReporter(db.engine, job_id, {jt.target_lang: jt.id for jt in targets}),
+            time_budget=current_app.config["JOB_TIME_BUDGET"] or None,
+            previous=previous,
+        )
+    except Exception as e:
+        log.exception("falha no job %s", job_id)
+        db.session.rollback()
+        results = {lang: e for lang in outputs}
+    finally:
+        hb.stop()
+        # cópias locais baixadas só para este job (no backend local não faz nada)
+        if in_path:
+            storage.release(in_path)
+        for path in previous.values():
+            storage.release(pairs_path(path))
+
+    provider, model = provider_key()
+    for jt in targets:
+        result = results.get(jt.target_lang, RuntimeError("destino não processado"))
+        out_key = None
+        if not isinstance(result, Exception):
+            try:
+                out_path = outputs[jt.target_lang]
+                if os.path.exists(pairs_path(out_path)):
+                    storage.publish(pairs_path(out_path))
+                out_key = storage.publish(out_path)
+            except Exception as e:
+                result = e
+        key = None
+        if isinstance(result, Exception):
+            log.error("destino %s (job %s) falhou: %s", jt.id, job_id, result)
+        elif jf.content_hash and not result.get("failovers") and not result.get("segments_reused"):
+            # saída "pura" do provedor/modelo atual: outros jobs idênticos podem reaproveitar
+            gkey = target_glossary_key(glossary, job.source_lang, jt.target_lang)
+            key = reuse_key(jf.content_hash, job.source_lang, jt.target_lang, gkey, provider, model)
+        _finish_target(jt, wid, result, out_key, key)
+    db.session.flush()
+    refresh_job_status(job_id)
+    publish_job(job_id)
+    db.session.commit()
+
+
+def run_worker(stop: threading.Event) -> None:
+    """Loop de um worker: reivindica, processa, repete até `stop`."""
+    wid = worker_id()
+    poll = current_app.config["WORKER_POLL_SECONDS"]
+    log.info("worker %s iniciado", wid)
+    while not stop.is_set():
+        try:
+            targets = claim_next_targets(wid)
+        except Exception:
+            log.exception("falha ao reivindicar destinos")
+            db.session.rollback()
+            stop.wait(poll)
+            continue
+        if not targets:
+            stop.wait(poll)
+            continue
+        ids = [jt.id for jt in targets]
+        try:
+            process_targets(targets, wid)
+        except Exception:
+            # ex.: job apagado no meio; o lease devolve o destino se ele ainda existir
+            log.exception("falha ao processar destinos %s", ids)
+            db.session.rollback()
+    log.info("worker %s encerrado", wid)
+
+
+def _worker_main() -> None:
+    from app import create_app
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+    app = create_app()
+    with app.app_context():
+        run_worker(stop)
+
+
+def serve(concurrency: int | None = None) -> None:
+    """
+    Sobe um pool de `concurrency` processos worker (WORKER_CONCURRENCY) e os
+    supervisiona: processos que morrem são recriados; SIGTERM/SIGINT encerra
+    todos após terminarem o destino atual.
+    """
+    from app import create_app
+
+    app = create_app()
+    n = max(int(concurrency or app.config["WORKER_CONCURRENCY"]), 1)
+    ctx = mp.get_context("spawn")
+    stopping = threading.Event()
+
+    def _spawn(i: int):
+        p = ctx.Process(target=_worker_main, name=f"translator-worker-{i}")
+        p.start()
+        return p
+
+    def _shutdown(*_):
+        stopping.set()
+
+    signal.signal(signal.SIGTERM, _shutdown)
+    signal.signal(signal.SIGINT, _shutdown)
+
+    procs = [_spawn(i) for i in range(n)]
+    log.info("pool de workers iniciado (%s processos)", n)
+    while not stopping.wait(1.0):
+        for i, p in enumerate(procs):
+            if not p.is_alive():
+                log.warning("worker %s saiu (exit=%s); recriando", p.name, p.exitcode)
+                procs[i] = _spawn(i)
+
+    for p in procs:
+        if p.is_alive():
+            p.terminate()  # SIGTERM => termina o destino atual e sai
+    for p in procs:
+        p.join()
@@ -0,0 +1,327 @@
+# backend/app/utils/progress.py
+"""
+Progresso por destino (segmentos/caracteres/ETA) publicado pelo pipeline.
+
+O worker grava o progresso nas colunas de job_targets (com throttle) e
+avisa os interessados via NOTIFY do Postgres no canal do job; o endpoint
+SSE (GET /api/jobs/<id>/events) repassa os eventos ao cliente, sem polling
+no banco. Cada processo da API tem uma única conexão LISTEN (fora do pool
+da aplicação) que distribui os NOTIFY para as filas dos clientes
+conectados, limitados a SSE_MAX_CLIENTS por processo.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import queue
+import select
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import text, update
+
+from app.models import Job, JobTarget
+
+TERMINAL_STATUSES = ("done", "failed", "mixed")
+
+# clientes SSE simultâneos por processo (cada um ocupa uma thread do servidor)
+SSE_MAX_CLIENTS = int(os.getenv("SSE_MAX_CLIENTS", "200"))
+
+log = logging.getLogger(__name__)
+
+
+class TooManyListeners(RuntimeError):
+    """O processo já atende SSE_MAX_CLIENTS clientes SSE."""
+
+
+def channel_for(job_id: int) -> str:
+    return f"job_progress_{int(job_id)}"
+
+
+def _eta(chars_done: int, chars_total: int, elapsed: float) -> float | None:
+    if not chars_done or elapsed <= 0 or chars_total <= chars_done:
+        return 0.0 if chars_total and chars_done >= chars_total else None
+    return round((chars_total - chars_done) / (chars_done / elapsed), 1)
+
+
+def progress_dict(jt: JobTarget) -> dict:
+    """Progresso de um JobTarget a partir das colunas persistidas."""
+    elapsed = (datetime.utcnow() - jt.started_at).total_seconds() if jt.started_at else 0
+    return {
+        "segments_done": jt.segments_done or 0,
+        "segments_total": jt.segments_total or 0,
+        "chars_done": jt.chars_done or 0,
+        "chars_total": jt.chars_total or 0,
+        "eta_seconds": _eta(jt.chars_done or 0, jt.chars_total or 0, elapsed)
+        if jt.status == "processing"
+        else None,
+    }
+
+
+def job_snapshot(session, job_id: int) -> dict:
+    """Status do job + status/progresso de cada destino (payload dos eventos 'job')."""
+    job = session.get(Job, job_id)
+    targets = (
+        session.query(JobTarget)
+        .filter(JobTarget.job_id == job_id)
+        .order_by(JobTarget.id.asc())
+        .all()
+    )
+    return {
+        "id": job_id,
+        "status": job.status if job else None,
+        "targets": [
+            {
+                "id": t.id,
+                "lang": t.target_lang,
+                "status": t.status,
+                "error": (t.error or "")[:300] or None,  # payload do NOTIFY tem limite de 8000 bytes
+                **progress_dict(t),
+            }
+            for t in targets
+        ],
+    }
+
+
+def publish(conn, job_id: int, event: str, data: dict) -> None:
+    """NOTIFY no canal do job (payload JSON; entregue no commit da transação)."""
+    conn.execute(
+        text("SELECT pg_notify(:ch, :payload)"),
+        {"ch": channel_for(job_id), "payload": json.dumps({"event": event, "data": data}, default=str)},
+    )
+
+
+class ProgressReporter:
+    """
+    Acumula o progresso dos destinos de um job (chamado das threads do
+    pipeline) e persiste/publica no máximo a cada `min_interval` segundos
+    por destino — e sempre ao completar.
+    """
+
+    def __init__(self, engine, job_id: int, target_ids: dict[str, int], min_interval: float = 1.0):
+        self.engine = engine
+        self.job_id = job_id
+        self.target_ids = target_ids
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._state: dict[str, dict] = {}
+
+    def start(self, lang: str, segments_total: int, chars_total: int, segments_done: int = 0, chars_done: int = 0):
+        with self._lock:
+            self._state[lang] = {
+                "segments_total": segments_total,
+                "chars_total": chars_total,
+                "segments_done": segments_done,
+                "chars_done": chars_done,
+                "t0": time.monotonic(),
+                "flushed": 0.0,
+                "first": True,
+            }
+        self._flush(lang, force=True)
+
+    def advance(self, lang: str, segments: int, chars: int) -> None:
+        with self._lock:
+            st = self._state.get(lang)
+            if st is None:
+                return
+            st["segments_done"] += segments
+            st["chars_done"] += chars
+            complete = st["segments_done"] >= st["segments_total"]
+        self._flush(lang, force=complete)
+
+    def _flush(self, lang: str, force: bool = False) -> None:
+        tid = self.target_ids.get(lang)
+        now = time.monotonic()
+        with self._lock:
+            st = self._state.get(lang)
+            if tid is None or st is None or (not force and now - st["flushed"] < self.min_interval):
+                return
+            st["flushed"] = now
+            data = {
+                "id": tid,
+                "lang": lang,
+                "status": "processing",
+                "segments_done": st["segments_done"],
+                "segments_total": st["segments_total"],
+                "chars_done": st["chars_done"],
+                "chars_total": st["chars_total"],
+                "eta_seconds": _eta(st["chars_done"], st["chars_total"], now - st["t0"]),
+            }
+            first = st.pop("first", False)
+
+        values = {k: data[k] for k in ("segments_done", "segments_total", "chars_done", "chars_total")}
+        if first:
+            values["started_at"] = datetime.utcnow()
+        table = JobTarget.__table__
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(update(table).where(table.c.id == tid).values(**values))
+                publish(conn, self.job_id, "progress", data)
+        except Exception:
+            # progresso é informativo: nunca derruba a tradução
+            pass
+
+
+class _Listener(threading.Thread):
+    """
+    Conexão LISTEN do processo: faz LISTEN/UNLISTEN conforme os clientes
+    entram e saem e entrega cada NOTIFY às filas dos clientes do canal.
+    Se a conexão cair, os clientes recebem None (o EventSource reconecta)
+    e o próximo cliente abre um listener novo.
+    """
+
+    def __init__(self, engine):
+        super().__init__(daemon=True, name="sse-listener")
+        raw = engine.raw_connection()
+        # driver_connection antes do detach (depois dele o SQLAlchemy 2 devolve None)
+        self._pg = raw.driver_connection
+        raw.detach()  # não ocupa vaga do pool da aplicação
+        self._raw = raw
+        self._pg.autocommit = True
+        self._lock = threading.Lock()
+        self._subs: dict[str, set[queue.Queue]] = {}
+        self.pid = os.getpid()
+        self.alive = True
+
+    def subscribe(self, channel: str) -> queue.Queue:
+        q: queue.Queue = queue.Queue(maxsize=1000)
+        with self._lock:
+            if not self.alive:
+                raise ConnectionError("listener encerrado")
+            if sum(len(s) for s in self._subs.values()) >= SSE_MAX_CLIENTS:
+                raise TooManyListeners(f"limite de {SSE_MAX_CLIENTS} clientes SSE atingido")
+            subs = self._subs.setdefault(channel, set())
+            if not subs:
+                try:
+                    self._pg.cursor().execute(f"LISTEN {channel}")
+                except Exception as e:
+                    # conexão caída antes de o run() perceber: o próximo cliente abre outra
+                    self.alive = False
+                    del self._subs[channel]
+                    raise ConnectionError("LISTEN falhou") from e
+            subs.add(q)
+        return q
+
+    def unsubscribe(self, channel: str, q: queue.Queue) -> None:
+        with self._lock:
+            subs = self._subs.get(channel)
+            if subs is None:
+                return
+            subs.discard(q)
+            if subs:
+                return
+            del self._subs[channel]
+            if self.alive:
+                try:
+                    self._pg.cursor().execute(f"UNLISTEN {channel}")
+                except Exception:
+                    pass
+
+    def run(self) -> None:
+        try:
+            while True:
+                if select.select([self._pg], [], [], 5.0) == ([], [], []):
+                    continue
+                with self._lock:
+                    self._pg.poll()
+                    notifies = list(self._pg.notifies)
+                    self._pg.notifies.clear()
+                    for n in notifies:
+                        for q in self._subs.get(n.channel, ()):
+                            try:
+                                q.put_nowait(n.payload)
+                            except queue.Full:
+                                pass  # cliente parado: perde eventos intermediários
+        except Exception:
+            log.exception("conexão LISTEN dos eventos SSE caiu")
+        finally:
+            with self._lock:
+                self.alive = False
+                for subs in self._subs.values():
+                    for q in subs:
+                        try:
+                            q.put_nowait(None)
+                        except queue.Full:
+                            pass
+                self._subs.clear()
+            try:
+                self._raw.close()
+            except Exception:
+                pass
+
+
+_listener_lock = threading.Lock()
+_listener: _Listener | None = None
+
+
+def _get_listener(engine) -> _Listener:
+    global _listener
+    with _listener_lock:
+        if _listener is None or not _listener.alive or _listener.pid != os.getpid():
+            try:
+                _listener = _Listener(engine)
+            except Exception as e:
+                raise ConnectionError("sem conexão LISTEN para os eventos") from e
+            _listener.start()
+        return _listener
+
+
+class _EventStream:
+    """Corpo da resposta SSE; `close()` (chamado pelo servidor) libera a inscrição."""
+
+    def __init__(self, listener: _Listener, channel: str, q: queue.Queue, load_snapshot, keepalive: float):
+        self.listener = listener
+        self.channel = channel
+        self.q = q
+        self.load_snapshot = load_snapshot
+        self.keepalive = keepalive
+
+    def __iter__(self):
+        try:
+            snapshot = self.load_snapshot()
+            yield _sse("job", snapshot)
+            if snapshot.get("status") in TERMINAL_STATUSES:
+                return
+            while True:
+                try:
+                    payload = self.q.get(timeout=self.keepalive)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                if payload is None:
+                    return  # listener caiu
+                msg = json.loads(payload)
+                yield _sse(msg["event"], msg["data"])
+                if msg["event"] == "job" and msg["data"].get("status") in TERMINAL_STATUSES:
+                    return
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        self.listener.unsubscribe(self.channel, self.q)
+
+
+def stream_job_events(engine, job_id: int, load_snapshot, keepalive: float = 15.0) -> _EventStream:
+    """
+    Eventos SSE do job: inscreve o cliente no canal (antes de ler o
+    snapshot, sem corrida), envia o snapshot atual e depois cada NOTIFY até
+    o job terminar. `load_snapshot()` devolve {"status": ..., "targets": [...]}.
+    Levanta TooManyListeners, antes de qualquer byte, se o processo já
+    atende SSE_MAX_CLIENTS clientes, e ConnectionError se não há conexão
+    LISTEN (banco fora do ar); nos dois casos o cliente usa o polling.
+    """
+    channel = channel_for(job_id)
+    try:
+        listener = _get_listener(engine)
+        q = listener.subscribe(channel)
+    except ConnectionError:
+        # o listener compartilhado tinha caído: tenta uma vez com uma conexão nova
+        listener = _get_listener(engine)
+        q = listener.subscribe(channel)
+    return _EventStream(listener, channel, q, load_snapshot, keepalive)
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
@@ -0,0 +1,347 @@
+# backend/app/utils/provider_router.py
+"""
+Chamadas resilientes aos provedores de tradução.
+
+Cada provedor tem, por processo (como as sessions do http_pool):
+
+- token bucket: no máximo `{P}_RATE_PER_SEC` requisições por segundo
+  (padrão PROVIDER_RATE_PER_SEC; 0 = sem limite), com rajada `{P}_RATE_BURST`;
+- retries com backoff exponencial + jitter em 429/5xx/erro de rede,
+  respeitando o Retry-After do provedor;
+- circuit breaker: após PROVIDER_BREAKER_FAILURES falhas seguidas o
+  provedor fica aberto por PROVIDER_BREAKER_COOLDOWN segundos e é pulado
+  (ProviderUnavailable na hora, sem rede); depois uma requisição de teste
+  decide se fecha de novo;
+- prazo: cada lote tem PROVIDER_BATCH_DEADLINE segundos (somando retries)
+  e o job pode ter um orçamento total; o prazo vale para a thread (ver
+  deadline_scope) e encurta o timeout das requisições (request_timeout);
+  um timeout que só aconteceu por esse encurtamento é DeadlineExceeded,
+  não uma falha do provedor.
+
+`send(provider, request)` devolve a resposta HTTP quando o provedor
+respondeu de fato (2xx ou erro do cliente, ex. 400) e levanta
+ProviderUnavailable quando não dá para contar com ele — o chamador passa
+para o próximo provedor.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Callable
+
+import requests
+
+from app.utils.http_pool import SlotTimeout, provider_slot
+
+PROVIDER_RATE_PER_SEC = float(os.getenv("PROVIDER_RATE_PER_SEC", "0"))
+PROVIDER_MAX_RETRIES = int(os.getenv("PROVIDER_MAX_RETRIES", "4"))
+PROVIDER_BACKOFF_BASE = float(os.getenv("PROVIDER_BACKOFF_BASE", "0.5"))  # segundos
+PROVIDER_BACKOFF_MAX = float(os.getenv("PROVIDER_BACKOFF_MAX", "30"))
+PROVIDER_BREAKER_FAILURES = int(os.getenv("PROVIDER_BREAKER_FAILURES", "5"))
+PROVIDER_BREAKER_COOLDOWN = float(os.getenv("PROVIDER_BREAKER_COOLDOWN", "30"))
+PROVIDER_TIMEOUT = float(os.getenv("PROVIDER_TIMEOUT", "60"))  # leitura, por requisição
+PROVIDER_CONNECT_TIMEOUT = float(os.getenv("PROVIDER_CONNECT_TIMEOUT", "10"))
+PROVIDER_BATCH_DEADLINE = float(os.getenv("PROVIDER_BATCH_DEADLINE", "180"))  # 0 = sem prazo
+# latências recentes por provedor (base do p95 usado no hedging)
+LATENCY_WINDOW = int(os.getenv("PROVIDER_LATENCY_WINDOW", "200"))
+LATENCY_MIN_SAMPLES = int(os.getenv("PROVIDER_LATENCY_MIN_SAMPLES", "20"))
+
+# vale a pena repetir (sobrecarga/instabilidade passageira)
+_RETRY_STATUS = frozenset({408, 429, 500, 502, 503, 504, 529})
+# não adianta repetir, mas o provedor está inutilizável (chave, cota do DeepL)
+_DOWN_STATUS = frozenset({401, 403, 456})
+
+log = logging.getLogger(__name__)
+
+
+class ProviderUnavailable(Exception):
+    """Provedor fora do ar, sem cota ou com o circuito aberto."""
+
+    def __init__(self, provider: str, reason: str):
+        super().__init__(f"{provider} unavailable: {reason}")
+        self.provider = provider
+        self.reason = reason
+
+
+class DeadlineExceeded(TimeoutError):
+    """Prazo do lote/job esgotado antes de uma resposta."""
+
+
+class TokenBucket:
+    """Limite de taxa: `rate` fichas por segundo, acumulando até `burst`."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: float | None = None) -> bool:
+        """
+        Espera uma ficha; False (sem consumir) se a espera passaria de
+        `timeout` segundos (None = espera o quanto for preciso).
+        """
+        if self.rate <= 0:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            # reserva a ficha já (pode ficar negativo): quem chega depois espera mais
+            wait = (1 - self._tokens) / self.rate if self._tokens < 1 else 0.0
+            if timeout is not None and wait > timeout:
+                return False
+            self._tokens -= 1
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+
+class CircuitBreaker:
+    """
+    Fechado: tudo passa. Aberto (após `threshold` falhas seguidas): nada
+    passa até `cooldown` segundos. Meio aberto: uma requisição de teste por
+    vez; sucesso fecha, falha abre de novo.
+    """
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = max(threshold, 1)
+        self.cooldown = cooldown
+        self._failures = 0
+        self._open_until = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._open_until == 0.0:
+                return "closed"
+            return "open" if time.monotonic() < self._open_until else "half-open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._open_until == 0.0:
+                return True
+            if time.monotonic() < self._open_until or self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._open_until = 0.0
+            self._probing = False
+
+    def failure(self) -> bool:
+        """Registra uma falha; True se o circuito abriu agora."""
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.threshold:
+                self._probing = False
+                self._open_until = time.monotonic() + self.cooldown
+                return True
+            return False
+
+    def cancel(self) -> None:
+        """Desiste da requisição liberada por allow() sem contar sucesso nem falha."""
+        with self._lock:
+            self._probing = False
+
+    def trip(self, seconds: float) -> None:
+        """Abre o circuito por `seconds` (ex.: Retry-After longo demais para esperar)."""
+        with self._lock:
+            self._probing = False
+            self._open_until = max(self._open_until, time.monotonic() + seconds)
+
+
+def _setting(provider: str, name: str, default: float) -> float:
+    raw = os.getenv(f"{provider.upper()}_{name}")
+    return float(raw) if raw else default
+
+
+_lock = threading.Lock()
+_buckets: dict[str, TokenBucket] = {}
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def bucket(provider: str) -> TokenBucket:
+    with _lock:
+        b = _buckets.get(provider)
+        if b is None:
+            rate = _setting(provider, "RATE_PER_SEC", PROVIDER_RATE_PER_SEC)
+            burst = int(_setting(provider, "RATE_BURST", max(rate, 1)))
+            b = _buckets[provider] = TokenBucket(rate, burst)
+        return b
+
+
+def breaker(provider: str) -> CircuitBreaker:
+    with _lock:
+        b = _breakers.get(provider)
+        if b is None:
+            b = _breakers[provider] = CircuitBreaker(
+                int(_setting(provider, "BREAKER_FAILURES", PROVIDER_BREAKER_FAILURES)),
+                _setting(provider, "BREAKER_COOLDOWN", PROVIDER_BREAKER_COOLDOWN),
+            )
+        return b
+
+
+_latencies: dict[str, deque] = {}
+
+
+def record_latency(provider: str, seconds: float) -> None:
+    with _lock:
+        window = _latencies.get(provider)
+        if window is None:
+            window = _latencies[provider] = deque(maxlen=LATENCY_WINDOW)
+        window.append(seconds)
+
+
+def latency_p95(provider: str) -> float | None:
+    """p95 das últimas chamadas bem-sucedidas; None com poucas amostras."""
+    with _lock:
+        window = list(_latencies.get(provider) or ())
+    if len(window) < LATENCY_MIN_SAMPLES:
+        return None
+    window.sort()
+    return window[min(len(window) - 1, int(len(window) * 0.95))]
+
+
+_local = threading.local()
+
+
+def current_deadline() -> float | None:
+    """Prazo (time.monotonic) da thread atual; None = sem prazo."""
+    return getattr(_local, "deadline", None)
+
+
+def remaining() -> float | None:
+    at = current_deadline()
+    return None if at is None else at - time.monotonic()
+
+
+@contextmanager
+def deadline_scope(at: float | None):
+    """Aplica o prazo `at` (time.monotonic) à thread; prazos aninhados valem o menor."""
+    prev = current_deadline()
+    _local.deadline = at if prev is None else (prev if at is None else min(prev, at))
+    try:
+        yield
+    finally:
+        _local.deadline = prev
+
+
+def batch_deadline(job_deadline: float | None = None) -> float | None:
+    """Prazo de um lote começando agora: PROVIDER_BATCH_DEADLINE, limitado pelo do job."""
+    at = time.monotonic() + PROVIDER_BATCH_DEADLINE if PROVIDER_BATCH_DEADLINE > 0 else None
+    if job_deadline is None:
+        return at
+    return job_deadline if at is None else min(at, job_deadline)
+
+
+def request_timeout() -> tuple[float, float]:
+    """(connect, read) para o requests: PROVIDER_TIMEOUT encurtado pelo prazo restante."""
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded("deadline exceeded")
+    read = PROVIDER_TIMEOUT if left is None else min(PROVIDER_TIMEOUT, left)
+    # send() precisa saber se um timeout veio deste corte (prazo nosso) ou do provedor
+    _local.clamped = read < PROVIDER_TIMEOUT
+    return min(PROVIDER_CONNECT_TIMEOUT, read), read
+
+
+def is_available(provider: str) -> bool:
+    """False enquanto o circuito do provedor estiver aberto."""
+    return breaker(provider).state != "open"
+
+
+def retry_after(resp: requests.Response) -> float | None:
+    """Retry-After em segundos (número ou data HTTP); None se ausente/inválido."""
+    raw = (resp.headers.get("Retry-After") or "").strip()
+    if not raw:
+        return None
+    try:
+        return max(float(raw), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(raw).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff(attempt: int) -> float:
+    # "full jitter": espalha os reenvios de várias threads/workers
+    return random.uniform(0, min(PROVIDER_BACKOFF_MAX, PROVIDER_BACKOFF_BASE * 2**attempt))
+
+
+def send(provider: str, request: Callable[[], requests.Response]) -> requests.Response:
+    """
+    Executa `request()` (uma chamada HTTP ao provedor) com limite de taxa,
+    vaga de concorrência, retries e circuit breaker, dentro do prazo da
+    thread (DeadlineExceeded quando não sobra tempo para outra tentativa).
+    """
+    br = breaker(provider)
+    tb = bucket(provider)
+    reason = ""
+    for attempt in range(PROVIDER_MAX_RETRIES + 1):
+        left = remaining()
+        if left is not None and left <= 0:
+            raise DeadlineExceeded(f"{provider}: deadline exceeded" + (f" ({reason})" if reason else ""))
+        if not br.allow():
+            raise ProviderUnavailable(provider, reason or "circuit open")
+        # as esperas (taxa e vaga) também respeitam o prazo
+        if not tb.acquire(remaining()):
+            br.cancel()
+            raise DeadlineExceeded(f"{provider}: deadline exceeded waiting for the rate limit")
+        wait = None
+        _local.clamped = False
+        try:
+            with provider_slot(provider, remaining()):
+                resp = request()
+        except requests.RequestException as e:
+            if isinstance(e, requests.Timeout) and _local.clamped:
+                br.cancel()  # o timeout foi encurtado pelo prazo: o provedor não chegou a falhar
+                raise DeadlineExceeded(f"{provider}: deadline exceeded ({type(e).__name__})") from e
+            reason = f"{type(e).__name__}: {e}"
+        except SlotTimeout as e:
+            br.cancel()
+            raise DeadlineExceeded(f"{provider}: deadline exceeded waiting for a request slot") from e
+        except DeadlineExceeded:
+            br.cancel()  # prazo nosso (request_timeout), não falha do provedor
+            raise
+        except Exception:
+            br.failure()  # não deixa um teste meio aberto pendurado
+            raise
+        else:
+            if resp.status_code not in _RETRY_STATUS and resp.status_code not in _DOWN_STATUS:
+                br.success()
+                return resp
+            reason = f"HTTP {resp.status_code}"
+            if resp.status_code in _DOWN_STATUS:
+                br.trip(br.cooldown)
+                raise ProviderUnavailable(provider, f"{reason} {resp.text[:200]}")
+            wait = retry_after(resp)
+            if wait is not None and wait > PROVIDER_BACKOFF_MAX:
+                # o provedor pediu mais tempo do que vale esperar: pula ele até lá
+                br.trip(wait)
+                raise ProviderUnavailable(provider, f"{reason}, retry after {wait:.0f}s")
+
+        if br.failure():
+            log.warning("circuito de %s aberto por %.0fs (%s)", provider, br.cooldown, reason)
+            raise ProviderUnavailable(provider, reason)
+        if attempt < PROVIDER_MAX_RETRIES:
+            pause = wait if wait is not None else _backoff(attempt)
+            left = remaining()
+            if left is not None and pause >= left:
+                raise DeadlineExceeded(f"{provider}: deadline exceeded ({reason})")
+            time.sleep(pause)
+    raise ProviderUnavailable(provider, f"{reason} after {PROVIDER_MAX_RETRIES} retries")
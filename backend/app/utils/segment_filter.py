@@ -0,0 +1,76 @@
+# backend/app/utils/segment_filter.py
+"""
+Pré-filtro de segmentos: o que não precisa de tradução não vai ao provedor.
+
+Passam direto (copiados como estão): vazios/espaços, números, datas e
+pontuação, códigos (nº de processo, referências), URLs/e-mails e textos que
+já estão no idioma de destino.
+"""
+from __future__ import annotations
+
+import re
+
+_URL = re.compile(r"^(?:https?://|www\.)\S+$", re.I)
+_EMAIL = re.compile(r"^[\w.+-]+@[\w-]+(?:\.[\w-]+)+$")
+# token único com dígito e sem minúsculas: 0001234-56.2024.8.26.0100, ABC-123/2024, nº 12
+_CODE = re.compile(r"^(?=\S*\d)[A-Z0-9º°ª§#\-./_:()]+$")
+_WORDS = re.compile(r"[^\W\d_]+")
+
+# palavras funcionais mais comuns por idioma (detecção barata de "já está no destino")
+_STOPWORDS: dict[str, frozenset[str]] = {
+    "pt": frozenset("o a os as de do da dos das em no na nos nas um uma que e é para com não por se ao".split()),
+    "en": frozenset("the of and to in is that for it with as on be by this are or not from at which".split()),
+    "es": frozenset("el la los las de del en y que es un una por con para no se al lo su".split()),
+    "fr": frozenset("le la les de des du et en un une est que pour dans qui pas sur au par ce".split()),
+    "it": frozenset("il lo la gli le di del della e in un una che è per con non da al si".split()),
+    "de": frozenset("der die das und in den von zu mit ist nicht ein eine dem des auf für im sich".split()),
+}
+_MIN_WORDS_FOR_LANG = 5
+
+
+def _base(lang: str | None) -> str:
+    return (lang or "").replace("_", "-").split("-")[0].lower()
+
+
+def _looks_like(text: str, lang: str) -> bool:
+    """True se o texto parece estar em `lang` e não no idioma de origem."""
+    words = [w.lower() for w in _WORDS.findall(text)]
+    if len(words) < _MIN_WORDS_FOR_LANG or lang not in _STOPWORDS:
+        return False
+    scores = {k: sum(w in sw for w in words) for k, sw in _STOPWORDS.items()}
+    best = max(scores, key=scores.get)
+    return best == lang and scores[lang] >= 2 and scores[lang] >= 2 * max(
+        (v for k, v in scores.items() if k != lang), default=0
+    )
+
+
+def is_passthrough(text: str, source_lang: str | None = None, target_lang: str | None = None) -> bool:
+    s = (text or "").strip()
+    if not s:
+        return True
+    if not any(ch.isalpha() for ch in s):  # números, datas, pontuação, numeração de página
+        return True
+    if " " not in s and (_URL.match(s) or _EMAIL.match(s) or _CODE.match(s)):
+        return True
+    tgt = _base(target_lang)
+    if tgt and tgt != _base(source_lang) and _looks_like(s, tgt):
+        return True
+    return False
+
+
+def split_translatable(
+    texts: list[str], source_lang: str | None, target_lang: str | None
+) -> tuple[list[int], dict]:
+    """
+    Índices dos textos que precisam ir ao provedor + métricas do que foi
+    pulado (segments_skipped, chars_saved).
+    """
+    keep: list[int] = []
+    skipped = saved = 0
+    for i, t in enumerate(texts):
+        if is_passthrough(t, source_lang, target_lang):
+            skipped += 1
+            saved += len(t or "")
+        else:
+            keep.append(i)
+    return keep, {"segments_skipped": skipped, "chars_saved": saved}
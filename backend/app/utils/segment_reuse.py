@@ -0,0 +1,110 @@
+# backend/app/utils/segment_reuse.py
+"""
+Retradução incremental a partir de um job anterior.
+
+Ao terminar cada destino, o pipeline grava ao lado da saída um arquivo de
+pares (`<saída>.segments.jsonl.gz`: segmento de origem marcado -> tradução
+final, já com o glossário). Um job novo marcado como "atualização de"
+outro alinha os seus segmentos contra esses pares:
+
+- hash igual (mesmo texto, mesmas tags) => reaproveita a tradução, mesmo
+  que o segmento tenha mudado de lugar;
+- o resto é alinhado por posição (difflib) e classificado por
+  similaridade: editado (vale a pena revisar) ou novo. Esses vão ao
+  provedor normalmente.
+
+O arquivo começa com o glossário (id, versão) e o provedor/modelo da
+tradução: o pipeline só reaproveita pares feitos com o mesmo glossário que
+o destino novo usa (provedor diferente só vira métrica).
+"""
+from __future__ import annotations
+
+import difflib
+import gzip
+import json
+import os
+
+from app.utils.inline_tags import Segment
+from app.utils.translation_memory import segment_hash
+
+# similaridade mínima (0..1) para um segmento alterado contar como "editado" e não "novo"
+FUZZY_THRESHOLD = float(os.getenv("INCREMENTAL_FUZZY_THRESHOLD", "0.6"))
+
+PAIRS_SUFFIX = ".segments.jsonl.gz"
+
+
+def pairs_path(output_path: str) -> str:
+    return output_path + PAIRS_SUFFIX
+
+
+def write_pairs(
+    output_path: str, segments: list[Segment], translated: dict[int, str], meta: dict | None = None
+) -> None:
+    """
+    Grava os pares (origem, tradução ou None) na ordem dos segmentos. A
+    primeira linha é `meta` (glossário e provedor com que as traduções
+    foram feitas; ver read_meta).
+    """
+    with gzip.open(pairs_path(output_path), "wt", encoding="utf-8", compresslevel=5) as f:
+        f.write(json.dumps(meta or {}, ensure_ascii=False))
+        f.write("\n")
+        for i, seg in enumerate(segments):
+            f.write(json.dumps([seg.markup, translated.get(i)], ensure_ascii=False))
+            f.write("\n")
+
+
+def read_meta(output_path: str) -> dict | None:
+    """Cabeçalho gravado por write_pairs; None se não há (arquivo antigo ou ausente)."""
+    path = pairs_path(output_path)
+    if not os.path.exists(path):
+        return None
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        first = json.loads(f.readline() or "null")
+    return first if isinstance(first, dict) else None
+
+
+def load_pairs(output_path: str) -> list[tuple[str, str | None]] | None:
+    """Pares gravados por write_pairs; None se a saída não tem o arquivo."""
+    path = pairs_path(output_path)
+    if not os.path.exists(path):
+        return None
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        rows = (json.loads(line) for line in f if line.strip())
+        return [tuple(row) for row in rows if isinstance(row, list)]
+
+
+def align(previous: list[tuple[str, str | None]], segments: list[Segment]) -> tuple[dict[int, str], dict]:
+    """
+    Traduções reaproveitadas {índice do segmento novo: tradução marcada} e
+    as métricas do alinhamento (segments_reused, segments_edited,
+    segments_new, reuse_ratio).
+    """
+    old_keys = [segment_hash(src) for src, _ in previous]
+    old_set = set(old_keys)
+    known = {k: dst for k, (_, dst) in zip(old_keys, previous) if dst is not None}
+    new_keys = [segment_hash(s.markup) for s in segments]
+
+    reused = {i: known[k] for i, k in enumerate(new_keys) if k in known}
+    # inalterados: inclui os que não precisavam de tradução (números, códigos...)
+    unchanged = sum(1 for k in new_keys if k in old_set)
+    edited = 0
+    # os segmentos são únicos nas duas listas: o alinhamento é quase linear
+    matcher = difflib.SequenceMatcher(None, old_keys, new_keys, autojunk=False)
+    for op, a0, a1, b0, b1 in matcher.get_opcodes():
+        if op != "replace":
+            continue
+        # trechos substituídos: compara par a par pela posição
+        for a, b in zip(range(a0, a1), range(b0, b1)):
+            if new_keys[b] in old_set:
+                continue
+            sm = difflib.SequenceMatcher(None, previous[a][0], segments[b].markup)
+            if sm.quick_ratio() >= FUZZY_THRESHOLD and sm.ratio() >= FUZZY_THRESHOLD:
+                edited += 1
+
+    changed = len(segments) - unchanged
+    return reused, {
+        "segments_reused": unchanged,
+        "segments_edited": edited,
+        "segments_new": changed - edited,
+        "reuse_ratio": round(unchanged / len(segments), 4) if segments else 0.0,
+    }
@@ -0,0 +1,253 @@
+# backend/app/utils/storage.py
+"""
+Onde ficam uploads e saídas, e como chegam ao cliente.
+
+O pipeline e o upload sempre trabalham com arquivos locais (uploads/,
+outputs/); o backend decide o que acontece depois:
+
+- local (padrão): o arquivo fica onde está e a chave é o próprio caminho
+  (as linhas antigas de job_files/job_targets continuam valendo). O
+  download pode ser entregue pelo proxy: STORAGE_SENDFILE=x-accel (nginx,
+  X-Accel-Redirect para STORAGE_ACCEL_PREFIX + caminho em outputs/) ou
+  x-sendfile (Apache/lighttpd) — o worker da API só devolve cabeçalhos;
+- s3 (STORAGE_BACKEND=s3, precisa do boto3): `publish` envia para o
+  bucket (S3_BUCKET, S3_ENDPOINT_URL para MinIO e afins) e apaga o local;
+  a chave é o caminho relativo ao DATA_DIR (ex.: outputs/5_en_a.docx).
+  Quem precisa do arquivo (worker, zip) baixa uma cópia com `fetch` e a
+  apaga com `release`. O download é um redirect para uma URL assinada do
+  próprio bucket.
+
+Nos dois casos `signed_url` dá um link com validade (STORAGE_URL_TTL
+segundos) que o navegador baixa sem o token da API.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from urllib.parse import quote
+
+import jwt
+from flask import Response, current_app, redirect, send_file, url_for
+
+from app.paths import DATA_DIR, OUTPUT_DIR, UPLOAD_DIR
+from app.utils.content_store import link_output
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local").lower()  # "local" | "s3"
+STORAGE_SENDFILE = os.getenv("STORAGE_SENDFILE", "").lower()  # "" | "x-accel" | "x-sendfile"
+STORAGE_ACCEL_PREFIX = os.getenv("STORAGE_ACCEL_PREFIX", "/protected-outputs/")
+STORAGE_URL_TTL = int(os.getenv("STORAGE_URL_TTL", "300"))  # segundos
+
+S3_BUCKET = os.getenv("S3_BUCKET", "")
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL") or None
+S3_REGION = os.getenv("S3_REGION") or None
+S3_PREFIX = os.getenv("S3_PREFIX", "")
+
+_AUDIENCE = "download"
+
+
+def _disposition(download_name: str) -> str:
+    # RFC 6266: nome ASCII de reserva + filename* em UTF-8
+    fallback = download_name.encode("ascii", "replace").decode().replace('"', "")
+    return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(download_name)}"
+
+
+class LocalStorage:
+    """Arquivos no disco do próprio servidor (chave = caminho)."""
+
+    name = "local"
+
+    def __init__(self, sendfile: str = STORAGE_SENDFILE, accel_prefix: str = STORAGE_ACCEL_PREFIX):
+        if sendfile not in ("", "x-accel", "x-sendfile"):
+            raise ValueError(f"STORAGE_SENDFILE inválido: {sendfile!r}")
+        self.sendfile = sendfile
+        self.accel_prefix = accel_prefix.rstrip("/") + "/"
+
+    @property
+    def offload(self) -> bool:
+        """True se os bytes do download não passam pelo Python."""
+        return bool(self.sendfile)
+
+    def key_for(self, path: str) -> str:
+        return str(path)
+
+    def publish(self, path: str) -> str:
+        return str(path)
+
+    def fetch(self, key: str) -> str | None:
+        return key if os.path.exists(key) else None
+
+    def release(self, path: str) -> None:
+        pass
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(key)
+
+    def copy(self, key: str, path: str) -> str:
+        link_output(key, str(path))
+        return str(path)
+
+    def delete(self, key: str) -> bool:
+        try:
+            os.remove(key)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def delete_prefix(self, prefix: str) -> int:
+        base = Path(prefix)
+        removed = 0
+        for p in base.parent.glob(f"{base.name}*"):
+            p.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+    def fingerprint(self, key: str) -> str:
+        st = os.stat(key)
+        return f"{st.st_size}:{st.st_mtime_ns}"
+
+    def send(self, key: str, download_name: str, mimetype: str) -> Response:
+        if not self.sendfile:
+            return send_file(key, as_attachment=True, download_name=download_name, mimetype=mimetype, max_age=0)
+        headers = {"Content-Disposition": _disposition(download_name), "Cache-Control": "no-cache"}
+        if self.sendfile == "x-accel":
+            # location interna do nginx apontando para outputs/ (ver .env.example)
+            rel = Path(key).resolve().relative_to(OUTPUT_DIR.resolve()).as_posix()
+            headers["X-Accel-Redirect"] = self.accel_prefix + quote(rel)
+        else:
+            headers["X-Sendfile"] = str(Path(key).resolve())
+        return Response(status=200, mimetype=mimetype, headers=headers)
+
+    def signed_url(self, key: str | dict, download_name: str, mimetype: str, ttl: int = STORAGE_URL_TTL) -> str:
+        # key também pode ser {"job", "keys"}: o zip em streaming dos destinos (ver routes/jobs.py)
+        token = jwt.encode(
+            {"key": key, "name": download_name, "mime": mimetype, "aud": _AUDIENCE, "exp": int(time.time()) + ttl},
+            current_app.config["JWT_SECRET_KEY"],
+            algorithm="HS256",
+        )
+        return url_for("jobs.signed_download", token=token)
+
+
+class S3Storage:
+    """Bucket S3 ou compatível (MinIO, R2...). Os arquivos locais viram cache."""
+
+    name = "s3"
+    offload = True
+
+    def __init__(self, bucket: str = S3_BUCKET, endpoint_url: str | None = S3_ENDPOINT_URL, prefix: str = S3_PREFIX):
+        try:
+            import boto3
+        except ImportError as e:
+            raise RuntimeError("STORAGE_BACKEND=s3 requer o pacote boto3") from e
+        if not bucket:
+            raise RuntimeError("STORAGE_BACKEND=s3 requer S3_BUCKET")
+        self.bucket = bucket
+        self.prefix = prefix
+        # credenciais pela cadeia padrão do boto3 (AWS_ACCESS_KEY_ID etc.)
+        self.client = boto3.client("s3", endpoint_url=endpoint_url, region_name=S3_REGION)
+
+    def key_for(self, path: str) -> str:
+        return self.prefix + Path(path).resolve().relative_to(DATA_DIR).as_posix()
+
+    def _local(self, key: str) -> Path:
+        return DATA_DIR / key[len(self.prefix):]
+
+    def _missing(self, e: Exception) -> bool:
+        code = str(((getattr(e, "response", None) or {}).get("Error") or {}).get("Code", ""))
+        return code in ("404", "NoSuchKey", "NotFound")
+
+    def publish(self, path: str) -> str:
+        key = self.key_for(path)
+        # uploads são endereçados por conteúdo: o mesmo blob não sobe duas vezes
+        if not (Path(path).resolve().is_relative_to(UPLOAD_DIR) and self.exists(key)):
+            self.client.upload_file(str(path), self.bucket, key)
+        self.release(path)
+        return key
+
+    def fetch(self, key: str) -> str | None:
+        # cópia só de quem pediu (dois workers no mesmo host não disputam o arquivo)
+        path = self._local(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".fetch-{uuid.uuid4().hex}-{path.name}")
+        try:
+            self.client.download_file(self.bucket, key, str(tmp))
+        except Exception as e:
+            tmp.unlink(missing_ok=True)
+            if self._missing(e):
+                return None
+            raise
+        return str(tmp)
+
+    def release(self, path: str) -> None:
+        """Apaga a cópia local (publicada ou baixada por fetch); o original está no bucket."""
+        Path(path).unlink(missing_ok=True)
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except Exception as e:
+            if self._missing(e):
+                return False
+            raise
+
+    def copy(self, key: str, path: str) -> str:
+        dst = self.key_for(path)
+        self.client.copy_object(Bucket=self.bucket, Key=dst, CopySource={"Bucket": self.bucket, "Key": key})
+        return dst
+
+    def delete(self, key: str) -> bool:
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+        return True
+
+    def delete_prefix(self, prefix: str) -> int:
+        removed = 0
+        pages = self.client.get_paginator("list_objects_v2").paginate(Bucket=self.bucket, Prefix=self.key_for(prefix))
+        for page in pages:
+            for obj in page.get("Contents", []):
+                self.client.delete_object(Bucket=self.bucket, Key=obj["Key"])
+                removed += 1
+        return removed
+
+    def fingerprint(self, key: str) -> str:
+        return self.client.head_object(Bucket=self.bucket, Key=key)["ETag"].strip('"')
+
+    def send(self, key: str, download_name: str, mimetype: str) -> Response:
+        return redirect(self.signed_url(key, download_name, mimetype), code=302)
+
+    def signed_url(self, key: str, download_name: str, mimetype: str, ttl: int = STORAGE_URL_TTL) -> str:
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={
+                "Bucket": self.bucket,
+                "Key": key,
+                "ResponseContentDisposition": _disposition(download_name),
+                "ResponseContentType": mimetype,
+            },
+            ExpiresIn=ttl,
+        )
+
+
+def verify_signed(token: str) -> tuple[str | dict, str, str]:
+    """(chave, nome, mimetype) de um link de LocalStorage.signed_url; levanta jwt.InvalidTokenError."""
+    payload = jwt.decode(token, current_app.config["JWT_SECRET_KEY"], algorithms=["HS256"], audience=_AUDIENCE)
+    return payload["key"], payload["name"], payload["mime"]
+
+
+_BACKENDS = {"local": LocalStorage, "s3": S3Storage}
+_lock = threading.Lock()
+_storage = None
+
+
+def get_storage():
+    """Backend configurado em STORAGE_BACKEND (um por processo)."""
+    global _storage
+    with _lock:
+        if _storage is None:
+            cls = _BACKENDS.get(STORAGE_BACKEND)
+            if cls is None:
+                raise RuntimeError(f"STORAGE_BACKEND desconhecido: {STORAGE_BACKEND!r}")
+            _storage = cls()
+        return _storage
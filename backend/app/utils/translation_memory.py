@@ -0,0 +1,141 @@
+# backend/app/utils/translation_memory.py
+"""
+Memória de tradução (TM) na frente de todos os provedores.
+
+Dois níveis: um LRU em memória do processo (compartilhado entre jobs e
+threads) e a tabela `translation_memory` no Postgres. A chave é
+(provedor, modelo, origem, destino, sha256 do segmento normalizado). Como a
+normalização ignora os espaços das pontas, um acerto devolve a tradução
+com os espaços das pontas do segmento pedido (ver with_outer_whitespace).
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime
+from typing import Sequence
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.models import TranslationMemoryEntry
+
+TM_LRU_SIZE = int(os.getenv("TM_LRU_SIZE", "50000"))
+
+_WS = re.compile(r"\s+")
+
+
+def normalize_segment(text: str) -> str:
+    """NFC + espaços colapsados: variações de espaçamento caem na mesma chave."""
+    return _WS.sub(" ", unicodedata.normalize("NFC", text or "")).strip()
+
+
+def segment_hash(text: str) -> str:
+    return hashlib.sha256(normalize_segment(text).encode("utf-8")).hexdigest()
+
+
+def with_outer_whitespace(source: str, translated: str) -> str:
+    """`translated` com os espaços do início e do fim de `source` (ex.: " a " -> " b ")."""
+    body = translated.strip()
+    if not body or not source.strip():
+        return translated
+    lead = source[: len(source) - len(source.lstrip())]
+    trail = source[len(source.rstrip()):]
+    return lead + body + trail
+
+
+class _LRU:
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._data: OrderedDict[tuple, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> str | None:
+        with self._lock:
+            val = self._data.get(key)
+            if val is not None:
+                self._data.move_to_end(key)
+            return val
+
+    def put(self, key: tuple, val: str) -> None:
+        with self._lock:
+            self._data[key] = val
+            self._data.move_to_end(key)
+            while len(self._data) > self.capacity:
+                self._data.popitem(last=False)
+
+
+_lru = _LRU(TM_LRU_SIZE)
+
+
+class TranslationMemory:
+    """
+    Consulta/grava a TM. `engine` é um Engine do SQLAlchemy (thread-safe,
+    pode ser usado fora do app context); sem engine, só o LRU é usado.
+    """
+
+    def __init__(self, engine=None):
+        self.engine = engine
+        self._table = TranslationMemoryEntry.__table__
+
+    def get_many(
+        self, provider: str, model: str, source: str, target: str, texts: Sequence[str]
+    ) -> dict[int, str]:
+        """Devolve {índice: tradução} para os textos presentes na TM."""
+        found: dict[int, str] = {}
+        missing: dict[str, list[int]] = {}
+        for i, t in enumerate(texts):
+            h = segment_hash(t)
+            val = _lru.get((provider, model, source, target, h))
+            if val is not None:
+                found[i] = with_outer_whitespace(t, val)
+            else:
+                missing.setdefault(h, []).append(i)
+
+        if missing and self.engine is not None:
+            c = self._table.c
+            stmt = select(c.segment_hash, c.target_text).where(
+                c.provider == provider,
+                c.model == model,
+                c.source_lang == source,
+                c.target_lang == target,
+                c.segment_hash.in_(list(missing)),
+            )
+            with self.engine.connect() as conn:
+                for h, val in conn.execute(stmt):
+                    _lru.put((provider, model, source, target, h), val)
+                    for i in missing[h]:
+                        found[i] = with_outer_whitespace(texts[i], val)
+        return found
+
+    def put_many(
+        self, provider: str, model: str, source: str, target: str, pairs: Sequence[tuple[str, str]]
+    ) -> None:
+        rows = {}
+        for src_text, dst_text in pairs:
+            # tradução idêntica ao original não entra: evita gravar passthrough de falha como TM
+            if not normalize_segment(src_text) or dst_text == src_text:
+                continue
+            h = segment_hash(src_text)
+            _lru.put((provider, model, source, target, h), dst_text)
+            rows[h] = {
+                "provider": provider,
+                "model": model,
+                "source_lang": source,
+                "target_lang": target,
+                "segment_hash": h,
+                "source_text": src_text,
+                "target_text": dst_text,
+                "created_at": datetime.utcnow(),
+            }
+
+        if rows and self.engine is not None:
+            stmt = pg_insert(self._table).values(list(rows.values())).on_conflict_do_nothing(
+                constraint="uq_translation_memory_key"
+            )
+            with self.engine.begin() as conn:
+                conn.execute(stmt)
@@ -1,87 +1,372 @@
 # backend/app/utils/translator.py
 import os
 import json
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from typing import Sequence
 
+from app.utils.http_pool import get_session, max_concurrency
+from app.utils.provider_router import (
+    DeadlineExceeded,
+    ProviderUnavailable,
+    batch_deadline,
+    current_deadline,
+    deadline_scope,
+    is_available,
+    latency_p95,
+    record_latency,
+    remaining,
+    request_timeout,
+    send,
+)
+from app.utils.translation_memory import segment_hash, with_outer_whitespace
+
 PROVIDER = os.getenv("TRANSLATOR_PROVIDER", "").lower()  # "openai" | "deepl" | "azure"
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+OPENAI_API_URL = os.getenv("OPENAI_API_URL", "https://api.openai.com/v1/chat/completions")
+OPENAI_MAX_REPAIRS = int(os.getenv("OPENAI_MAX_REPAIRS", "2"))  # reenvios só dos ids faltantes
 
 DEEPL_API_KEY = os.getenv("DEEPL_API_KEY")
 DEEPL_API_URL = os.getenv("DEEPL_API_URL", "https://api.deepl.com/v2/translate")
+DEEPL_GLOSSARY_URL = os.getenv("DEEPL_GLOSSARY_URL", DEEPL_API_URL.rsplit("/", 1)[0] + "/glossaries")
+DEEPL_USE_GLOSSARY = os.getenv("DEEPL_USE_GLOSSARY", "1") == "1"  # 0 = sempre placeholders
 
 AZURE_KEY = os.getenv("AZURE_TRANSLATOR_KEY")
 AZURE_REGION = os.getenv("AZURE_TRANSLATOR_REGION", "eastus")
 AZURE_ENDPOINT = os.getenv("AZURE_TRANSLATOR_ENDPOINT", "https://api.cognitive.microsofttranslator.com")
 
-__all__ = ["translate_text", "TranslatorError"]
+# provedores tentados, nessa ordem, quando o principal está indisponível (só os com chave)
+TRANSLATOR_FALLBACKS = [
+    p.strip().lower() for p in os.getenv("TRANSLATOR_FALLBACKS", "deepl,azure").split(",") if p.strip()
+]
+# hedging: se o principal passar do seu p95 sem responder, o mesmo lote vai também ao reserva
+PROVIDER_HEDGE = os.getenv("PROVIDER_HEDGE", "0") == "1"
+HEDGE_MAX_WORKERS = int(os.getenv("PROVIDER_HEDGE_MAX_WORKERS", "32"))
+
+__all__ = ["translate_text", "translate_batches", "provider_key", "deepl_glossary_id", "TranslatorError"]
+
+log = logging.getLogger(__name__)
 
 class TranslatorError(Exception):
     pass
 
-def translate_text(texts: Sequence[str], source_lang: str, target_lang: str) -> list[str]:
+def _model_for(provider: str) -> str:
+    return OPENAI_MODEL if provider == "openai" else ""
+
+def provider_key() -> tuple[str, str]:
+    """(provedor, modelo) ativos — parte da chave da memória de tradução."""
+    return PROVIDER, _model_for(PROVIDER)
+
+def translate_text(
+    texts: Sequence[str],
+    source_lang: str,
+    target_lang: str,
+    memory=None,
+    stats: dict | None = None,
+    glossary_id: str | None = None,
+    markup: bool = False,
+) -> list[str]:
     """
     Recebe lista de textos e devolve lista traduzida, na mesma ordem.
-    Se nenhum provedor estiver configurado, retorna os próprios textos (no-op).
+    Se nenhum provedor estiver configurado (TRANSLATOR_PROVIDER vazio),
+    retorna os próprios textos (modo de desenvolvimento). Com provedor
+    configurado, uma falha de todos os provedores vira TranslatorError —
+    nunca texto de origem devolvido como se fosse tradução.
+
+    Com `memory` (TranslationMemory), só os segmentos ausentes da TM vão ao
+    provedor; `stats` acumula tm_hits/tm_misses. `glossary_id` é o glossário
+    nativo do DeepL (ver deepl_glossary_id) e entra na chave da TM. Com
+    `markup`, os textos são XML escapado com tags inline (ver inline_tags)
+    e os provedores são chamados no modo que preserva as tags. `stats`
+    também conta `failovers` (lotes atendidos por um provedor reserva).
     """
     if not texts:
         return []
-    if PROVIDER == "openai":
-        return _translate_openai(texts, source_lang, target_lang)
-    if PROVIDER == "deepl":
-        return _translate_deepl(texts, source_lang, target_lang)
-    if PROVIDER == "azure":
-        return _translate_azure(texts, source_lang, target_lang)
-    # fallback: sem tradução
-    return list(texts)
+    if memory is None or not PROVIDER:
+        served, out = _translate_provider(texts, source_lang, target_lang, glossary_id, markup)
+        _count_failover(stats, served)
+        return out
+
+    provider, model = provider_key()
+    if glossary_id:
+        model = f"{model}+glossary:{glossary_id}"
+    found = memory.get_many(provider, model, source_lang, target_lang, texts)
+
+    # segmentos repetidos (mesma chave normalizada) no mesmo lote vão uma vez só
+    pending: dict[str, list[int]] = {}
+    for i, t in enumerate(texts):
+        if i not in found:
+            pending.setdefault(segment_hash(t), []).append(i)
+
+    out = [found.get(i) for i in range(len(texts))]
+    if pending:
+        uniq = [texts[idxs[0]] for idxs in pending.values()]
+        served, fresh = _translate_provider(uniq, source_lang, target_lang, glossary_id, markup)
+        for idxs, dst in zip(pending.values(), fresh):
+            out[idxs[0]] = dst
+            for i in idxs[1:]:
+                # mesma chave, espaços das pontas diferentes: cada um mantém os seus
+                out[i] = with_outer_whitespace(texts[i], dst)
+        # a TM guarda sob o provedor que de fato traduziu
+        if served != provider:
+            _count_failover(stats, served)
+            model = _model_for(served)
+        memory.put_many(served, model, source_lang, target_lang, list(zip(uniq, fresh)))
+
+    if stats is not None:
+        stats["tm_hits"] = stats.get("tm_hits", 0) + len(found)
+        stats["tm_misses"] = stats.get("tm_misses", 0) + (len(texts) - len(found))
+    return out
+
+def translate_batches(
+    batches: Sequence[Sequence[str]],
+    source_lang: str,
+    target_lang: str,
+    memory=None,
+    stats: dict | None = None,
+    on_batch_done=None,
+    glossary_id: str | None = None,
+    markup: bool = False,
+    deadline: float | None = None,
+) -> list[list[str]]:
+    """
+    Traduz vários lotes com até `max_concurrency(provedor)` requisições em
+    voo (conexões keep-alive compartilhadas); o resultado mantém a ordem
+    dos lotes. `on_batch_done(i)` é chamado quando o lote i termina.
+    Cada lote tem PROVIDER_BATCH_DEADLINE segundos, limitados por
+    `deadline` (time.monotonic; orçamento do job): estourou, TranslatorError.
+    """
+    if not batches:
+        return []
+    workers = min(len(batches), max_concurrency(PROVIDER)) if PROVIDER else 1
+    per_batch = [{} for _ in batches]
+
+    def _one(i: int) -> list[str]:
+        with deadline_scope(batch_deadline(deadline)):
+            out = translate_text(batches[i], source_lang, target_lang, memory, per_batch[i], glossary_id, markup)
+        if on_batch_done is not None:
+            on_batch_done(i)
+        return out
+
+    if workers <= 1:
+        out = [_one(i) for i in range(len(batches))]
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{PROVIDER}-batch") as pool:
+            out = list(pool.map(_one, range(len(batches))))
+
+    if stats is not None:
+        for st in per_batch:
+            for k, v in st.items():
+                stats[k] = stats.get(k, 0) + v
+    return out
+
+def _count_failover(stats: dict | None, served: str) -> None:
+    if stats is not None and PROVIDER and served != PROVIDER:
+        stats["failovers"] = stats.get("failovers", 0) + 1
+
+def _configured(provider: str) -> bool:
+    return bool({"openai": OPENAI_API_KEY, "deepl": DEEPL_API_KEY, "azure": AZURE_KEY}.get(provider))
+
+def _provider_chain(glossary_id: str | None) -> list[str]:
+    """Provedor principal seguido dos reservas configurados."""
+    if glossary_id:
+        # o glossário nativo só existe no DeepL: trocar de provedor perderia os termos
+        return [PROVIDER]
+    chain = [PROVIDER]
+    for p in TRANSLATOR_FALLBACKS:
+        if p not in chain and p in _PROVIDERS and _configured(p):
+            chain.append(p)
+    return chain
+
+def _call_provider(
+    provider: str, texts: Sequence[str], source: str, target: str, glossary_id: str | None, markup: bool
+) -> list[str]:
+    if provider == "deepl":
+        return _translate_deepl(texts, source, target, glossary_id, markup)
+    return _PROVIDERS[provider](texts, source, target, markup)
+
+def _timed_call(provider: str, at: float | None, *args) -> list[str]:
+    """Chama o provedor sob o prazo `at` e registra a latência (base do p95)."""
+    with deadline_scope(at):
+        t0 = time.monotonic()
+        out = _call_provider(provider, *args)
+        record_latency(provider, time.monotonic() - t0)
+        return out
+
+_hedge_pool: ThreadPoolExecutor | None = None
+_hedge_pool_lock = threading.Lock()
+
+def _hedge_executor() -> ThreadPoolExecutor:
+    global _hedge_pool
+    with _hedge_pool_lock:
+        if _hedge_pool is None:
+            _hedge_pool = ThreadPoolExecutor(max_workers=HEDGE_MAX_WORKERS, thread_name_prefix="hedge")
+        return _hedge_pool
+
+def _hedged(primary: str, backup: str, delay: float, args: tuple, errors: list[str]) -> tuple[str, list[str]] | None:
+    """
+    Dispara o lote no `primary`; se ele não responder em `delay` segundos
+    (ou cair antes disso), dispara também no `backup` e fica com a primeira
+    tradução que chegar. A requisição perdedora termina sozinha e é
+    descartada. None quando os dois ficaram indisponíveis.
+    """
+    at = current_deadline()
+    pool = _hedge_executor()
+    first = pool.submit(_timed_call, primary, at, *args)
+    futures = {first: primary}
+    done, _ = wait([first], timeout=delay)
+    if not done or isinstance(first.exception(), ProviderUnavailable):
+        if not done:
+            log.info("hedge: %s sem resposta após %.1fs (p95), disparando %s", primary, delay, backup)
+        futures[pool.submit(_timed_call, backup, at, *args)] = backup
+
+    pending = set(futures)
+    while pending:
+        left = remaining()
+        done, pending = wait(pending, timeout=None if left is None else max(left, 0), return_when=FIRST_COMPLETED)
+        if not done:
+            raise DeadlineExceeded("deadline exceeded waiting for " + ", ".join(futures[f] for f in pending))
+        for f in done:
+            try:
+                return futures[f], f.result()
+            except ProviderUnavailable as e:
+                log.warning("provedor %s indisponível: %s", futures[f], e.reason)
+                errors.append(f"{futures[f]}: {e.reason}")
+    return None
+
+def _translate_provider(
+    texts: Sequence[str],
+    source_lang: str,
+    target_lang: str,
+    glossary_id: str | None = None,
+    markup: bool = False,
+) -> tuple[str, list[str]]:
+    """
+    Traduz pelo primeiro provedor disponível da cadeia; devolve
+    (provedor que atendeu, traduções). Provedores com circuito aberto são
+    pulados sem chamada de rede (ver provider_router). Com PROVIDER_HEDGE,
+    um provedor lento além do seu p95 corre em paralelo com o próximo.
+    """
+    if not PROVIDER:
+        return "", list(texts)  # sem provedor configurado: no-op explícito
+    if PROVIDER not in _PROVIDERS:
+        raise TranslatorError(f"unknown TRANSLATOR_PROVIDER: {PROVIDER}")
+
+    args = (texts, source_lang, target_lang, glossary_id, markup)
+    chain = _provider_chain(glossary_id)
+    errors: list[str] = []
+    try:
+        while chain:
+            provider = chain.pop(0)
+            if not is_available(provider):
+                errors.append(f"{provider}: circuit open")
+                continue
+            backup = next((p for p in chain if is_available(p)), None) if PROVIDER_HEDGE else None
+            delay = latency_p95(provider) if backup else None
+            if delay is not None:
+                chain.remove(backup)
+                served = _hedged(provider, backup, delay, args, errors)
+                if served is not None:
+                    return served
+                continue
+            try:
+                return provider, _timed_call(provider, current_deadline(), *args)
+            except ProviderUnavailable as e:
+                log.warning("provedor %s indisponível: %s", provider, e.reason)
+                errors.append(f"{provider}: {e.reason}")
+    except DeadlineExceeded as e:
+        raise TranslatorError(f"translation deadline exceeded: {e}") from e
+    raise TranslatorError("no translation provider available (" + "; ".join(errors) + ")")
 
 # --------- Translation Providers ---------
 
-def _translate_openai(texts: Sequence[str], source: str, target: str) -> list[str]:
-    import requests
+def _openai_request(items: dict[int, str], source: str, target: str, markup: bool = False):
     system = (
         "You are a professional translator. Translate the user text from "
         f"{source} to {target}. Keep meaning, tone and placeholders. "
-        "Return ONLY the translations, one per block, preserving order. "
-        "Use the separator line exactly as '----' between items."
+        "Tokens like ⟦0⟧ stand for fixed glossary terms: copy them unchanged. "
+        + (
+            "Texts are escaped XML with inline tags <gN>...</gN> (formatted spans) and <xN/> "
+            "(inline objects): keep every tag, around the corresponding translated words, "
+            "and keep the XML escaping. "
+            if markup
+            else ""
+        )
+        + 'The input is a JSON object {"items": [{"id": <int>, "text": <string>}]}. '
+        'Reply with a JSON object {"items": [{"id": <int>, "text": <translation>}]} '
+        "containing exactly one entry per input id, with the same ids and nothing else."
     )
-    user = "\n----\n".join(texts)
-    r = requests.post(
-        "https://api.openai.com/v1/chat/completions",
-        headers={"Authorization": f"Bearer {OPENAI_API_KEY}", "Content-Type": "application/json"},
-        json={
-            "model": OPENAI_MODEL,
-            "messages": [
-                {"role": "system", "content": system},
-                {"role": "user", "content": user},
-            ],
-            "temperature": 0,
-        },
-        timeout=60,
+    user = json.dumps({"items": [{"id": i, "text": t} for i, t in items.items()]}, ensure_ascii=False)
+    return send(
+        "openai",
+        lambda: get_session("openai").post(
+            OPENAI_API_URL,
+            headers={"Authorization": f"Bearer {OPENAI_API_KEY}", "Content-Type": "application/json"},
+            json={
+                "model": OPENAI_MODEL,
+                "messages": [
+                    {"role": "system", "content": system},
+                    {"role": "user", "content": user},
+                ],
+                "response_format": {"type": "json_object"},
+                "temperature": 0,
+            },
+            timeout=request_timeout(),
+        ),
     )
-    if r.status_code == 200:
-        content = r.json()["choices"][0]["message"]["content"]
-        return [s.strip() for s in content.split("\n----\n")]
 
-    # ---------- Quota / 429: tenta fallback ----------
-    if r.status_code == 429:
-        # 1) DeepL se existir
-        if DEEPL_API_KEY:
-            try:
-                return _translate_deepl(texts, source, target)
-            except Exception:
-                pass
-        # 2) Azure se existir
-        if AZURE_KEY:
-            try:
-                return _translate_azure(texts, source, target)
-            except Exception:
-                pass
-        # 3) Último recurso: mantém texto original (no-op)
-        return list(texts)
+def _parse_openai_items(content: str, expected: dict[int, str]) -> dict[int, str]:
+    """Itens válidos da resposta: id esperado, texto string não vazio (se a origem não é vazia)."""
+    try:
+        data = json.loads(content)
+    except (TypeError, ValueError):
+        return {}
+    items = data.get("items") if isinstance(data, dict) else data
+    out: dict[int, str] = {}
+    for it in items if isinstance(items, list) else []:
+        if not isinstance(it, dict):
+            continue
+        try:
+            i = int(it.get("id"))
+        except (TypeError, ValueError):
+            continue
+        t = it.get("text")
+        if i not in expected or i in out or not isinstance(t, str):
+            continue
+        if expected[i].strip() and not t.strip():
+            continue
+        out[i] = t
+    return out
+
+def _translate_openai(texts: Sequence[str], source: str, target: str, markup: bool = False) -> list[str]:
+    """
+    Protocolo JSON (id/text) com validação por item: ids ausentes, duplicados
+    ou vazios são pedidos de novo (só eles), até OPENAI_MAX_REPAIRS vezes.
+    """
+    pending = dict(enumerate(texts))
+    done: dict[int, str] = {}
+    for _ in range(OPENAI_MAX_REPAIRS + 1):
+        # 429/5xx já foram repetidos (ou viraram ProviderUnavailable) no provider_router
+        r = _openai_request(pending, source, target, markup)
+        if r.status_code != 200:
+            raise TranslatorError(f"openai error: {r.status_code} {r.text}")
+
+        content = r.json()["choices"][0]["message"]["content"]
+        got = _parse_openai_items(content, pending)
+        done.update(got)
+        pending = {i: t for i, t in pending.items() if i not in got}
+        if not pending:
+            break
 
-    # Outros erros -> exceção explícita
-    raise TranslatorError(f"openai error: {r.status_code} {r.text}")
+    if pending:
+        raise TranslatorError(
+            f"openai error: {len(pending)} item(s) sem tradução válida após {OPENAI_MAX_REPAIRS} reenvios"
+        )
+    return [done[i] for i in range(len(texts))]
 
 
 
@@ -119,14 +404,104 @@ def _deepl_normalize_langs(source: str | None, target: str | None) -> tuple[str
 
     return s, t
 
-def _translate_deepl(texts: Sequence[str], source: str, target: str) -> list[str]:
-    import requests
+# --------- DeepL: glossários nativos ---------
+
+_deepl_glossaries: dict[tuple, str] = {}
+_deepl_glossaries_lock = threading.Lock()
+
+
+def _deepl_glossary_name(glossary_id: int, version: int, src: str, tgt: str) -> str:
+    return f"ai-translator-g{glossary_id}-v{version}-{src}-{tgt}".lower()
+
+
+def _deepl_glossary_langs(source: str, target: str) -> tuple[str, str] | None:
+    # glossários do DeepL só aceitam idiomas base e exigem source_lang explícito
+    src, tgt = _deepl_normalize_langs(source, target)
+    if not src:
+        return None
+    return src, tgt.split("-")[0]
+
+
+def _deepl_glossary_request(method: str, url: str, **kw):
+    return send(
+        "deepl",
+        lambda: get_session("deepl").request(
+            method, url, headers={"Authorization": f"DeepL-Auth-Key {DEEPL_API_KEY}"}, timeout=request_timeout(), **kw
+        ),
+    )
 
+
+def _deepl_find_or_create_glossary(matcher, name: str, src: str, tgt: str) -> str:
+    r = _deepl_glossary_request("GET", DEEPL_GLOSSARY_URL)
+    if r.status_code >= 400:
+        raise TranslatorError(f"deepl glossary error: {r.status_code} {r.text}")
+    existing = r.json().get("glossaries") or []
+    for g in existing:
+        if g.get("name") == name:
+            return g["glossary_id"]  # criado por outro worker
+
+    entries = "\n".join(
+        f"{s}\t{d}" for s, d in matcher.exact.items() if s.strip() and d.strip() and not set("\t\r\n") & set(s + d)
+    )
+    r = _deepl_glossary_request(
+        "POST",
+        DEEPL_GLOSSARY_URL,
+        data={"name": name, "source_lang": src, "target_lang": tgt, "entries": entries, "entries_format": "tsv"},
+    )
+    if r.status_code >= 400:
+        raise TranslatorError(f"deepl glossary error: {r.status_code} {r.text}")
+    created = r.json()["glossary_id"]
+
+    # versões antigas do mesmo glossário/par não servem mais
+    prefix = name.split("-v", 1)[0] + "-v"
+    suffix = f"-{src}-{tgt}".lower()
+    for g in existing:
+        gname = g.get("name") or ""
+        if gname.startswith(prefix) and gname.endswith(suffix) and gname != name:
+            try:
+                _deepl_glossary_request("DELETE", f"{DEEPL_GLOSSARY_URL}/{g['glossary_id']}")
+            except Exception:
+                pass
+    return created
+
+
+def deepl_glossary_id(matcher, source: str, target: str) -> str | None:
+    """
+    Id do glossário nativo do DeepL para (glossário, versão, par de idiomas),
+    criado uma vez e reaproveitado (cache por processo + busca por nome entre
+    processos). None quando não se aplica ou falha — aí o chamador usa
+    placeholders.
+    """
+    if PROVIDER != "deepl" or not DEEPL_USE_GLOSSARY or not matcher or not getattr(matcher, "key", None):
+        return None
+    langs = _deepl_glossary_langs(source, target)
+    if not langs:
+        return None
+    key = (*matcher.key, *langs)
+    with _deepl_glossaries_lock:
+        if key in _deepl_glossaries:
+            return _deepl_glossaries[key]
+        try:
+            gid = _deepl_find_or_create_glossary(matcher, _deepl_glossary_name(*key), *langs)
+        except Exception:
+            log.exception("falha ao preparar glossário DeepL %s", key)
+            return None
+        _deepl_glossaries[key] = gid
+        return gid
+
+
+def _translate_deepl(
+    texts: Sequence[str], source: str, target: str, glossary_id: str | None = None, markup: bool = False
+) -> list[str]:
     src_norm, tgt_norm = _deepl_normalize_langs(source, target)
 
     data = {"auth_key": DEEPL_API_KEY, "target_lang": tgt_norm}
     if src_norm:
         data["source_lang"] = src_norm  # só envia se suportado
+    if glossary_id and src_norm:
+        data["glossary_id"] = glossary_id
+    if markup:
+        data["tag_handling"] = "xml"
 
     # DeepL aceita vários "text" em formulário x-www-form-urlencoded
     payload = []
@@ -135,31 +510,37 @@ def _translate_deepl(texts: Sequence[str], source: str, target: str) -> list[str
     for t in texts:
         payload.append(("text", t))
 
-    r = requests.post(DEEPL_API_URL, data=payload, timeout=60)
+    r = send("deepl", lambda: get_session("deepl").post(DEEPL_API_URL, data=payload, timeout=request_timeout()))
     if r.status_code >= 400:
         raise TranslatorError(f"deepl error: {r.status_code} {r.text}")
     j = r.json()
     return [tr["text"] for tr in j["translations"]]
 
-def _translate_azure(texts: Sequence[str], source: str, target: str) -> list[str]:
-    import requests, uuid
+def _translate_azure(texts: Sequence[str], source: str, target: str, markup: bool = False) -> list[str]:
     route = f"/translate?api-version=3.0&to={target}"
+    if markup:
+        route += "&textType=html"
     if source:
         route += f"&from={source}"
     url = AZURE_ENDPOINT.rstrip("/") + route
     body = [{"text": t} for t in texts]
-    r = requests.post(
-        url,
-        headers={
-            "Ocp-Apim-Subscription-Key": AZURE_KEY,
-            "Ocp-Apim-Subscription-Region": AZURE_REGION,
-            "Content-Type": "application/json",
-            "X-ClientTraceId": str(uuid.uuid4()),
-        },
-        data=json.dumps(body),
-        timeout=60,
+    r = send(
+        "azure",
+        lambda: get_session("azure").post(
+            url,
+            headers={
+                "Ocp-Apim-Subscription-Key": AZURE_KEY,
+                "Ocp-Apim-Subscription-Region": AZURE_REGION,
+                "Content-Type": "application/json",
+                "X-ClientTraceId": str(uuid.uuid4()),
+            },
+            data=json.dumps(body),
+            timeout=request_timeout(),
+        ),
     )
     if r.status_code >= 400:
         raise TranslatorError(f"azure error: {r.status_code} {r.text}")
     data = r.json()
     return [item["translations"][0]["text"] for item in data]
+
+_PROVIDERS = {"openai": _translate_openai, "deepl": _translate_deepl, "azure": _translate_azure}
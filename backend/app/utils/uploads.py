@@ -0,0 +1,225 @@
+# backend/app/utils/uploads.py
+"""
+Upload em streaming direto para o armazenamento final.
+
+O corpo multipart é lido em blocos (sem o spool temporário do Werkzeug):
+cada arquivo vai para um temporário no mesmo disco dos blobs enquanto o
+SHA-256 é calculado, e no fim vira o blob endereçado por conteúdo com um
+rename (ver content_store) — os bytes são escritos uma vez só.
+
+No caminho:
+- extensão sem handler é recusada antes de ler o conteúdo;
+- os primeiros bytes têm de bater com o formato (zip para DOCX/XLSX/PPTX,
+  XML para XLIFF, texto sem bytes nulos para TXT);
+- o limite de tamanho (MAX_CONTENT_LENGTH) vale para o corpo inteiro;
+- nos pacotes zip, o diretório central é conferido ao final (estrutura,
+  número de entradas, tamanho descompactado e [Content_Types].xml) antes
+  de qualquer parsing de XML.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import struct
+
+from flask import g
+from werkzeug.exceptions import BadRequest, RequestEntityTooLarge, UnsupportedMediaType
+from werkzeug.formparser import FormDataParser
+
+from app.utils.content_store import commit_blob, temp_file
+from app.utils.formats import is_supported, signature_for, supported_extensions
+
+# proteção contra zip bomb: soma dos tamanhos descompactados e quantidade de entradas
+UPLOAD_MAX_UNCOMPRESSED = int(os.getenv("UPLOAD_MAX_UNCOMPRESSED_MB", "1024")) * 1024 * 1024
+UPLOAD_MAX_ZIP_ENTRIES = int(os.getenv("UPLOAD_MAX_ZIP_ENTRIES", "20000"))
+
+_SNIFF_BYTES = 8192
+_ZIP_LOCAL = b"PK\x03\x04"
+_ZIP_CENTRAL = b"PK\x01\x02"
+_ZIP_EOCD = b"PK\x05\x06"
+_EOCD = struct.Struct("<4s4H2LH")
+_CENTRAL = struct.Struct("<4s6H3L5H2L")
+_EOCD_MAX = _EOCD.size + 0xFFFF  # registro + comentário máximo
+_BOMS = (b"\xef\xbb\xbf", b"\xff\xfe", b"\xfe\xff")
+
+
+def _unsupported(msg: str) -> UnsupportedMediaType:
+    return UnsupportedMediaType(description=msg)
+
+
+def _sniff(signature: str, head: bytes, complete: bool) -> None:
+    """
+    Confere o início do arquivo; `complete` = não virão mais bytes para a
+    decisão (senão, com início ainda inconclusivo, espera o próximo bloco).
+    """
+    if signature == "zip":
+        if len(head) >= len(_ZIP_LOCAL) or complete:
+            if not head.startswith(_ZIP_LOCAL):
+                raise _unsupported("O arquivo não é um pacote Office (zip) válido.")
+    elif signature == "xml":
+        for bom in _BOMS:
+            if head.startswith(bom):
+                head = head[len(bom):]
+                break
+        head = head.lstrip()
+        if (head or complete) and not head.startswith(b"<"):
+            raise _unsupported("O arquivo não é um XML válido.")
+    elif signature == "text":
+        if b"\x00" in head:
+            raise _unsupported("O arquivo não parece ser texto (UTF-8/Latin-1).")
+
+
+class UploadSink:
+    """
+    Destino de um arquivo do multipart (o `stream_factory` do Werkzeug):
+    grava no temporário, calcula o hash e valida o formato enquanto os
+    bytes chegam.
+    """
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.signature = signature_for(filename)
+        self.size = 0
+        self.content_hash: str | None = None
+        self._hash = hashlib.sha256()
+        self._head = b""
+        self._tail = bytearray()  # últimos bytes: onde fica o fim do diretório central
+        fd, self.tmp = temp_file()
+        self._f = os.fdopen(fd, "w+b")
+
+    # --- interface de arquivo usada pelo parser multipart ---
+    def write(self, data: bytes) -> int:
+        if len(self._head) < _SNIFF_BYTES:
+            # rejeita cedo: o resto do corpo nem chega a ser lido
+            self._head += data[: _SNIFF_BYTES - len(self._head)]
+            _sniff(self.signature, self._head, len(self._head) >= _SNIFF_BYTES)
+        self.size += len(data)
+        self._hash.update(data)
+        if self.signature == "zip":
+            self._tail += data
+            if len(self._tail) > 2 * _EOCD_MAX:
+                del self._tail[: len(self._tail) - _EOCD_MAX]
+        return self._f.write(data)
+
+    def seek(self, pos: int, whence: int = 0) -> int:
+        return self._f.seek(pos, whence)
+
+    def read(self, size: int = -1) -> bytes:
+        return self._f.read(size)
+
+    # --- fim do upload ---
+    def finish(self) -> None:
+        """Valida o arquivo completo (sem fechar); levanta HTTPException se inválido."""
+        self._f.flush()
+        if self.size == 0:
+            raise BadRequest(description="Arquivo vazio.")
+        _sniff(self.signature, self._head, True)
+        if self.signature == "zip":
+            self._check_zip()
+        self.content_hash = self._hash.hexdigest()
+
+    def commit(self) -> tuple[str, str]:
+        """Publica o blob endereçado por conteúdo; devolve (hash, caminho)."""
+        if self.content_hash is None:
+            self.finish()
+        self._f.close()
+        path = commit_blob(self.tmp, self.content_hash, self.filename)
+        self.tmp = None
+        return self.content_hash, path
+
+    def discard(self) -> None:
+        if self.tmp is None:
+            return
+        self._f.close()
+        try:
+            os.remove(self.tmp)
+        except FileNotFoundError:
+            pass
+        self.tmp = None
+
+    def _check_zip(self) -> None:
+        tail = bytes(self._tail[-_EOCD_MAX:])
+        at = tail.rfind(_ZIP_EOCD)
+        if at < 0 or len(tail) - at < _EOCD.size:
+            raise _unsupported("Pacote zip incompleto (sem diretório central).")
+        _, disk, cd_disk, _, entries, cd_size, cd_offset, comment_len = _EOCD.unpack_from(tail, at)
+        eocd_start = self.size - (len(tail) - at)
+        if disk or cd_disk:
+            raise _unsupported("Zip multivolume não é suportado.")
+        if entries == 0xFFFF or cd_offset == 0xFFFFFFFF or cd_size == 0xFFFFFFFF:
+            raise _unsupported("Zip64 não é suportado.")
+        if eocd_start + _EOCD.size + comment_len != self.size or cd_offset + cd_size != eocd_start:
+            raise _unsupported("Pacote zip corrompido (diretório central inconsistente).")
+        if entries > UPLOAD_MAX_ZIP_ENTRIES:
+            raise _unsupported("Pacote zip com entradas demais.")
+
+        # o diretório central costuma caber no fim já guardado; senão lê do disco
+        tail_start = self.size - len(tail)
+        if cd_offset >= tail_start:
+            cd = tail[cd_offset - tail_start : eocd_start - tail_start]
+        else:
+            pos = self._f.tell()
+            self._f.seek(cd_offset)
+            cd = self._f.read(cd_size)
+            self._f.seek(pos)
+
+        total = 0
+        names = set()
+        off = 0
+        for _ in range(entries):
+            if cd[off : off + 4] != _ZIP_CENTRAL or off + _CENTRAL.size > len(cd):
+                raise _unsupported("Pacote zip corrompido (entrada inválida).")
+            fields = _CENTRAL.unpack_from(cd, off)
+            usize, name_len, extra_len, comment = fields[9], fields[10], fields[11], fields[12]
+            start = off + _CENTRAL.size
+            names.add(cd[start : start + name_len].decode("utf-8", "replace"))
+            total += usize
+            off = start + name_len + extra_len + comment
+        if total > UPLOAD_MAX_UNCOMPRESSED:
+            raise _unsupported("Conteúdo descompactado grande demais.")
+        if "[Content_Types].xml" not in names:
+            raise _unsupported("O zip não é um documento Office (sem [Content_Types].xml).")
+
+
+def _stream_factory(total_content_length, content_type, filename, content_length=None):
+    if not filename or not is_supported(filename):
+        raise _unsupported(f"Formato não suportado. Use: {', '.join(supported_extensions())}")
+    sink = UploadSink(filename)
+    g.setdefault("upload_sinks", []).append(sink)
+    return sink
+
+
+def parse_upload(request):
+    """
+    Lê o corpo multipart da requisição em streaming; devolve (form, files)
+    com os arquivos já validados. Erros de tamanho/formato saem como
+    HTTPException (413/415/400) o quanto antes. Os temporários que não
+    forem publicados com `files[...].stream.commit()` são apagados no fim
+    da requisição (discard_uploads).
+    """
+    if request.mimetype != "multipart/form-data":
+        raise BadRequest(description="Envie o arquivo como multipart/form-data.")
+    parser = FormDataParser(
+        stream_factory=_stream_factory,
+        max_content_length=request.max_content_length,
+        max_form_memory_size=request.max_form_memory_size,
+        max_form_parts=request.max_form_parts,
+        silent=False,
+    )
+    try:
+        _, form, files = parser.parse_from_environ(request.environ)
+    except RequestEntityTooLarge as e:
+        limit = (request.max_content_length or 0) // (1024 * 1024)
+        raise RequestEntityTooLarge(description=f"Arquivo grande demais (limite: {limit} MB).") from e
+    except ValueError as e:
+        raise BadRequest(description=f"Corpo multipart inválido: {e}") from e
+    for f in files.values():
+        f.stream.finish()
+    return form, files
+
+
+def discard_uploads(exc=None) -> None:
+    """teardown: apaga temporários de uploads não publicados (erro ou validação)."""
+    for sink in g.pop("upload_sinks", []):
+        sink.discard()
+
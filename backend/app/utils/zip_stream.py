@@ -0,0 +1,111 @@
+# backend/app/utils/zip_stream.py
+"""
+ZIP em streaming para o download de vários destinos.
+
+O zip é escrito numa saída sem seek (entradas com data descriptor) e cada
+bloco lido do disco já sai na resposta: a memória fica em um bloco, não no
+tamanho do pacote. DOCX/XLSX/PPTX já são zip comprimidos e entram como
+ZIP_STORED (recomprimir só gasta CPU); TXT/XLIFF vão com ZIP_DEFLATED.
+
+Opcional (DOWNLOAD_BUNDLE_CACHE=1): o pacote gerado é gravado em
+OUTPUT_DIR/bundles ao mesmo tempo em que é enviado, com uma chave do
+conjunto de saídas (chave e versão de cada uma). O próximo download do mesmo
+conjunto é servido do arquivo (send_file, com Range/ETag). Quando o
+armazenamento entrega os downloads fora da API (X-Accel/X-Sendfile ou S3,
+ver storage.py), o pacote é sempre gerado uma vez e publicado lá.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Iterable, Iterator
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile, ZipInfo
+
+from app.paths import OUTPUT_DIR
+from app.utils.formats import signature_for
+
+DOWNLOAD_BUNDLE_CACHE = os.getenv("DOWNLOAD_BUNDLE_CACHE", "0") == "1"
+BUNDLE_DIR = OUTPUT_DIR / "bundles"
+
+_CHUNK = 256 * 1024
+
+
+class _Pipe:
+    """Saída do ZipFile: guarda o que foi escrito até o gerador repassar."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _compress_type(path: str) -> int:
+    return ZIP_STORED if signature_for(path) == "zip" else ZIP_DEFLATED
+
+
+def iter_zip(entries: Iterable[tuple[str, str]]) -> Iterator[bytes]:
+    """Bytes do zip com os arquivos `entries` = [(caminho, nome no zip)], bloco a bloco."""
+    pipe = _Pipe()
+    with ZipFile(pipe, "w") as z:
+        for path, arcname in entries:
+            info = ZipInfo.from_file(path, arcname)
+            info.compress_type = _compress_type(path)
+            with open(path, "rb") as src, z.open(info, "w") as dst:
+                while chunk := src.read(_CHUNK):
+                    dst.write(chunk)
+                    data = pipe.drain()
+                    if data:
+                        yield data
+    yield pipe.drain()  # diretório central
+
+
+def bundle_path(job_id: int, fingerprints: Iterable[str]) -> Path:
+    """
+    Arquivo do cache para este conjunto de saídas; `fingerprints` identifica
+    cada saída e a versão dela (ver storage.fingerprint), então o pacote
+    muda se alguma saída mudar.
+    """
+    h = hashlib.sha256()
+    for fp in fingerprints:
+        h.update(f"{fp}\n".encode("utf-8"))
+    return BUNDLE_DIR / f"job_{job_id}_{h.hexdigest()[:32]}.zip"
+
+
+def iter_cached(chunks: Iterator[bytes], path: Path) -> Iterator[bytes]:
+    """
+    Repassa `chunks` gravando uma cópia em `path`; o arquivo só é publicado
+    (rename) se o pacote foi até o fim. Pacotes antigos do mesmo job saem.
+    """
+    path.parent.mkdir(exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".bundle-")
+    done = False
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+                yield chunk
+        os.replace(tmp, path)
+        done = True
+        job_prefix = path.name.rsplit("_", 1)[0] + "_"
+        for old in path.parent.glob(f"{job_prefix}*.zip"):
+            if old != path:
+                old.unlink(missing_ok=True)
+    finally:
+        if not done:  # cliente desconectou ou erro de IO
+            try:
+                os.remove(tmp)
+            except FileNotFoundError:
+                pass
+
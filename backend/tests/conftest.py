@@ -0,0 +1,265 @@
+# backend/tests/conftest.py
+"""
+Fixtures comuns dos testes.
+
+Os testes nunca usam o banco, os diretórios nem o provedor de tradução de
+desenvolvimento: antes de importar o app, DATA_DIR e DATABASE_URL (SQLite)
+apontam para um diretório temporário e TRANSLATOR_PROVIDER fica vazio. Os
+provedores são simulados por um servidor HTTP local (StubProvider).
+
+O que depende do Postgres (FOR UPDATE SKIP LOCKED, LISTEN/NOTIFY) usa o
+fixture `pg_app`, que roda num banco descartável apontado por
+TEST_POSTGRES_URL e é pulado quando ela não está definida.
+"""
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+_TMP = tempfile.mkdtemp(prefix="ai-translator-tests-")
+os.environ["DATA_DIR"] = _TMP
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP, 'test.db')}"
+os.environ["TRANSLATOR_PROVIDER"] = ""
+os.environ["JWT_SECRET_KEY"] = "test-secret-" + "x" * 32
+
+import jwt  # noqa: E402
+import pytest  # noqa: E402
+from sqlalchemy import Enum, event, text  # noqa: E402
+from sqlalchemy.schema import CreateTable  # noqa: E402
+
+from app import create_app  # noqa: E402
+from app.extensions import db  # noqa: E402
+from app.utils import http_pool, provider_router  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    """App com um banco SQLite vazio (tabelas recriadas a cada teste)."""
+    app = create_app()
+    app.config["TESTING"] = True
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def _create_pg_schema(engine) -> None:
+    with engine.begin() as conn:
+        if conn.execute(text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")).first():
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            db.metadata.create_all(conn)
+            return
+        # Postgres sem contrib: as tabelas sem os índices GIN da busca
+        for table in db.metadata.sorted_tables:
+            for col in table.columns:
+                if isinstance(col.type, Enum):
+                    col.type.create(conn, checkfirst=True)
+            conn.execute(CreateTable(table))
+            for index in table.indexes:
+                if index.dialect_options["postgresql"]["using"] != "gin":
+                    index.create(conn)
+
+
+@pytest.fixture
+def pg_app(monkeypatch):
+    """App num Postgres de verdade (TEST_POSTGRES_URL, banco descartável: as tabelas são recriadas)."""
+    url = os.getenv("TEST_POSTGRES_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRES_URL não definida")
+    monkeypatch.setenv("DATABASE_URL", url)
+    app = create_app()
+    app.config["TESTING"] = True
+    with app.app_context():
+        db.drop_all()
+        _create_pg_schema(db.engine)
+        yield app
+        db.session.remove()
+        db.drop_all()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def pg_glossary(pg_app):
+    """Glossário pt-BR → en-US vazio no Postgres."""
+    from app.models import Glossary
+
+    g = Glossary(name="Jurídico", locale_src="pt-BR", locale_dst="en-US")
+    db.session.add(g)
+    db.session.commit()
+    return g
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_headers():
+    """Token do usuário 1 (serve para `app` e `pg_app`: a chave vem do ambiente)."""
+    token = jwt.encode(
+        {"user_id": 1, "exp": datetime.utcnow() + timedelta(minutes=5)},
+        os.environ["JWT_SECRET_KEY"],
+        algorithm="HS256",
+    )
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def count_queries(app):
+    """`with count_queries() as n:` — n[0] = consultas SQL executadas no bloco."""
+
+    @contextmanager
+    def counting():
+        n = [0]
+
+        def on_execute(*args):
+            n[0] += 1
+
+        event.listen(db.engine, "before_cursor_execute", on_execute)
+        try:
+            yield n
+        finally:
+            event.remove(db.engine, "before_cursor_execute", on_execute)
+
+    return counting
+
+
+class StubProvider:
+    """
+    Servidor HTTP local no lugar de um provedor. Por padrão responde como a
+    API do DeepL (ou do Azure, em /translate), cada texto em maiúsculas;
+    `script` enfileira respostas
+    (status, cabeçalhos) para simular 429/5xx e `delay` simula latência.
+    """
+
+    def __init__(self):
+        self.delay = 0.0
+        self.script: deque[tuple[int, dict]] = deque()
+        self.hits = 0
+        self.bodies: list = []  # corpo de cada pedido: formulário (DeepL) ou JSON (Azure)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.clients: set[int] = set()  # portas de origem = conexões TCP distintas
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                with stub._lock:
+                    stub.hits += 1
+                    stub.bodies.append(json.loads(body) if self.path.startswith("/translate") else parse_qs(body.decode()))
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                    stub.clients.add(self.client_address[1])
+                    scripted = stub.script.popleft() if stub.script else None
+                try:
+                    time.sleep(stub.delay)
+                    if scripted is not None:
+                        status, headers = scripted
+                        payload = json.dumps({"message": "scripted"}).encode()
+                    else:
+                        status, headers = 200, {}
+                        if self.path.startswith("/translate"):  # Azure
+                            texts = [item["text"] for item in json.loads(body)]
+                            out = [{"translations": [{"text": t.upper()}]} for t in texts]
+                        else:  # DeepL
+                            texts = parse_qs(body.decode()).get("text", [])
+                            out = {"translations": [{"text": t.upper()} for t in texts]}
+                        payload = json.dumps(out).encode()
+                    self.send_response(status)
+                    for k, v in headers.items():
+                        self.send_header(k, v)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                finally:
+                    with stub._lock:
+                        stub.in_flight -= 1
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+        self.url = f"{self.base_url}/v2/translate"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _reset_providers() -> None:
+    http_pool.close_all()
+    http_pool._slots.clear()
+    provider_router._buckets.clear()
+    provider_router._breakers.clear()
+    provider_router._latencies.clear()
+
+
+@pytest.fixture
+def fresh_providers():
+    """Sessions, vagas, buckets e breakers novos (são globais do processo)."""
+    _reset_providers()
+    yield
+    _reset_providers()
+
+
+@pytest.fixture
+def stub_provider(fresh_providers):
+    stub = StubProvider()
+    yield stub
+    stub.close()
+
+
+@pytest.fixture
+def deepl_stub(stub_provider, monkeypatch):
+    """DeepL como provedor único, apontando para o StubProvider."""
+    from app.utils import translator
+
+    monkeypatch.setattr(translator, "PROVIDER", "deepl")
+    monkeypatch.setattr(translator, "DEEPL_API_KEY", "test-key")
+    monkeypatch.setattr(translator, "DEEPL_API_URL", stub_provider.url)
+    monkeypatch.setattr(translator, "TRANSLATOR_FALLBACKS", [])
+    monkeypatch.setattr(translator, "PROVIDER_HEDGE", False)
+    return stub_provider
+
+
+def _upper_markup(markup: str) -> str:
+    from app.utils.inline_tags import escape_text, split_markup, unescape_text
+
+    parts = split_markup(markup)
+    for k in range(0, len(parts), 2):  # só o texto; as tags inline ficam como estão
+        parts[k] = escape_text(unescape_text(parts[k]).upper())
+    return "".join(parts)
+
+
+@pytest.fixture
+def fake_translator(monkeypatch):
+    """"Traduz" para MAIÚSCULAS sem rede, preservando as tags inline; devolve a lista do que foi enviado."""
+    from app.utils import translator
+
+    sent: list[str] = []
+
+    def provider(texts, *args, **kwargs):
+        sent.extend(texts)
+        return "", [_upper_markup(t) for t in texts]
+
+    monkeypatch.setattr(translator, "_translate_provider", provider)
+    return sent
@@ -0,0 +1,82 @@
+import pytest
+
+from app.utils.batching import BatchLimits, BatchPlan, _cost, _depth_change, plan_batches
+from app.utils.inline_tags import TAG_RE
+
+
+def _balanced(piece: str) -> bool:
+    open_tags = []
+    for closing, kind, n, selfclosing in TAG_RE.findall(piece):
+        if kind != "g" or selfclosing:
+            continue
+        if closing:
+            if not open_tags or open_tags.pop() != n:
+                return False
+        else:
+            open_tags.append(n)
+    return not open_tags
+
+
+def test_batches_respect_the_item_limit_and_keep_order():
+    texts = [f"parágrafo {i}" for i in range(120)]
+    plan = plan_batches(texts, "deepl")
+    assert [len(b) for b in plan.batches] == [50, 50, 20]
+    assert plan.merge(plan.batches) == texts
+
+
+def test_batches_respect_the_character_budget():
+    limits = BatchLimits(max_items=100, max_chars=100)
+    plan = BatchPlan(["a" * 40] * 5, limits)
+    assert [len(b) for b in plan.batches] == [2, 2, 1]
+
+
+def test_deepl_budget_counts_the_encoded_body():
+    # "ç" vira %C3%A7: 9 bytes no corpo por caractere
+    limits = BatchLimits(max_items=50, max_chars=10_000, max_bytes=1000)
+    plan = BatchPlan(["ç" * 50] * 4, limits)
+    assert all(sum(_cost(t, limits)[1] for t in b) <= 1000 for b in plan.batches)
+    assert len(plan.batches) == 2
+
+
+def test_oversized_paragraph_is_split_at_sentences_and_merged_back():
+    limits = BatchLimits(max_items=50, max_chars=60)
+    text = "Primeira frase do parágrafo. Segunda frase, um pouco maior! Terceira frase? Fim."
+    plan = BatchPlan(["curto", text], limits)
+
+    pieces = [p for b in plan.batches for p in b]
+    assert len(pieces) > 2
+    assert all(len(p) <= 60 for p in pieces)
+    assert plan.merge(plan.batches) == ["curto", text]
+
+
+def test_split_never_cuts_inside_a_formatted_span():
+    limits = BatchLimits(max_items=50, max_chars=40)
+    text = (
+        "Texto inicial sem formatação. <g1>Uma frase em negrito. Outra frase em negrito.</g1> "
+        "Frase com <g2>itálico <g3>aninhado</g3> e mais</g2> palavras. Final<x4/> da cláusula."
+    )
+    plan = BatchPlan([text], limits)
+
+    pieces = [p for b in plan.batches for p in b]
+    assert len(pieces) > 1
+    assert all(_balanced(p) for p in pieces), pieces
+    assert all(_depth_change(p) == 0 for p in pieces)
+    assert "<g1>Uma frase em negrito. Outra frase em negrito.</g1>" in pieces[1]
+    assert plan.merge(plan.batches) == [text]
+
+
+def test_word_level_split_keeps_tags_whole():
+    limits = BatchLimits(max_items=50, max_chars=12)
+    text = "palavra <g1>outra palavra</g1> e <x2 /> fim de texto"
+    plan = BatchPlan([text], limits)
+
+    pieces = [p for b in plan.batches for p in b]
+    assert all(_balanced(p) for p in pieces), pieces
+    assert "<x2 />" in " ".join(pieces)
+    assert plan.merge(plan.batches) == [text]
+
+
+@pytest.mark.parametrize("provider", ["deepl", "azure", "openai", "desconhecido"])
+def test_every_provider_has_a_budget(provider):
+    plan = plan_batches(["olá"] * 3, provider)
+    assert plan.batches == [["olá"] * 3]
@@ -0,0 +1,125 @@
+import threading
+import time
+
+import docx
+
+from app.utils import docx_pipeline, translator
+from app.utils.docx_pipeline import run_to_many
+from app.utils.translator import TranslatorError
+
+
+class RecordingProvider:
+    """Provedor falso: anota cada chamada, simula latência e falha nos idiomas de `fail`."""
+
+    def __init__(self, delay: float = 0.0, fail: tuple[str, ...] = ()):
+        self.delay = delay
+        self.fail = fail
+        self.calls: list[tuple[str, list[str]]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, texts, source_lang, target_lang, glossary_id=None, markup=False):
+        with self._lock:
+            self.calls.append((target_lang, list(texts)))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            if target_lang in self.fail:
+                raise TranslatorError(f"{target_lang} indisponível")
+            return "", [f"[{target_lang}] {t}" for t in texts]
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def _doc(path, paragraphs: list[str]) -> None:
+    d = docx.Document()
+    for text in paragraphs:
+        d.add_paragraph(text)
+    d.save(path)
+
+
+def test_source_is_parsed_once_for_all_targets(tmp_path, monkeypatch):
+    src = tmp_path / "in.docx"
+    _doc(src, ["primeiro parágrafo", "segundo parágrafo"])
+    provider = RecordingProvider()
+    monkeypatch.setattr(translator, "_translate_provider", provider)
+
+    handlers = []
+    open_handler = docx_pipeline.open_handler
+
+    def counting_open(path):
+        handler = open_handler(path)
+        iter_segments = handler.iter_segments
+        handler.reads = 0
+
+        def counted():
+            handler.reads += 1
+            return iter_segments()
+
+        handler.iter_segments = counted
+        handlers.append(handler)
+        return handler
+
+    monkeypatch.setattr(docx_pipeline, "open_handler", counting_open)
+    langs = ["en-US", "es-ES", "it-IT"]
+    results = run_to_many(str(src), {lang: str(tmp_path / f"{lang}.docx") for lang in langs}, {}, "pt-BR")
+
+    assert [h.reads for h in handlers] == [1]
+    for lang in langs:
+        assert results[lang]["paragraphs"] == 2
+        assert [p.text for p in docx.Document(tmp_path / f"{lang}.docx").paragraphs] == [
+            f"[{lang}] primeiro parágrafo",
+            f"[{lang}] segundo parágrafo",
+        ]
+
+
+def test_targets_are_translated_in_parallel(tmp_path, monkeypatch):
+    src = tmp_path / "in.docx"
+    _doc(src, ["texto único"])
+    provider = RecordingProvider(delay=0.3)
+    monkeypatch.setattr(translator, "_translate_provider", provider)
+    langs = ["en-US", "es-ES", "it-IT", "fr-FR"]
+
+    t0 = time.monotonic()
+    run_to_many(str(src), {lang: str(tmp_path / f"{lang}.docx") for lang in langs}, {}, "pt-BR", max_workers=4)
+    elapsed = time.monotonic() - t0
+
+    assert provider.max_in_flight == 4
+    assert elapsed < 2 * 0.3  # em série seriam 4 x 0,3 s
+
+
+def test_repeated_paragraphs_are_sent_once_per_target(tmp_path, monkeypatch):
+    src, out = tmp_path / "in.docx", tmp_path / "out.docx"
+    _doc(src, ["Cláusula", "texto", "Cláusula", "Cláusula", "texto"])
+    provider = RecordingProvider()
+    monkeypatch.setattr(translator, "_translate_provider", provider)
+
+    result = run_to_many(str(src), {"en-US": str(out)}, {}, "pt-BR")["en-US"]
+
+    sent = [t for _, texts in provider.calls for t in texts]
+    assert sorted(sent) == ["Cláusula", "texto"]
+    assert (result["paragraphs"], result["unique_segments"]) == (5, 2)
+    assert [p.text for p in docx.Document(out).paragraphs] == [
+        "[en-US] Cláusula",
+        "[en-US] texto",
+        "[en-US] Cláusula",
+        "[en-US] Cláusula",
+        "[en-US] texto",
+    ]
+
+
+def test_a_failing_target_does_not_sink_the_others(tmp_path, monkeypatch):
+    src = tmp_path / "in.docx"
+    _doc(src, ["olá"])
+    monkeypatch.setattr(translator, "_translate_provider", RecordingProvider(fail=("es-ES",)))
+    outputs = {lang: str(tmp_path / f"{lang}.docx") for lang in ("en-US", "es-ES")}
+
+    results = run_to_many(str(src), outputs, {}, "pt-BR")
+
+    assert isinstance(results["es-ES"], TranslatorError)
+    assert not (tmp_path / "es-ES.docx").exists()
+    assert results["en-US"]["target_lang"] == "en-US"
+    assert docx.Document(outputs["en-US"]).paragraphs[0].text == "[en-US] olá"
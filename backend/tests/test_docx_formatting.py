@@ -0,0 +1,139 @@
+import random
+import time
+
+import docx
+import pytest
+from docx.oxml.ns import qn
+from lxml import etree
+
+from app.utils.docx_pipeline import run_docx_to_docx
+from app.utils.docx_segments import apply_translation, extract_segment
+from app.utils.translator import translate_text
+
+W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+
+def _paragraph(xml: str):
+    return etree.fromstring(f'<w:p xmlns:w="{W}">{xml}</w:p>')
+
+
+def _runs(p) -> list[tuple[str, bool, bool]]:
+    return [(r.text, bool(r.bold), bool(r.italic)) for r in p.runs]
+
+
+def test_formatted_spans_become_inline_tags():
+    # a formatação com mais texto é a base (sem tag); as demais viram <gN>
+    p = _paragraph(
+        "<w:r><w:t xml:space='preserve'>segundo o </w:t></w:r>"
+        "<w:r><w:rPr><w:b/></w:rPr><w:t>contrato</w:t></w:r>"
+        "<w:r><w:t xml:space='preserve'> &amp; </w:t></w:r>"
+        "<w:r><w:br/></w:r>"
+        "<w:r><w:rPr><w:i/></w:rPr><w:t>anexo</w:t></w:r>"
+    )
+    seg = extract_segment(p)
+    assert seg.markup == "segundo o <g1>contrato</g1> &amp; <x2/><g3>anexo</g3>"
+    assert seg.plain == "segundo o contrato & anexo"
+
+
+def test_translation_moves_formatting_with_the_words():
+    p = _paragraph(
+        "<w:r><w:t xml:space='preserve'>o </w:t></w:r>"
+        "<w:r><w:rPr><w:b/></w:rPr><w:t>contrato</w:t></w:r>"
+        "<w:r><w:t xml:space='preserve'> social</w:t></w:r>"
+    )
+    extract_segment(p)
+    apply_translation(p, "the articles of <g1>association</g1>")
+    runs = [(r.findtext(qn("w:t")), r.find(qn("w:rPr")) is not None) for r in p.iter(qn("w:r"))]
+    assert runs == [("the articles of ", False), ("association", True)]
+
+
+def test_lost_inline_objects_are_kept():
+    p = _paragraph(
+        "<w:r><w:t>nota</w:t></w:r><w:r><w:footnoteReference w:id='1'/></w:r>"
+    )
+    assert extract_segment(p).markup == "nota<x1/>"
+    apply_translation(p, "note")  # o provedor perdeu a tag
+    assert p.find(f".//{qn('w:footnoteReference')}") is not None
+
+
+def test_docx_round_trip_keeps_run_formatting(tmp_path, fake_translator):
+    src, out = tmp_path / "in.docx", tmp_path / "out.docx"
+    d = docx.Document()
+    p = d.add_paragraph()
+    p.add_run("o contratante ")
+    p.add_run("deverá pagar").bold = True
+    p.add_run(" a multa ")
+    p.add_run("em dobro").italic = True
+    d.add_table(rows=1, cols=1).cell(0, 0).paragraphs[0].add_run("célula").bold = True
+    d.save(src)
+
+    metrics = run_docx_to_docx(str(src), str(out), {}, "pt-BR", "en-US")
+
+    t = docx.Document(out)
+    assert _runs(t.paragraphs[0]) == [
+        ("O CONTRATANTE ", False, False),
+        ("DEVERÁ PAGAR", True, False),
+        (" A MULTA ", False, False),
+        ("EM DOBRO", False, True),
+    ]
+    assert _runs(t.tables[0].cell(0, 0).paragraphs[0]) == [("CÉLULA", True, False)]
+    assert metrics["paragraphs"] == 2
+
+
+def _make_corpus(tmp_path, paragraphs: int) -> list[str]:
+    rnd = random.Random(3)
+    paths = []
+    for n in range(2):
+        d = docx.Document()
+        for i in range(paragraphs):
+            p = d.add_paragraph()
+            p.add_run(f"Cláusula {n}.{i}: o contratante ")
+            p.add_run("deverá pagar").bold = True
+            p.add_run(f" a multa de {rnd.randint(1, 999)} reais ")
+            p.add_run("em até trinta dias").italic = True
+            p.add_run(".")
+        path = tmp_path / f"corpus_{n}.docx"
+        d.save(path)
+        paths.append(str(path))
+    return paths
+
+
+def _previous_path(in_path: str, out_path: str) -> None:
+    """Caminho anterior (p.text = tradução, formatação perdida), referência do benchmark."""
+    doc = docx.Document(in_path)
+    paras = [p.text or "" for p in doc.paragraphs]
+    translated = []
+    for i in range(0, len(paras), 50):
+        translated.extend(translate_text(paras[i : i + 50], "pt-BR", "en-US"))
+    for p, new_text in zip(doc.paragraphs, translated):
+        p.text = new_text
+    doc.save(out_path)
+
+
+def _best_of(runs: int, fn) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def test_benchmark_run_level_rewrite_within_1_5x_of_previous_path(tmp_path, fake_translator):
+    corpus = _make_corpus(tmp_path, 1000)
+    out = str(tmp_path / "out.docx")
+
+    t_old = _best_of(5, lambda: [_previous_path(p, out) for p in corpus])
+    t_new = _best_of(5, lambda: [run_docx_to_docx(p, out, {}, "pt-BR", "en-US") for p in corpus])
+
+    print(f"\ncorpus 2 x 1000 parágrafos: p.text {t_old:.2f}s, runs/tags {t_new:.2f}s ({t_new / t_old:.2f}x)")
+    assert t_new <= 1.5 * t_old
+    assert docx.Document(out).paragraphs[7].runs[1].bold
+
+
+@pytest.mark.parametrize("markup", ["<g1>a</g2>", "</g1>b<g9>", "<x5/>c"])
+def test_malformed_tags_from_provider_do_not_break(markup):
+    p = _paragraph("<w:r><w:rPr><w:b/></w:rPr><w:t>x</w:t></w:r><w:r><w:t>y</w:t></w:r>")
+    extract_segment(p)
+    apply_translation(p, markup)
+    assert "".join(p.itertext()).strip()
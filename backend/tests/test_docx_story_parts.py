@@ -0,0 +1,187 @@
+import io
+import zipfile
+
+import docx
+from lxml import etree
+
+from app.utils.docx_pipeline import run_to_many
+
+NS = {
+    "w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main",
+    "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+    "wp": "http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing",
+    "a": "http://schemas.openxmlformats.org/drawingml/2006/main",
+    "wps": "http://schemas.microsoft.com/office/word/2010/wordprocessingShape",
+    "mc": "http://schemas.openxmlformats.org/markup-compatibility/2006",
+    "v": "urn:schemas-microsoft-com:vml",
+}
+_DECL = " ".join(f'xmlns:{k}="{v}"' for k, v in NS.items())
+_CT = "application/vnd.openxmlformats-officedocument.wordprocessingml."
+
+
+def _package(path, body: str, parts: dict[str, tuple[str, str]]) -> str:
+    """DOCX com `body` no document.xml e partes extras {nome: (tipo, xml sem a raiz)}."""
+    base = io.BytesIO()
+    docx.Document().save(base)
+    with zipfile.ZipFile(base) as src, zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as dst:
+        for info in src.infolist():
+            data = src.read(info)
+            if info.filename == "[Content_Types].xml":
+                overrides = "".join(
+                    f'<Override PartName="/{name}" ContentType="{_CT}{kind}+xml"/>' for name, (kind, _) in parts.items()
+                )
+                data = data.replace(b"</Types>", overrides.encode() + b"</Types>")
+            elif info.filename == "word/document.xml":
+                data = f"<w:document {_DECL}><w:body>{body}<w:sectPr/></w:body></w:document>".encode()
+            dst.writestr(info, data)
+        for name, (kind, xml) in parts.items():
+            root = {"footnotes": "footnotes", "endnotes": "endnotes", "comments": "comments"}.get(kind, "hdr")
+            dst.writestr(name, f"<w:{root} {_DECL}>{xml}</w:{root}>")
+    return str(path)
+
+
+def _part(path, name: str):
+    with zipfile.ZipFile(path) as zf:
+        return etree.fromstring(zf.read(name))
+
+
+def _text(p) -> str:
+    """Texto visível do parágrafo (sem o de caixas de texto aninhadas nem o texto apagado)."""
+    return "".join(p.xpath("./w:r/w:t/text() | ./w:hyperlink/w:r/w:t/text()", namespaces=NS))
+
+
+def _p(text: str) -> str:
+    return f'<w:p><w:r><w:t xml:space="preserve">{text}</w:t></w:r></w:p>'
+
+
+def test_notes_comments_and_headers_are_translated(tmp_path, fake_translator):
+    body = (
+        '<w:p><w:r><w:t xml:space="preserve">Ver a nota</w:t></w:r>'
+        '<w:r><w:rPr><w:rStyle w:val="FootnoteReference"/></w:rPr><w:footnoteReference w:id="1"/></w:r></w:p>'
+    )
+    footnotes = (
+        '<w:footnote w:type="separator" w:id="-1"><w:p><w:r><w:separator/></w:r></w:p></w:footnote>'
+        '<w:footnote w:id="1"><w:p><w:r><w:rPr><w:rStyle w:val="FootnoteReference"/></w:rPr><w:footnoteRef/></w:r>'
+        '<w:r><w:t xml:space="preserve"> Nota de rodapé.</w:t></w:r></w:p></w:footnote>'
+    )
+    src = _package(
+        tmp_path / "in.docx",
+        body,
+        {
+            "word/footnotes.xml": ("footnotes", footnotes),
+            "word/endnotes.xml": ("endnotes", f'<w:endnote w:id="1">{_p("Nota de fim")}</w:endnote>'),
+            "word/comments.xml": ("comments", f'<w:comment w:id="0" w:author="Ana">{_p("Revisar")}</w:comment>'),
+            "word/header1.xml": ("header", _p("Confidencial")),
+            "word/footer1.xml": ("footer", _p("Página")),
+        },
+    )
+    out = tmp_path / "out.docx"
+
+    result = run_to_many(src, {"en-US": str(out)}, {}, "pt-BR")["en-US"]
+
+    assert result["parts"] == 6
+    doc = _part(out, "word/document.xml")
+    assert [_text(p) for p in doc.iter(f"{{{NS['w']}}}p")] == ["VER A NOTA"]
+    assert doc.find(".//w:footnoteReference", NS).get(f"{{{NS['w']}}}id") == "1"
+
+    notes = _part(out, "word/footnotes.xml")
+    assert notes.find(".//w:separator", NS) is not None  # sem texto: fica como está
+    note = notes.xpath("./w:footnote[@w:id='1']/w:p", namespaces=NS)[0]
+    assert _text(note) == " NOTA DE RODAPÉ."
+    assert note.find(".//w:footnoteRef", NS) is not None
+    assert note.xpath("string(./w:r/w:t/@xml:space)", namespaces=NS) == "preserve"
+
+    assert _text(_part(out, "word/endnotes.xml").find(".//w:p", NS)) == "NOTA DE FIM"
+    comment = _part(out, "word/comments.xml").find("w:comment", NS)
+    assert comment.get(f"{{{NS['w']}}}author") == "Ana" and _text(comment.find("w:p", NS)) == "REVISAR"
+    assert _text(_part(out, "word/header1.xml").find("w:p", NS)) == "CONFIDENCIAL"
+    assert _text(_part(out, "word/footer1.xml").find("w:p", NS)) == "PÁGINA"
+
+
+_TEXTBOX = (
+    "<w:txbxContent>"
+    '<w:p><w:r><w:t>texto da caixa</w:t></w:r></w:p>'
+    "</w:txbxContent>"
+)
+
+
+def test_text_boxes_are_translated_in_both_renditions(tmp_path, fake_translator):
+    body = (
+        '<w:p><w:r><w:t xml:space="preserve">Veja o quadro </w:t></w:r><w:r><mc:AlternateContent>'
+        f'<mc:Choice Requires="wps"><w:drawing><wp:anchor><a:graphic><a:graphicData><wps:wsp><wps:txbx>{_TEXTBOX}'
+        "</wps:txbx></wps:wsp></a:graphicData></a:graphic></wp:anchor></w:drawing></mc:Choice>"
+        f"<mc:Fallback><w:pict><v:shape><v:textbox>{_TEXTBOX}</v:textbox></v:shape></w:pict></mc:Fallback>"
+        "</mc:AlternateContent></w:r></w:p>"
+    )
+    src = _package(tmp_path / "in.docx", body, {})
+    out = tmp_path / "out.docx"
+
+    run_to_many(src, {"en-US": str(out)}, {}, "pt-BR")
+
+    doc = _part(out, "word/document.xml")
+    outer = doc.find("w:body/w:p", NS)
+    assert _text(outer) == "VEJA O QUADRO "
+    boxes = doc.findall(".//w:txbxContent/w:p", NS)
+    assert [_text(p) for p in boxes] == ["TEXTO DA CAIXA", "TEXTO DA CAIXA"]
+    assert outer.find(".//mc:Fallback//v:textbox", NS) is not None  # o desenho continua no parágrafo
+    # a mesma caixa nas duas versões (DrawingML e VML) vai ao provedor uma vez só
+    assert sorted(fake_translator) == ["Veja o quadro <x1/>", "texto da caixa"]
+
+
+def test_repeated_cells_and_headers_are_sent_once(tmp_path, fake_translator):
+    cell = f"<w:tc>{_p('Sim')}</w:tc>"
+    body = (
+        _p("Tabela")
+        + f"<w:tbl><w:tr>{cell}{cell}</w:tr><w:tr>{cell}<w:tc>{_p('Não')}</w:tc></w:tr></w:tbl>"
+        + f"<w:sdt><w:sdtContent>{_p('Sim')}</w:sdtContent></w:sdt>"
+    )
+    src = _package(
+        tmp_path / "in.docx",
+        body,
+        {"word/header1.xml": ("header", _p("Confidencial")), "word/header2.xml": ("header", _p("Confidencial"))},
+    )
+    out = tmp_path / "out.docx"
+
+    result = run_to_many(src, {"en-US": str(out)}, {}, "pt-BR")["en-US"]
+
+    assert sorted(fake_translator) == ["Confidencial", "Não", "Sim", "Tabela"]
+    assert (result["paragraphs"], result["unique_segments"]) == (8, 4)
+    doc = _part(out, "word/document.xml")
+    assert [_text(p) for p in doc.iter(f"{{{NS['w']}}}p")] == ["TABELA", "SIM", "SIM", "SIM", "NÃO", "SIM"]
+    for name in ("word/header1.xml", "word/header2.xml"):
+        assert _text(_part(out, name).find("w:p", NS)) == "CONFIDENCIAL"
+
+
+def test_run_level_edge_cases_survive_the_rewrite(tmp_path, fake_translator):
+    body = (
+        '<w:p><w:pPr><w:jc w:val="both"/></w:pPr>'
+        '<w:commentRangeStart w:id="0"/><w:bookmarkStart w:id="5" w:name="clausula"/>'
+        '<w:r><w:t xml:space="preserve">Conforme a </w:t></w:r>'
+        '<w:hyperlink r:id="rId9"><w:r><w:rPr><w:rStyle w:val="Hyperlink"/></w:rPr><w:t>lei federal</w:t></w:r></w:hyperlink>'
+        '<w:bookmarkEnd w:id="5"/><w:commentRangeEnd w:id="0"/>'
+        '<w:r><w:commentReference w:id="0"/></w:r>'
+        '<w:del w:id="7" w:author="Ana"><w:r><w:delText>texto apagado</w:delText></w:r></w:del>'
+        '<w:r><w:t xml:space="preserve"> vigente</w:t><w:tab/><w:t>até hoje</w:t></w:r>'
+        "</w:p>"
+        "<w:p/>"
+    )
+    src = _package(tmp_path / "in.docx", body, {})
+    out = tmp_path / "out.docx"
+
+    run_to_many(src, {"en-US": str(out)}, {}, "pt-BR")
+
+    # o texto apagado (revisão) não é traduzido; o link é um grupo só
+    assert fake_translator == ["Conforme a <g1>lei federal</g1><x2/><x3/> vigente<x4/>até hoje"]
+    p, empty = _part(out, "word/document.xml").findall("w:body/w:p", NS)
+    assert _text(p) == "CONFORME A LEI FEDERAL VIGENTEATÉ HOJE"
+    assert p.find("w:pPr/w:jc", NS) is not None and p.index(p.find("w:pPr", NS)) == 0
+    link = p.find("w:hyperlink", NS)
+    assert link.get(f"{{{NS['r']}}}id") == "rId9"
+    assert link.find("w:r/w:rPr/w:rStyle", NS).get(f"{{{NS['w']}}}val") == "Hyperlink"
+    assert link.findtext("w:r/w:t", namespaces=NS) == "LEI FEDERAL"
+    assert p.findtext(".//w:del/w:r/w:delText", namespaces=NS) == "texto apagado"
+    for anchor in ("commentRangeStart", "commentRangeEnd", "bookmarkStart", "bookmarkEnd"):
+        assert p.find(f"w:{anchor}", NS) is not None, anchor
+    assert p.find("w:r/w:commentReference", NS) is not None
+    assert p.find("w:r/w:tab", NS) is not None
+    assert len(empty) == 0
@@ -0,0 +1,154 @@
+import io
+import os
+import subprocess
+import sys
+import textwrap
+import zipfile
+from pathlib import Path
+
+import docx
+import pytest
+from lxml import etree
+
+from app.utils.docx_pipeline import run_to_many
+from app.utils.formats.docx import DocxPackage
+
+BACKEND = Path(__file__).resolve().parents[1]
+W_NS = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+
+
+def _raw_bytes(zf: zipfile.ZipFile, info: zipfile.ZipInfo) -> bytes:
+    """Bytes comprimidos de um membro, como estão no arquivo."""
+    with open(zf.filename, "rb") as f:
+        f.seek(info.header_offset + 26)
+        name_len, extra_len = int.from_bytes(f.read(2), "little"), int.from_bytes(f.read(2), "little")
+        f.seek(info.header_offset + 30 + name_len + extra_len)
+        return f.read(info.compress_size)
+
+
+def _make_large_docx(path, paragraphs: int, body: str | None = None) -> None:
+    """DOCX gerado direto no zip (rápido), com `paragraphs` parágrafos formatados ou `body` pronto."""
+    base = io.BytesIO()
+    docx.Document().save(base)
+    with zipfile.ZipFile(base) as src, zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as dst:
+        for info in src.infolist():
+            if info.filename != "word/document.xml":
+                dst.writestr(info, src.read(info))
+                continue
+            with dst.open("word/document.xml", "w") as f:
+                f.write(f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><w:document {W_NS}><w:body>'.encode())
+                if body is not None:
+                    f.write(body.encode())
+                for i in range(paragraphs):
+                    f.write(
+                        f'<w:p><w:r><w:t xml:space="preserve">Cláusula {i}: o contratante </w:t></w:r>'
+                        f"<w:r><w:rPr><w:b/></w:rPr><w:t>deverá pagar</w:t></w:r>"
+                        f'<w:r><w:t xml:space="preserve"> a multa em até trinta dias.</w:t></w:r></w:p>'.encode()
+                    )
+                f.write(b"<w:sectPr/></w:body></w:document>")
+
+
+def test_every_story_part_is_translated(tmp_path, fake_translator):
+    src, out = tmp_path / "in.docx", tmp_path / "out.docx"
+    d = docx.Document()
+    d.add_paragraph("corpo do texto")
+    d.add_table(rows=1, cols=2).cell(0, 1).text = "célula"
+    d.sections[0].header.paragraphs[0].text = "cabeçalho"
+    d.sections[0].footer.paragraphs[0].text = "rodapé"
+    d.save(src)
+
+    result = run_to_many(str(src), {"en-US": str(out)}, {}, "pt-BR")["en-US"]
+
+    t = docx.Document(out)
+    assert t.paragraphs[0].text == "CORPO DO TEXTO"
+    assert t.tables[0].cell(0, 1).text == "CÉLULA"
+    assert t.sections[0].header.paragraphs[0].text == "CABEÇALHO"
+    assert t.sections[0].footer.paragraphs[0].text == "RODAPÉ"
+    assert result["parts"] >= 3
+
+
+def test_untouched_members_are_copied_without_recompressing(tmp_path):
+    src, out = tmp_path / "in.docx", tmp_path / "out.docx"
+    docx.Document().save(src)
+    with zipfile.ZipFile(src, "a") as z:
+        z.writestr("word/media/image1.bin", os.urandom(4096), compress_type=zipfile.ZIP_STORED)
+        # escrito em streaming: tem data descriptor, que a cópia crua dispensa
+        with z.open("customXml/item9.xml", "w") as f:
+            f.write(b"<a>" + b"dados " * 5000 + b"</a>")
+
+    handler = DocxPackage(str(src))
+    handler.save(str(out), lambda: None, "en-US")
+
+    with zipfile.ZipFile(src) as a, zipfile.ZipFile(out) as b:
+        assert b.testzip() is None
+        assert [i.filename for i in a.infolist()] == [i.filename for i in b.infolist()]
+        for info in a.infolist():
+            if info.filename in handler.story_names:
+                continue
+            copied = b.getinfo(info.filename)
+            assert (copied.compress_type, copied.CRC, copied.compress_size) == (
+                info.compress_type,
+                info.CRC,
+                info.compress_size,
+            )
+            assert _raw_bytes(b, copied) == _raw_bytes(a, info)
+
+
+def test_untrusted_xml_keeps_libxml2_limits(tmp_path):
+    # aninhamento além do limite padrão do libxml2 (256) só passaria com huge_tree
+    path = tmp_path / "deep.docx"
+    deep = "<w:sdt><w:sdtContent>" * 300 + "<w:p/>" + "</w:sdtContent></w:sdt>" * 300
+    _make_large_docx(path, 0, body=deep)
+    with pytest.raises(etree.XMLSyntaxError):
+        list(DocxPackage(str(path)).iter_segments())
+
+
+_PROBE = textwrap.dedent(
+    """
+    import sys, zipfile
+    mode, path = sys.argv[1], sys.argv[2]
+    import docx
+    from app.utils.docx_segments import extract_segment, story_paragraphs
+    from app.utils.formats.docx import _CONTAINERS, DocxPackage
+    from app.utils.formats.ooxml import stream_part
+
+    if mode == "read":
+        with zipfile.ZipFile(path) as zf, zf.open("word/document.xml") as fp:
+            stream_part(fp, lambda el: [extract_segment(p) for p in story_paragraphs(el)], containers=_CONTAINERS)
+    elif mode == "write":
+        DocxPackage(path).save(path + ".out", lambda: "TRANSLATED <g1>TEXT</g1>", "en-US")
+    else:
+        [p.text for p in docx.Document(path).paragraphs]
+    # VmHWM: pico de RSS deste processo (o ru_maxrss herdaria o do pytest no fork)
+    with open("/proc/self/status") as f:
+        print(next(line.split()[1] for line in f if line.startswith("VmHWM:")))
+    """
+)
+
+
+def _peak_kib(mode: str, path) -> int:
+    """Pico de memória (RSS) de um processo novo que só lê/grava `path`."""
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE, mode, str(path)],
+        cwd=BACKEND,
+        env={**os.environ, "PYTHONPATH": str(BACKEND)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return int(out.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/status"), reason="VmHWM só no Linux")
+def test_benchmark_peak_memory_does_not_grow_with_page_count(tmp_path):
+    small, large = tmp_path / "small.docx", tmp_path / "large.docx"
+    _make_large_docx(small, 2_000)
+    _make_large_docx(large, 40_000)  # ~1500 páginas
+
+    growth = {mode: _peak_kib(mode, large) - _peak_kib(mode, small) for mode in ("read", "write", "python-docx")}
+    print(f"\npico de memória, 2k -> 40k parágrafos (KiB a mais): {growth}")
+
+    assert growth["read"] < 8 * 1024
+    assert growth["write"] < 8 * 1024
+    # referência: o Document() do python-docx cresce com o documento
+    assert growth["python-docx"] > 5 * max(growth["read"], growth["write"], 1024)
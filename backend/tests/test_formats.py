@@ -0,0 +1,221 @@
+import zipfile
+
+import openpyxl
+import pptx
+import pytest
+from lxml import etree
+from openpyxl.cell.rich_text import CellRichText, TextBlock
+from openpyxl.cell.text import InlineFont
+from pptx.util import Inches
+
+from app.utils.docx_pipeline import run_to_many
+from app.utils.formats import UnsupportedFormat, open_handler
+
+
+def _translate(src, out, lang="en-US") -> dict:
+    result = run_to_many(str(src), {lang: str(out)}, {}, "pt-BR")[lang]
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+
+# ---------- XLSX ----------
+
+
+def test_xlsx_shared_strings_are_translated_once_and_formulas_kept(tmp_path, fake_translator):
+    src, out = tmp_path / "in.xlsx", tmp_path / "out.xlsx"
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Resumo"
+    ws.append(["Descrição", "Valor"])
+    ws.append(["Aluguel", 1500])
+    ws.append(["Aluguel", 2500.75])
+    ws.append(["Total", "=SUM(B2:B3)"])
+    ws["C1"] = CellRichText("Prazo ", TextBlock(InlineFont(b=True), "vencido"))
+    ws["D1"] = "2024-03-15"
+    wb.save(src)
+
+    _translate(src, out)
+
+    assert sorted(fake_translator) == ["<g1>Prazo </g1>vencido", "Aluguel", "Descrição", "Total", "Valor"]
+    t = openpyxl.load_workbook(out, rich_text=True)
+    ws = t["Resumo"]  # nomes de aba não são traduzidos
+    assert [[c.value for c in row] for row in ws.iter_rows(min_col=1, max_col=2)] == [
+        ["DESCRIÇÃO", "VALOR"],
+        ["ALUGUEL", 1500],
+        ["ALUGUEL", 2500.75],
+        ["TOTAL", "=SUM(B2:B3)"],
+    ]
+    rich = ws["C1"].value
+    assert str(rich) == "PRAZO VENCIDO"
+    assert [bool(b.font.b) for b in rich if isinstance(b, TextBlock)] == [True]
+    assert ws["D1"].value == "2024-03-15"  # data como texto: não vai ao provedor
+
+
+def test_xlsx_inline_strings_are_translated(tmp_path, fake_translator):
+    src, out = tmp_path / "in.xlsx", tmp_path / "out.xlsx"
+    openpyxl.Workbook().save(src)
+    sheet = (
+        '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+        '<row r="1"><c r="A1" t="inlineStr"><is><t>Contrato</t></is></c><c r="B1"><v>42</v></c>'
+        '<c r="C1"><f>B1*2</f><v>84</v></c></row>'
+        "</sheetData></worksheet>"
+    )
+    _replace_member(src, "xl/worksheets/sheet1.xml", sheet.encode())
+
+    _translate(src, out)
+
+    ws = openpyxl.load_workbook(out).active
+    assert (ws["A1"].value, ws["B1"].value, ws["C1"].value) == ("CONTRATO", 42, "=B1*2")
+
+
+def _replace_member(path, name: str, data: bytes) -> None:
+    with zipfile.ZipFile(path) as zf:
+        members = [(i, zf.read(i)) for i in zf.infolist()]
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for info, raw in members:
+            zf.writestr(info, data if info.filename == name else raw)
+
+
+# ---------- PPTX ----------
+
+
+def test_pptx_text_frames_tables_and_notes(tmp_path, fake_translator):
+    src, out = tmp_path / "in.pptx", tmp_path / "out.pptx"
+    prs = pptx.Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[5])  # só título
+    slide.shapes.title.text = "Relatório anual"
+    para = slide.shapes.add_textbox(Inches(1), Inches(2), Inches(6), Inches(1)).text_frame.paragraphs[0]
+    para.add_run().text = "O contrato "
+    bold = para.add_run()
+    bold.text = "foi renovado"
+    bold.font.bold = True
+    para.add_run().text = " em março."
+    table = slide.shapes.add_table(1, 2, Inches(1), Inches(4), Inches(4), Inches(1)).table
+    table.cell(0, 0).text = "Cliente"
+    table.cell(0, 1).text = "2024"
+    slide.notes_slide.notes_text_frame.text = "Falar devagar"
+    prs.save(src)
+
+    result = _translate(src, out)
+
+    assert result["parts"] == 2  # slide + anotações (layouts e masters ficam de fora)
+    slide = pptx.Presentation(out).slides[0]
+    assert slide.shapes.title.text == "RELATÓRIO ANUAL"
+    runs = [(r.text, bool(r.font.bold)) for r in slide.shapes[1].text_frame.paragraphs[0].runs]
+    assert runs == [("O CONTRATO ", False), ("FOI RENOVADO", True), (" EM MARÇO.", False)]
+    cells = slide.shapes[2].table.rows[0].cells
+    assert (cells[0].text, cells[1].text) == ("CLIENTE", "2024")
+    assert slide.notes_slide.notes_text_frame.text == "FALAR DEVAGAR"
+    assert "2024" not in fake_translator
+
+
+# ---------- TXT ----------
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        ("Olá\r\n  recuado\r\n\r\nfim".encode("utf-8"), "OLÁ\r\n  RECUADO\r\n\r\nFIM".encode("utf-8")),
+        ("\ufeffCabeçalho\nlinha  \n".encode("utf-8"), "\ufeffCABEÇALHO\nLINHA  \n".encode("utf-8")),
+        # não é UTF-8: lido como Latin-1, gravado em UTF-8
+        ("Ação\rmisto\n".encode("latin-1"), "AÇÃO\rMISTO\n".encode("utf-8")),
+    ],
+)
+def test_txt_keeps_line_endings_indentation_and_bom(tmp_path, fake_translator, raw, expected):
+    src, out = tmp_path / "in.txt", tmp_path / "out.txt"
+    src.write_bytes(raw)
+    _translate(src, out)
+    assert out.read_bytes() == expected
+
+
+# ---------- XLIFF ----------
+
+_XLIFF12 = """<?xml version="1.0" encoding="UTF-8"?>
+<xliff version="1.2" xmlns="urn:oasis:names:tc:xliff:document:1.2">
+  <file source-language="pt-BR" datatype="plaintext" original="contrato.docx">
+    <body>
+      <trans-unit id="1">
+        <source>O <g id="1">contrato</g> vence<x id="2"/> hoje.</source>
+      </trans-unit>
+      <trans-unit id="2" translate="no">
+        <source>ACME Ltda.</source>
+      </trans-unit>
+      <trans-unit id="3">
+        <source>Multa</source>
+        <target state="final">Penalty</target>
+      </trans-unit>
+      <trans-unit id="4">
+        <source>Cláusula</source>
+        <target/>
+      </trans-unit>
+    </body>
+  </file>
+</xliff>
+"""
+
+_XLIFF20 = """<?xml version="1.0" encoding="UTF-8"?>
+<xliff version="2.0" xmlns="urn:oasis:names:tc:xliff:document:2.0" srcLang="pt-BR">
+  <file id="f1">
+    <unit id="1">
+      <segment><source>Assine <pc id="1">aqui</pc><ph id="2"/></source></segment>
+      <segment><source>Data</source><target>Date</target></segment>
+    </unit>
+    <unit id="2" translate="no">
+      <segment><source>Não traduzir</source></segment>
+    </unit>
+  </file>
+</xliff>
+"""
+
+
+def _xliff(path) -> tuple[str, etree._Element]:
+    root = etree.parse(str(path)).getroot()
+    return etree.QName(root).namespace, root
+
+
+def test_xliff12_skips_locked_and_reviewed_units(tmp_path, fake_translator):
+    src, out = tmp_path / "in.xlf", tmp_path / "out.xlf"
+    src.write_text(_XLIFF12, encoding="utf-8")
+
+    _translate(src, out)
+
+    assert fake_translator == ["O <g1>contrato</g1> vence<x2/> hoje.", "Cláusula"]
+    ns, root = _xliff(out)
+    units = {tu.get("id"): tu for tu in root.iter(f"{{{ns}}}trans-unit")}
+    assert root.find(f"{{{ns}}}file").get("target-language") == "en-US"
+
+    target = units["1"].find(f"{{{ns}}}target")
+    assert target.get("state") == "translated"
+    inner = etree.tostring(target, encoding="unicode").split(">", 1)[1].rsplit("<", 1)[0]
+    assert inner == 'O <g id="1">CONTRATO</g> VENCE<x id="2"/> HOJE.'
+    assert units["2"].find(f"{{{ns}}}target") is None
+    assert units["3"].findtext(f"{{{ns}}}target") == "Penalty"
+    assert units["3"].find(f"{{{ns}}}target").get("state") == "final"
+    assert units["4"].findtext(f"{{{ns}}}target") == "CLÁUSULA"
+
+
+def test_xliff20_segments(tmp_path, fake_translator):
+    src, out = tmp_path / "in.xliff", tmp_path / "out.xliff"
+    src.write_text(_XLIFF20, encoding="utf-8")
+
+    _translate(src, out, "es-ES")
+
+    assert fake_translator == ["Assine <g1>aqui</g1><x2/>"]
+    ns, root = _xliff(out)
+    assert root.get("trgLang") == "es-ES"
+    first, reviewed = root.find(f".//{{{ns}}}unit[@id='1']").iter(f"{{{ns}}}segment")
+    target = first.find(f"{{{ns}}}target")
+    assert "".join(target.itertext()) == "ASSINE AQUI"
+    assert [etree.QName(el).localname for el in target.iter()] == ["target", "pc", "ph"]
+    assert first.get("state") == "translated"
+    assert reviewed.findtext(f"{{{ns}}}target") == "Date"
+    locked = root.find(f".//{{{ns}}}unit[@id='2']//{{{ns}}}segment")
+    assert locked.find(f"{{{ns}}}target") is None
+
+
+def test_unknown_extension_is_rejected(tmp_path):
+    path = tmp_path / "planilha.ods"
+    path.write_bytes(b"PK")
+    with pytest.raises(UnsupportedFormat):
+        open_handler(str(path))
@@ -0,0 +1,158 @@
+import io
+
+import pytest
+
+from app.extensions import db
+from app.models import Glossary, GlossaryTerm, Job
+from app.utils import glossary_cache
+from app.utils.glossary_import import MAX_TERM_LENGTH, import_terms_csv
+
+
+def _create(client, auth_headers, **data) -> dict:
+    body = {"name": "Jurídico", "locale_src": "pt-BR", "locale_dst": "en-US", **data}
+    resp = client.post("/api/glossaries", json=body, headers=auth_headers)
+    assert resp.status_code == 201
+    return resp.get_json()
+
+
+def _edit(client, auth_headers, g_id, terms):
+    return client.patch(f"/api/glossaries/{g_id}/terms", json={"terms": terms}, headers=auth_headers)
+
+
+def _csv(text: str) -> io.BytesIO:
+    return io.BytesIO(text.encode("utf-8"))
+
+
+# ---------- CRUD ----------
+
+
+def test_create_list_get_and_delete(client, auth_headers):
+    assert client.post("/api/glossaries", json={"name": "x"}, headers=auth_headers).status_code == 400
+    g = _create(client, auth_headers)
+    assert g["version"] == 1 and g["terms"] == 0
+
+    _edit(client, auth_headers, g["id"], {"contrato": "agreement", "multa": "penalty"})
+    listed = client.get("/api/glossaries", headers=auth_headers).get_json()
+    assert [(x["id"], x["terms"]) for x in listed] == [(g["id"], 2)]
+    got = client.get(f"/api/glossaries/{g['id']}", headers=auth_headers).get_json()
+    assert got["terms"] == {"contrato": "agreement", "multa": "penalty"}
+
+    job = Job(status="done", source_lang="pt-BR", target_lang="en-US", glossary_id=g["id"])
+    db.session.add(job)
+    db.session.commit()
+    assert client.delete(f"/api/glossaries/{g['id']}", headers=auth_headers).get_json() == {"ok": True}
+    assert client.get(f"/api/glossaries/{g['id']}", headers=auth_headers).status_code == 404
+    assert db.session.query(GlossaryTerm).count() == 0
+    db.session.refresh(job)
+    assert job.glossary_id is None  # o job fica, só perde a referência
+
+
+def test_edit_normalizes_removes_and_bumps_the_version(client, auth_headers):
+    g = _create(client, auth_headers)
+    resp = _edit(client, auth_headers, g["id"], {" contrato ": " agreement ", "multa": "fine", "  ": "x"})
+    assert resp.get_json() == {"ok": True, "version": 2}
+
+    resp = _edit(client, auth_headers, g["id"], {"multa": "penalty", "contrato": None, "foro": ""})
+    assert resp.get_json()["version"] == 3
+    got = client.get(f"/api/glossaries/{g['id']}", headers=auth_headers).get_json()
+    assert got["terms"] == {"multa": "penalty"}
+
+
+def test_edit_invalidates_the_compiled_matcher(client, auth_headers):
+    g = _create(client, auth_headers)
+    _edit(client, auth_headers, g["id"], {"contrato": "agreement"})
+    first = glossary_cache.get_matcher(g["id"])
+    assert glossary_cache.get_matcher(g["id"]) is first  # mesma versão: cache
+
+    _edit(client, auth_headers, g["id"], {"contrato": "contract"})
+    second = glossary_cache.get_matcher(g["id"])
+    assert second is not first
+    assert second.key == (g["id"], 3)
+
+
+@pytest.mark.parametrize(
+    "terms, error",
+    [
+        ({"a" * (MAX_TERM_LENGTH + 1): "x"}, "limited to 400"),
+        ({"contrato": "x" * (MAX_TERM_LENGTH + 1)}, "limited to 400"),
+        ({"a" * (MAX_TERM_LENGTH + 1): None}, "limited to 400"),
+        ({"contrato": 5}, "string or null"),
+        ({"contrato": ["agreement"]}, "string or null"),
+        ({"con\x00trato": "agreement"}, "NUL"),
+    ],
+)
+def test_invalid_terms_are_rejected_before_the_database(client, auth_headers, terms, error):
+    g = _create(client, auth_headers)
+    _edit(client, auth_headers, g["id"], {"multa": "penalty"})
+
+    resp = _edit(client, auth_headers, g["id"], {"foro": "venue", **terms})
+    assert resp.status_code == 400
+    assert error in resp.get_json()["error"]
+    got = client.get(f"/api/glossaries/{g['id']}", headers=auth_headers).get_json()
+    assert got["terms"] == {"multa": "penalty"} and got["version"] == 2  # nada gravado
+
+
+def test_edit_requires_an_object(client, auth_headers):
+    g = _create(client, auth_headers)
+    resp = client.patch(f"/api/glossaries/{g['id']}/terms", json={"terms": ["a"]}, headers=auth_headers)
+    assert resp.status_code == 400
+    assert _edit(client, auth_headers, 999, {"a": "b"}).status_code == 404
+
+
+# ---------- import (INSERT ... ON CONFLICT: Postgres) ----------
+
+
+def test_import_upserts_and_counts(pg_app, pg_glossary, auth_headers):
+    client = pg_app.test_client()
+    db.session.add(GlossaryTerm(glossary_id=pg_glossary.id, src="multa", dst="fine"))
+    db.session.commit()
+
+    data = (
+        "src,dst,notes\n"
+        "contrato,agreement,\n"
+        "multa,penalty,revisado\n"  # já existe: atualiza
+        "foro,venue,\n"
+        "foro,forum,\n"  # repetido no lote: o último vence
+        ",sem origem,\n"
+        f"{'a' * (MAX_TERM_LENGTH + 1)},longo demais,\n"
+    )
+    resp = client.post(
+        f"/api/glossaries/{pg_glossary.id}/import",
+        data={"file": (_csv(data), "termos.csv")},
+        headers=auth_headers,
+    )
+    assert resp.status_code == 200
+    assert resp.get_json() == {
+        "ok": True,
+        "inserted": 2,
+        "updated": 1,
+        "rejected": 2,
+        "duplicates": 1,
+        "terms": 3,
+        "version": 2,
+    }
+    rows = dict(db.session.query(GlossaryTerm.src, GlossaryTerm.notes))
+    assert rows == {"contrato": None, "multa": "revisado", "foro": None}
+    got = client.get(f"/api/glossaries/{pg_glossary.id}", headers=auth_headers).get_json()
+    assert got["terms"] == {"contrato": "agreement", "foro": "forum", "multa": "penalty"}
+
+
+def test_import_rejects_a_csv_without_the_columns(pg_app, pg_glossary, auth_headers):
+    client = pg_app.test_client()
+    resp = client.post(
+        f"/api/glossaries/{pg_glossary.id}/import",
+        data={"file": (_csv("origem,destino\ncontrato,agreement\n"), "termos.csv")},
+        headers=auth_headers,
+    )
+    assert resp.status_code == 400
+    db.session.refresh(pg_glossary)
+    assert pg_glossary.version == 1  # import recusado não invalida o cache
+
+
+def test_import_in_small_batches_gives_the_same_result(pg_app, pg_glossary):
+    data = "src,dst\n" + "".join(f"termo {i},term {i}\n" for i in range(25)) + "termo 3,term three\n"
+    stats = import_terms_csv(pg_glossary.id, _csv(data), batch_size=10)
+    db.session.commit()
+    # "termo 3" repetido cai noutro lote: vira update, não duplicate
+    assert stats == {"inserted": 25, "updated": 1, "rejected": 0, "duplicates": 0}
+    assert db.session.query(GlossaryTerm).filter_by(src="termo 3").one().dst == "term three"
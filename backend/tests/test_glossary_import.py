@@ -0,0 +1,96 @@
+import io
+
+import pytest
+
+from app.extensions import db
+from app.models import Glossary, GlossaryTerm
+from app.utils import glossary_import
+from app.utils.glossary_import import CsvImportError, import_terms_csv
+
+
+@pytest.fixture
+def flushed(monkeypatch):
+    """Tamanho de cada lote gravado (o que fica em memória de uma vez)."""
+    sizes: list[int] = []
+    flush = glossary_import._flush
+
+    def recording(glossary_id, batch, stats):
+        if batch:
+            sizes.append(len(batch))
+        flush(glossary_id, batch, stats)
+
+    monkeypatch.setattr(glossary_import, "_flush", recording)
+    return sizes
+
+
+# ---------- validação (antes de qualquer gravação: roda em qualquer banco) ----------
+
+
+@pytest.mark.parametrize(
+    "payload, error",
+    [
+        (b"origem,destino\ncontrato,agreement\n", "'src' and 'dst'"),
+        (b"", "'src' and 'dst'"),
+        ("src,dst\ncontrato,acordo\ncl\xe1usula,clause\n".encode("latin-1"), "UTF-8"),
+        (b"src,dst\n" + b"a" * 200_000 + b",x\n", "invalid csv"),  # acima do csv.field_size_limit()
+    ],
+)
+def test_malformed_csv_raises_before_writing(app, flushed, payload, error):
+    with pytest.raises(CsvImportError, match=error):
+        import_terms_csv(1, io.BytesIO(payload))
+    assert flushed == []
+
+
+def test_missing_file_is_a_400(client, auth_headers):
+    g = Glossary(name="Jurídico", locale_src="pt-BR", locale_dst="en-US")
+    db.session.add(g)
+    db.session.commit()
+    resp = client.post(f"/api/glossaries/{g.id}/import", headers=auth_headers)
+    assert resp.status_code == 400
+    assert resp.get_json() == {"error": "csv required"}
+
+
+# ---------- gravação em lotes (Postgres) ----------
+
+
+def test_memory_is_bounded_by_the_batch_not_the_file(pg_glossary, flushed):
+    rows = 2_500
+    data = "src,dst\n" + "".join(f"termo {i},term {i}\n" for i in range(rows))
+    stats = import_terms_csv(pg_glossary.id, io.BytesIO(data.encode()), batch_size=1000)
+    db.session.commit()
+
+    assert flushed == [1000, 1000, 500]
+    assert stats["inserted"] == rows
+    assert db.session.query(GlossaryTerm).filter_by(glossary_id=pg_glossary.id).count() == rows
+
+
+def test_header_variants_bom_and_bad_rows(pg_glossary):
+    data = (
+        "\ufeff Src ,DST,Notes,extra\n"  # BOM do Excel, maiúsculas, espaços, coluna a mais
+        "  contrato  ,  agreement  ,  ,x\n"
+        "multa,,,\n"  # sem destino
+        "foro,venue,nota\x00suja,\n"  # NUL: o text do Postgres não guarda
+        "prazo,deadline\n"  # linha curta: notes fica vazio
+    )
+    stats = import_terms_csv(pg_glossary.id, io.BytesIO(data.encode()))
+    db.session.commit()
+
+    assert stats == {"inserted": 2, "updated": 0, "rejected": 2, "duplicates": 0}
+    rows = {t.src: (t.dst, t.notes) for t in db.session.query(GlossaryTerm)}
+    assert rows == {"contrato": ("agreement", None), "prazo": ("deadline", None)}
+
+
+def test_a_failure_midway_rolls_back_earlier_batches(pg_app, pg_glossary, auth_headers, monkeypatch):
+    monkeypatch.setattr(glossary_import, "IMPORT_BATCH_SIZE", 2)
+    data = "src,dst\ncontrato,agreement\nmulta,fine\nforo,venue\n".encode() + "cl\xe1usula,clause\n".encode("latin-1")
+
+    resp = pg_app.test_client().post(
+        f"/api/glossaries/{pg_glossary.id}/import",
+        data={"file": (io.BytesIO(data), "termos.csv")},
+        headers=auth_headers,
+    )
+    assert resp.status_code == 400
+    assert resp.get_json() == {"error": "csv must be UTF-8"}
+    assert db.session.query(GlossaryTerm).count() == 0  # o 1º lote já tinha ido para o banco
+    db.session.refresh(pg_glossary)
+    assert pg_glossary.version == 1
@@ -0,0 +1,176 @@
+import docx
+import pytest
+
+from app.utils import translator
+from app.utils.docx_pipeline import run_to_many
+from app.utils.glossary_matcher import GlossaryMatcher
+
+
+class FakeResponse:
+    def __init__(self, payload: dict, status_code: int = 200):
+        self.status_code = status_code
+        self.text = str(payload)
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+@pytest.fixture
+def deepl_glossaries(monkeypatch):
+    """API de glossários do DeepL simulada: `existing` é o que já está na conta."""
+    calls: list[tuple] = []
+    state = {"existing": [], "fail": False}
+
+    def request(method, url, **kw):
+        calls.append((method, url, kw.get("data")))
+        if state["fail"]:
+            return FakeResponse({"message": "quota"}, 456)
+        if method == "GET":
+            return FakeResponse({"glossaries": state["existing"]})
+        if method == "POST":
+            return FakeResponse({"glossary_id": "gl-new"})
+        return FakeResponse({}, 204)
+
+    monkeypatch.setattr(translator, "_deepl_glossary_request", request)
+    monkeypatch.setattr(translator, "PROVIDER", "deepl")
+    monkeypatch.setattr(translator, "DEEPL_USE_GLOSSARY", True)
+    monkeypatch.setattr(translator, "_deepl_glossaries", {})
+    return calls, state
+
+
+def _matcher(version: int = 3) -> GlossaryMatcher:
+    return GlossaryMatcher(
+        {"contrato": "agreement", "foro": "venue", "com\ttab": "x"}, key=(7, version), locales=("pt-BR", "en-US")
+    )
+
+
+def _docx(path, *paragraphs: str) -> str:
+    d = docx.Document()
+    for text in paragraphs:
+        d.add_paragraph(text)
+    d.save(path)
+    return str(path)
+
+
+def _texts(path) -> list[str]:
+    return [p.text for p in docx.Document(path).paragraphs]
+
+
+# ---------- placeholders ----------
+
+
+def test_placeholders_round_trip_through_the_pipeline(tmp_path, monkeypatch):
+    sent: list[str] = []
+
+    def provider(texts, *args):
+        sent.extend(texts)
+        return "", [t.upper() for t in texts]
+
+    monkeypatch.setattr(translator, "_translate_provider", provider)
+    src = _docx(tmp_path / "in.docx", "O Contrato define o foro.", "Contrato", "Sem termos aqui.")
+    out = tmp_path / "out.docx"
+
+    result = run_to_many(src, {"en-US": str(out)}, {"contrato": "agreement", "foro": "venue"}, "pt-BR")["en-US"]
+
+    assert sent == ["O ⟦0⟧ define o ⟦1⟧.", "Sem termos aqui."]
+    # o termo volta depois da tradução, com a caixa da origem; "Contrato" sozinho nem vai ao provedor
+    assert _texts(out) == ["O Agreement DEFINE O venue.", "Agreement", "SEM TERMOS AQUI."]
+    assert result["glossary_mode"] == "placeholder"
+    assert (result["glossary_hits"], result["glossary_lost"], result["segments_skipped"]) == (3, 0, 1)
+
+
+def test_placeholder_dropped_by_the_provider_is_counted(tmp_path, monkeypatch):
+    monkeypatch.setattr(translator, "_translate_provider", lambda texts, *a: ("", [t.replace("⟦1⟧", "") for t in texts]))
+    src = _docx(tmp_path / "in.docx", "O contrato define o foro.")
+    out = tmp_path / "out.docx"
+
+    result = run_to_many(src, {"en-US": str(out)}, {"contrato": "agreement", "foro": "venue"}, "pt-BR")["en-US"]
+
+    assert _texts(out) == ["O agreement define o ."]
+    assert result["glossary_lost"] == 1
+
+
+def test_glossary_only_applies_to_targets_of_its_pair(tmp_path, fake_translator):
+    src = _docx(tmp_path / "in.docx", "O contrato.")
+    outputs = {"en-US": str(tmp_path / "en.docx"), "es-ES": str(tmp_path / "es.docx")}
+
+    results = run_to_many(src, outputs, _matcher(), "pt-BR")
+
+    assert _texts(outputs["en-US"]) == ["O agreement."]
+    assert _texts(outputs["es-ES"]) == ["O CONTRATO."]  # nem placeholder nem termo de destino
+    assert results["en-US"]["glossary_mode"] == "placeholder"
+    assert results["es-ES"]["glossary_mode"] == "locale_mismatch"
+    assert results["es-ES"]["glossary_terms"] == 0
+
+
+# ---------- glossário nativo do DeepL ----------
+
+
+def test_deepl_glossary_is_created_once_per_version_and_pair(deepl_glossaries):
+    calls, state = deepl_glossaries
+    state["existing"] = [
+        {"name": "ai-translator-g7-v2-pt-en", "glossary_id": "gl-old"},
+        {"name": "ai-translator-g7-v2-pt-es", "glossary_id": "gl-other-pair"},
+        {"name": "outro-sistema", "glossary_id": "gl-foreign"},
+    ]
+
+    assert translator.deepl_glossary_id(_matcher(), "pt-BR", "en-US") == "gl-new"
+    assert translator.deepl_glossary_id(_matcher(), "pt-BR", "en-GB") == "gl-new"  # mesmo par base: cache
+
+    methods = [(m, url.rsplit("/", 1)[-1]) for m, url, _ in calls]
+    assert methods == [("GET", "glossaries"), ("POST", "glossaries"), ("DELETE", "gl-old")]
+    body = calls[1][2]
+    assert body["name"] == "ai-translator-g7-v3-pt-en"
+    assert (body["source_lang"], body["target_lang"], body["entries_format"]) == ("PT", "EN", "tsv")
+    assert body["entries"] == "contrato\tagreement\nforo\tvenue"  # TAB no termo não cabe no TSV
+
+
+def test_deepl_glossary_created_by_another_worker_is_reused(deepl_glossaries):
+    calls, state = deepl_glossaries
+    state["existing"] = [{"name": "ai-translator-g7-v3-pt-en", "glossary_id": "gl-shared"}]
+
+    assert translator.deepl_glossary_id(_matcher(), "pt-BR", "en-US") == "gl-shared"
+    assert [m for m, _, _ in calls] == ["GET"]
+
+
+@pytest.mark.parametrize(
+    "setting, value, source",
+    [
+        ("DEEPL_USE_GLOSSARY", False, "pt-BR"),
+        ("PROVIDER", "azure", "pt-BR"),
+        (None, None, ""),  # sem idioma de origem o DeepL não aceita glossário
+    ],
+)
+def test_deepl_glossary_not_used(deepl_glossaries, monkeypatch, setting, value, source):
+    calls, _ = deepl_glossaries
+    if setting:
+        monkeypatch.setattr(translator, setting, value)
+    assert translator.deepl_glossary_id(_matcher(), source, "en-US") is None
+    assert translator.deepl_glossary_id(GlossaryMatcher({"a": "b"}), "pt-BR", "en-US") is None  # sem versão
+    assert calls == []
+
+
+def test_deepl_glossary_failure_falls_back_to_placeholders(deepl_glossaries, deepl_stub, tmp_path):
+    _, state = deepl_glossaries
+    state["fail"] = True
+    src = _docx(tmp_path / "in.docx", "O contrato.")
+    out = tmp_path / "out.docx"
+
+    result = run_to_many(src, {"en-US": str(out)}, _matcher(), "pt-BR")["en-US"]
+
+    assert result["glossary_mode"] == "placeholder"
+    assert "glossary_id" not in deepl_stub.bodies[0]
+    assert _texts(out) == ["O agreement."]
+
+
+def test_deepl_glossary_goes_with_the_translation_request(deepl_glossaries, deepl_stub, tmp_path):
+    src = _docx(tmp_path / "in.docx", "O contrato.")
+    out = tmp_path / "out.docx"
+
+    result = run_to_many(src, {"en-US": str(out)}, _matcher(), "pt-BR")["en-US"]
+
+    assert result["glossary_mode"] == "deepl"
+    (body,) = deepl_stub.bodies
+    assert body["glossary_id"] == ["gl-new"] and body["source_lang"] == ["PT"]
+    assert body["text"] == ["O contrato."]  # sem placeholders: o DeepL aplica o glossário
@@ -0,0 +1,74 @@
+import threading
+import time
+
+import pytest
+
+from app.utils import http_pool
+from app.utils.http_pool import SlotTimeout, get_session, provider_slot
+from app.utils.translator import translate_batches
+
+
+def test_one_session_per_provider(fresh_providers):
+    assert get_session("deepl") is get_session("deepl")
+    assert get_session("deepl") is not get_session("azure")
+
+
+def test_slot_limits_requests_in_flight(fresh_providers, monkeypatch):
+    monkeypatch.setenv("STUB_MAX_CONCURRENCY", "2")
+    lock = threading.Lock()
+    state = {"now": 0, "max": 0}
+
+    def work():
+        with provider_slot("stub"):
+            with lock:
+                state["now"] += 1
+                state["max"] = max(state["max"], state["now"])
+            time.sleep(0.05)
+            with lock:
+                state["now"] -= 1
+
+    threads = [threading.Thread(target=work) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert state["max"] == 2
+
+
+def test_slot_wait_is_bounded(fresh_providers, monkeypatch):
+    monkeypatch.setenv("STUB_MAX_CONCURRENCY", "1")
+    release = threading.Event()
+
+    def hold():
+        with provider_slot("stub"):
+            release.wait()
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    time.sleep(0.05)
+    try:
+        t0 = time.monotonic()
+        with pytest.raises(SlotTimeout):
+            with provider_slot("stub", timeout=0.1):
+                pass
+        assert time.monotonic() - t0 < 1
+    finally:
+        release.set()
+        holder.join()
+
+
+def test_batches_in_flight_keep_order(deepl_stub, monkeypatch):
+    monkeypatch.setenv("DEEPL_MAX_CONCURRENCY", "4")
+    deepl_stub.delay = 0.2
+    batches = [[f"lote {i} texto {j}" for j in range(3)] for i in range(8)]
+
+    t0 = time.monotonic()
+    out = translate_batches(batches, "pt-BR", "en-US")
+    elapsed = time.monotonic() - t0
+
+    assert out == [[t.upper() for t in b] for b in batches]
+    assert deepl_stub.max_in_flight == 4
+    # 8 lotes de 0.2s, 4 por vez: ~0.4s (sequencial seria 1.6s)
+    assert elapsed < 1.2
+    # conexões keep-alive reaproveitadas entre lotes
+    assert len(deepl_stub.clients) <= http_pool.max_concurrency("deepl")
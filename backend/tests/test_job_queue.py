@@ -0,0 +1,141 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, text
+
+from app.extensions import db
+from app.models import Job, JobTarget
+from app.utils.job_queue import _finish_target, _Heartbeat, claim_next_targets
+
+
+def _job(*targets: dict) -> Job:
+    """Job com um JobTarget por dict de colunas (status 'queued' por padrão)."""
+    job = Job(status="queued", source_lang="pt-BR", target_lang="en-US")
+    db.session.add(job)
+    db.session.flush()
+    for i, cols in enumerate(targets):
+        db.session.add(JobTarget(job_id=job.id, target_lang=cols.pop("target_lang", f"l{i}"), **cols))
+    db.session.commit()
+    return job
+
+
+def _ago(seconds: float) -> datetime:
+    return datetime.utcnow() - timedelta(seconds=seconds)
+
+
+def test_claim_takes_every_free_target_of_the_job(app):
+    job = _job({"status": "queued"}, {"status": "queued"})
+    _job({"status": "queued"})
+
+    claimed = claim_next_targets("w1")
+
+    assert [jt.job_id for jt in claimed] == [job.id, job.id]
+    assert all(jt.status == "processing" and jt.locked_by == "w1" and jt.attempts == 1 for jt in claimed)
+    assert all(jt.lease_expires_at > datetime.utcnow() for jt in claimed)
+    assert db.session.get(Job, job.id).status == "processing"
+
+
+def test_live_lease_is_not_reclaimed(app):
+    _job({"status": "processing", "locked_by": "w1", "attempts": 1, "lease_expires_at": _ago(-60)})
+    assert claim_next_targets("w2") == []
+
+
+def test_expired_lease_of_a_crashed_worker_is_reclaimed(app):
+    _job({"status": "processing", "locked_by": "dead", "attempts": 1, "lease_expires_at": _ago(5)})
+
+    [jt] = claim_next_targets("w2")
+    assert (jt.locked_by, jt.attempts, jt.status) == ("w2", 2, "processing")
+
+    # o worker morto volta depois da retomada: o resultado dele é descartado
+    assert _finish_target(jt, "dead", {}, "out.docx") is False
+    db.session.refresh(jt)
+    assert (jt.status, jt.locked_by, jt.output_path) == ("processing", "w2", None)
+
+
+def test_target_fails_after_max_attempts(app):
+    app.config["JOB_MAX_ATTEMPTS"] = 3
+    job = _job(
+        {"status": "processing", "locked_by": "dead", "attempts": 3, "lease_expires_at": _ago(5)},
+        {"status": "queued"},
+    )
+
+    claimed = claim_next_targets("w2")
+
+    assert [jt.target_lang for jt in claimed] == ["l1"]
+    exhausted = db.session.query(JobTarget).filter_by(job_id=job.id, target_lang="l0").one()
+    assert exhausted.status == "failed"
+    assert "lease expired" in exhausted.error
+    assert exhausted.locked_by is None
+    # nada mais a fazer: o destino esgotado não volta para a fila
+    assert claim_next_targets("w3") == []
+
+
+def test_heartbeat_renews_only_its_own_leases(app):
+    job = _job(
+        {"status": "processing", "locked_by": "w1", "lease_expires_at": _ago(0)},
+        {"status": "processing", "locked_by": "other", "lease_expires_at": _ago(0)},
+    )
+    mine, theirs = job.targets
+    before = mine.lease_expires_at
+
+    hb = _Heartbeat(db.engine, [mine.id, theirs.id], "w1", timedelta(seconds=3))  # renova a cada 1s
+    hb.start()
+    time.sleep(1.3)
+    hb.stop()
+
+    db.session.refresh(mine)
+    db.session.refresh(theirs)
+    assert mine.lease_expires_at > before + timedelta(seconds=2)
+    assert theirs.lease_expires_at < datetime.utcnow()
+
+
+# ---------- Postgres (SKIP LOCKED) ----------
+
+
+def test_locked_row_is_skipped_not_waited_for(pg_app):
+    first = _job({"status": "queued"})
+    second = _job({"status": "queued"})
+    # se a linha travada fosse esperada, o teste falha em vez de travar
+    db.session.execute(text("SET lock_timeout = '2s'"))
+    db.session.commit()
+
+    # outro worker no meio da transação de reivindicação do primeiro job
+    other = create_engine(pg_app.config["SQLALCHEMY_DATABASE_URI"])
+    with other.connect() as conn, conn.begin():
+        conn.execute(
+            text("SELECT id FROM job_targets WHERE id = :id FOR UPDATE"), {"id": first.targets[0].id}
+        )
+        t0 = time.monotonic()
+        claimed = claim_next_targets("w2")
+        assert time.monotonic() - t0 < 2
+    other.dispose()
+
+    assert [jt.job_id for jt in claimed] == [second.id]
+
+
+def test_concurrent_claimers_never_share_a_target(pg_app):
+    for _ in range(30):
+        _job({"status": "queued"}, {"status": "queued"})
+    total = db.session.query(JobTarget).count()
+    claims: dict[str, list[int]] = {}
+    start = threading.Barrier(6)
+
+    def worker(wid: str) -> None:
+        with pg_app.app_context():
+            start.wait()
+            mine = claims.setdefault(wid, [])
+            while batch := claim_next_targets(wid):
+                mine += [jt.id for jt in batch]
+            db.session.remove()
+
+    threads = [threading.Thread(target=worker, args=(f"w{i}",)) for i in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=60)
+
+    ids = [i for mine in claims.values() for i in mine]
+    assert len(ids) == len(set(ids)) == total
+    owners = dict(db.session.query(JobTarget.id, JobTarget.locked_by))
+    assert all(owners[i] == wid for wid, mine in claims.items() for i in mine)
@@ -0,0 +1,141 @@
+import io
+
+import docx
+import pytest
+
+from app.extensions import db
+from app.models import Glossary, GlossaryTerm, Job, JobTarget
+from app.utils.job_queue import claim_next_targets, process_targets
+
+
+def _docx_bytes(*paragraphs: str) -> bytes:
+    d = docx.Document()
+    for text in paragraphs:
+        d.add_paragraph(text)
+    buf = io.BytesIO()
+    d.save(buf)
+    return buf.getvalue()
+
+
+def _submit(client, auth_headers, payload: bytes, targets=("en-US",), **form):
+    data = {"file": (io.BytesIO(payload), "contrato.docx"), "source_lang": "pt-BR", "target_langs": list(targets)}
+    data.update({k: str(v) for k, v in form.items()})
+    return client.post("/api/jobs/", data=data, headers=auth_headers, content_type="multipart/form-data")
+
+
+def _run_worker() -> None:
+    while targets := claim_next_targets("w1"):
+        process_targets(targets, "w1")
+
+
+@pytest.fixture
+def glossary(app):
+    g = Glossary(name="Jurídico", locale_src="pt-BR", locale_dst="en-US")
+    db.session.add(g)
+    db.session.flush()
+    db.session.add(GlossaryTerm(glossary_id=g.id, src="contrato", dst="agreement"))
+    db.session.commit()
+    return g
+
+
+def test_identical_resubmit_reuses_every_output(client, auth_headers, fake_translator, glossary):
+    payload = _docx_bytes("O contrato vence hoje.")
+    first = _submit(client, auth_headers, payload, ("en-US", "es-ES"), glossary_id=glossary.id)
+    assert first.status_code == 202 and first.get_json()["reused"] == 0
+    _run_worker()
+    keys = {jt.target_lang: jt.reuse_key for jt in db.session.query(JobTarget)}
+    assert all(keys.values())
+    sent = len(fake_translator)
+
+    # es-ES não usa o glossário (pt-BR → en-US): a chave dele também não pode usar
+    second = _submit(client, auth_headers, payload, ("en-US", "es-ES"), glossary_id=glossary.id)
+
+    body = second.get_json()
+    assert body["reused"] == 2 and body["status"] == "done"
+    assert {t["lang"]: t["status"] for t in body["targets"]} == {"en-US": "done", "es-ES": "done"}
+    assert claim_next_targets("w1") == []
+    assert len(fake_translator) == sent  # nada foi ao provedor de novo
+    reused = db.session.query(JobTarget).filter(JobTarget.job_id == body["id"])
+    assert {jt.target_lang: jt.reuse_key for jt in reused} == keys
+
+
+def test_changed_glossary_or_file_is_translated_again(client, auth_headers, fake_translator, glossary):
+    payload = _docx_bytes("O contrato vence hoje.")
+    _submit(client, auth_headers, payload, ("en-US", "es-ES"), glossary_id=glossary.id)
+    _run_worker()
+
+    # nova versão do glossário: só o destino do par dele muda de chave
+    client.patch(f"/api/glossaries/{glossary.id}/terms", json={"terms": {"prazo": "deadline"}}, headers=auth_headers)
+    body = _submit(client, auth_headers, payload, ("en-US", "es-ES"), glossary_id=glossary.id).get_json()
+    assert {t["lang"]: t["status"] for t in body["targets"]} == {"en-US": "queued", "es-ES": "done"}
+
+    body = _submit(client, auth_headers, _docx_bytes("Outro texto."), ("es-ES",)).get_json()
+    assert body["reused"] == 0
+
+
+# ---------- atualização a partir de um job anterior ----------
+
+
+def _texts(job_id: int, lang: str = "en-US") -> list[str]:
+    jt = db.session.query(JobTarget).filter_by(job_id=job_id, target_lang=lang).one()
+    return [p.text for p in docx.Document(jt.output_path).paragraphs]
+
+
+def test_revised_document_only_sends_the_edited_segments(client, auth_headers, fake_translator):
+    first = _submit(client, auth_headers, _docx_bytes("Cláusula um.", "Cláusula dois.", "Cláusula três.")).get_json()
+    _run_worker()
+    fake_translator.clear()
+
+    revised = _docx_bytes("Cláusula um.", "Cláusula dois, revisada.", "Cláusula três.", "Cláusula nova.")
+    second = _submit(client, auth_headers, revised, previous_job_id=first["id"])
+    assert second.status_code == 202 and second.get_json()["previous_job_id"] == first["id"]
+    _run_worker()
+
+    assert fake_translator == ["Cláusula dois, revisada.", "Cláusula nova."]
+    assert _texts(second.get_json()["id"]) == [
+        "CLÁUSULA UM.",
+        "CLÁUSULA DOIS, REVISADA.",
+        "CLÁUSULA TRÊS.",
+        "CLÁUSULA NOVA.",
+    ]
+    metrics = client.get(f"/api/jobs/{second.get_json()['id']}", headers=auth_headers).get_json()["metrics"]
+    assert metrics["segments_reused"] == 2
+
+
+@pytest.mark.parametrize("field", ["previous_job_id", "glossary_id"])
+@pytest.mark.parametrize("value", ["abc", "-1", "0", "1.5", "99999999999"])
+def test_malformed_ids_are_a_400(client, auth_headers, field, value):
+    resp = _submit(client, auth_headers, _docx_bytes("Texto."), **{field: value})
+    assert resp.status_code == 400
+    assert field in resp.get_json()["error"]
+
+
+def _finished_job(created_by: int, status: str) -> int:
+    job = Job(status=status, source_lang="pt-BR", target_lang="en-US", created_by=created_by)
+    db.session.add(job)
+    db.session.commit()
+    return job.id
+
+
+@pytest.mark.parametrize(
+    "owner, status, code",
+    [
+        (2, "done", 404),  # de outro usuário: nem confirma que existe
+        (1, "processing", 409),
+        (1, "queued", 409),
+        (1, "failed", 409),
+    ],
+)
+def test_previous_job_must_be_mine_and_finished(client, auth_headers, owner, status, code):
+    prev = _finished_job(owner, status)
+    resp = _submit(client, auth_headers, _docx_bytes("Texto."), previous_job_id=prev)
+    assert resp.status_code == code
+    assert db.session.query(Job).count() == 1  # nada criado
+
+
+def test_previous_job_with_another_source_language_is_rejected(client, auth_headers):
+    prev = _finished_job(1, "done")
+    db.session.get(Job, prev).source_lang = "es-ES"
+    db.session.commit()
+    assert _submit(client, auth_headers, _docx_bytes("Texto."), previous_job_id=prev).status_code == 400
+    assert _submit(client, auth_headers, _docx_bytes("Texto."), previous_job_id=9999).status_code == 404
@@ -0,0 +1,125 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.extensions import db
+from app.models import Job, JobFile, JobTarget
+
+T0 = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def _make_jobs(n: int, same_stamp_every: int = 4) -> list[Job]:
+    """n jobs com 2 arquivos e 3 destinos; grupos com o mesmo updated_at (empate no cursor)."""
+    jobs = []
+    for i in range(n):
+        job = Job(
+            status="done",
+            source_lang="pt-BR",
+            target_lang="en-US,es-ES,it-IT",
+            title=f"contrato_{i}.docx",
+            updated_at=T0 + timedelta(minutes=i // same_stamp_every),
+        )
+        db.session.add(job)
+        db.session.flush()
+        for k in range(2):
+            db.session.add(JobFile(job_id=job.id, filename=f"anexo_{i}_{k}.docx", input_path=f"uploads/{i}_{k}"))
+        for lang in ("en-US", "es-ES", "it-IT"):
+            db.session.add(JobTarget(job_id=job.id, target_lang=lang, status="done"))
+        jobs.append(job)
+    db.session.commit()
+    return jobs
+
+
+def _expected_order(jobs: list[Job]) -> list[int]:
+    return [j.id for j in sorted(jobs, key=lambda j: (j.updated_at, j.id), reverse=True)]
+
+
+@pytest.mark.parametrize("mode", ["page", "cursor"])
+def test_query_count_does_not_grow_with_page_size(client, auth_headers, count_queries, mode):
+    jobs = _make_jobs(60)
+    cursor = None
+    if mode == "cursor":
+        cursor = client.get("/api/jobs?page_size=1", headers=auth_headers).get_json()["next_cursor"]
+
+    counts = {}
+    for size in (5, 20, 50):
+        params = {"page_size": size, "cursor": cursor} if cursor else {"page_size": size}
+        db.session.expire_all()
+        with count_queries() as n:
+            resp = client.get("/api/jobs", query_string=params, headers=auth_headers)
+        assert resp.status_code == 200
+        items = resp.get_json()["items"]
+        assert len(items) == size
+        assert all(len(it["targets"]) == 3 for it in items)
+        counts[size] = n[0]
+
+    # jobs + arquivos + destinos (+ total na paginação por página), em qualquer tamanho de página
+    assert len(set(counts.values())) == 1, counts
+    assert counts[5] <= (4 if mode == "page" else 3)
+    assert len(jobs) == 60
+
+
+def test_cursor_walks_every_job_once_in_order(client, auth_headers):
+    jobs = _make_jobs(23)
+    seen, cursor = [], None
+    while True:
+        params = {"page_size": 5, **({"cursor": cursor} if cursor else {})}
+        body = client.get("/api/jobs", query_string=params, headers=auth_headers).get_json()
+        seen += [it["id"] for it in body["items"]]
+        cursor = body["next_cursor"]
+        if not cursor:
+            break
+    assert seen == _expected_order(jobs)
+
+
+def test_invalid_cursor_is_rejected(client, auth_headers):
+    resp = client.get("/api/jobs?cursor=not-a-cursor", headers=auth_headers)
+    assert resp.status_code == 400
+
+
+def test_page_mode_reports_total_and_order(client, auth_headers):
+    jobs = _make_jobs(12)
+    body = client.get("/api/jobs?page=2&page_size=5", headers=auth_headers).get_json()
+    assert body["total"] == 12
+    assert [it["id"] for it in body["items"]] == _expected_order(jobs)[5:10]
+
+
+def test_search_by_id_title_and_filename(client, auth_headers):
+    jobs = _make_jobs(8)
+    target = jobs[3]
+
+    # número: o job com esse id e também os que têm o número no nome
+    body = client.get(f"/api/jobs?q={target.id}", headers=auth_headers).get_json()
+    named = [j.id for j in jobs if str(target.id) in j.title or any(str(target.id) in f.filename for f in j.files)]
+    assert sorted(it["id"] for it in body["items"]) == sorted({target.id, *named})
+
+    # os dois arquivos do job casam: o job aparece uma vez só
+    body = client.get("/api/jobs?q=anexo_3_", headers=auth_headers).get_json()
+    assert [it["id"] for it in body["items"]] == [target.id]
+
+    body = client.get("/api/jobs?q=contrato_5", headers=auth_headers).get_json()
+    assert [it["id"] for it in body["items"]] == [jobs[5].id]
+
+
+def test_numeric_search_finds_names_containing_the_number(client, auth_headers):
+    job = Job(status="done", source_lang="pt-BR", target_lang="en-US", title="relatorio")
+    db.session.add(job)
+    db.session.flush()
+    db.session.add(JobFile(job_id=job.id, filename="relatorio_2024.docx", input_path="uploads/r"))
+    db.session.commit()
+
+    body = client.get("/api/jobs?q=2024", headers=auth_headers).get_json()
+    assert [it["id"] for it in body["items"]] == [job.id]
+    # id fora do intervalo do integer do Postgres: só a busca por nome
+    assert client.get("/api/jobs?q=99999999999999999999", headers=auth_headers).get_json()["items"] == []
+
+
+def test_short_terms_fall_back_to_a_plain_search(client, auth_headers):
+    jobs = _make_jobs(12)
+    # "_3" (o "_" é literal, não curinga): contrato_3 e os anexos anexo_3_*
+    body = client.get("/api/jobs?q=_3", headers=auth_headers).get_json()
+    assert [it["id"] for it in body["items"]] == [jobs[3].id]
+    # número curto sem job com esse id: ainda procura nos nomes (contrato_11, anexo_11_*)
+    body = client.get("/api/jobs?q=11", headers=auth_headers).get_json()
+    assert {it["id"] for it in body["items"]} == {jobs[11].id, 11}
+    assert client.get("/api/jobs?q=zz", headers=auth_headers).get_json()["items"] == []
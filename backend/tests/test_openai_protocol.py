@@ -0,0 +1,118 @@
+import json
+
+import pytest
+
+from app.utils import translator
+from app.utils.translator import TranslatorError, _translate_openai
+
+
+class FakeResponse:
+    def __init__(self, content: str, status_code: int = 200):
+        self.status_code = status_code
+        self.headers = {}
+        self.text = content
+        self._content = content
+
+    def json(self):
+        return {"choices": [{"message": {"content": self._content}}]}
+
+
+def _reply(*items: tuple) -> str:
+    return json.dumps({"items": [{"id": i, "text": t} for i, t in items]})
+
+
+@pytest.fixture
+def openai_script(monkeypatch):
+    """Respostas do modelo, em ordem; `requests` guarda os itens pedidos em cada chamada."""
+    script: list[str] = []
+    requests: list[dict[int, str]] = []
+
+    def request(items, source, target, markup=False):
+        requests.append(dict(items))
+        return FakeResponse(script.pop(0))
+
+    monkeypatch.setattr(translator, "_openai_request", request)
+    monkeypatch.setattr(translator, "OPENAI_MAX_REPAIRS", 2)
+    return script, requests
+
+
+def test_items_are_matched_by_id_not_by_position(openai_script):
+    script, requests = openai_script
+    script.append(_reply((2, "third"), (0, "first"), (1, "second")))
+
+    assert _translate_openai(["um", "dois", "três"], "pt-BR", "en-US") == ["first", "second", "third"]
+    assert requests == [{0: "um", 1: "dois", 2: "três"}]
+
+
+def test_missing_ids_are_requested_again_alone(openai_script):
+    script, requests = openai_script
+    script.append(_reply((0, "first"), (2, "third")))
+    script.append(_reply((1, "second")))
+
+    assert _translate_openai(["um", "dois", "três"], "pt-BR", "en-US") == ["first", "second", "third"]
+    assert requests[1] == {1: "dois"}
+
+
+def test_extra_duplicate_and_invalid_items_are_ignored(openai_script):
+    script, requests = openai_script
+    script.append(
+        json.dumps(
+            {
+                "items": [
+                    {"id": 0, "text": "first"},
+                    {"id": 0, "text": "duplicate"},  # fica o primeiro
+                    {"id": 7, "text": "not asked"},
+                    {"id": "x", "text": "bad id"},
+                    {"id": 1, "text": "   "},  # vazio para origem não vazia
+                    {"id": 1},
+                    "lixo",
+                ]
+            }
+        )
+    )
+    script.append(_reply((1, "second"), (9, "extra")))
+
+    assert _translate_openai(["um", "dois"], "pt-BR", "en-US") == ["first", "second"]
+    assert requests[1] == {1: "dois"}
+
+
+def test_non_json_reply_is_retried(openai_script):
+    script, requests = openai_script
+    script.append("Here is your translation: first, second")
+    script.append(_reply((0, "first"), (1, "second")))
+
+    assert _translate_openai(["um", "dois"], "pt-BR", "en-US") == ["first", "second"]
+    assert len(requests) == 2
+
+
+def test_repair_budget_is_bounded(openai_script):
+    script, requests = openai_script
+    script.extend([_reply((0, "first"))] + [_reply()] * 5)
+
+    with pytest.raises(TranslatorError, match="1 item"):
+        _translate_openai(["um", "dois"], "pt-BR", "en-US")
+    assert len(requests) == 3  # 1 + OPENAI_MAX_REPAIRS
+
+
+def test_http_error_is_not_repaired(openai_script, monkeypatch):
+    monkeypatch.setattr(translator, "_openai_request", lambda *a, **k: FakeResponse("bad request", 400))
+    with pytest.raises(TranslatorError, match="400"):
+        _translate_openai(["um"], "pt-BR", "en-US")
+
+
+def test_request_body_is_the_json_protocol(fresh_providers, monkeypatch):
+    sent = {}
+
+    class Session:
+        def post(self, url, headers=None, json=None, timeout=None):
+            sent.update(json)
+            return FakeResponse(_reply((0, "the <g1>contract</g1>")))
+
+    monkeypatch.setattr(translator, "get_session", lambda provider: Session())
+    monkeypatch.setattr(translator, "OPENAI_API_KEY", "test-key")
+
+    assert _translate_openai(["o <g1>contrato</g1>"], "pt-BR", "en-US", markup=True) == ["the <g1>contract</g1>"]
+    assert sent["response_format"] == {"type": "json_object"}
+    system, user = sent["messages"]
+    assert "<gN>" in system["content"]
+    assert json.loads(user["content"]) == {"items": [{"id": 0, "text": "o <g1>contrato</g1>"}]}
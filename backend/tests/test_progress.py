@@ -0,0 +1,234 @@
+import json
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+
+from app.extensions import db
+from app.models import Job, JobTarget
+from app.utils import progress
+from app.utils.progress import ProgressReporter, TooManyListeners, _Listener, job_snapshot, stream_job_events
+
+
+class RecordingEngine:
+    """Engine falso do ProgressReporter: guarda os UPDATEs e os eventos publicados."""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.updates: list[dict] = []
+        self.events: list[dict] = []
+
+    @contextmanager
+    def begin(self):
+        if self.fail:
+            raise ConnectionError("banco fora do ar")
+        yield self
+
+    def execute(self, stmt, params=None):
+        if params is None:
+            self.updates.append(stmt.compile().params)
+        else:
+            self.events.append(json.loads(params["payload"]))
+
+
+class FakePg:
+    """Conexão LISTEN falsa (psycopg2): só anota os comandos."""
+
+    def __init__(self):
+        self.autocommit = False
+        self.commands: list[str] = []
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql):
+        self.commands.append(sql)
+
+
+@pytest.fixture
+def no_listener():
+    """O listener é global do processo: cada teste começa sem nenhum."""
+    progress._listener = None
+    yield
+    progress._listener = None
+
+
+def _fake_engine():
+    pg = FakePg()
+    raw = SimpleNamespace(driver_connection=pg, detach=lambda: None, close=lambda: None)
+    return SimpleNamespace(raw_connection=lambda: raw), pg
+
+
+# ---------- ProgressReporter ----------
+
+
+def test_reporter_throttles_but_always_flushes_start_and_completion():
+    engine = RecordingEngine()
+    reporter = ProgressReporter(engine, 7, {"en-US": 70}, min_interval=60)
+
+    reporter.start("en-US", segments_total=3, chars_total=30, segments_done=1, chars_done=10)
+    reporter.advance("en-US", 1, 10)  # dentro do intervalo: só acumula
+    reporter.advance("en-US", 1, 10)  # completou: grava e publica na hora
+
+    assert [e["data"]["segments_done"] for e in engine.events] == [1, 3]
+    assert all(e["event"] == "progress" and e["data"]["id"] == 70 for e in engine.events)
+    assert engine.events[-1]["data"]["eta_seconds"] == 0.0
+    assert "started_at" in engine.updates[0] and "started_at" not in engine.updates[1]
+    assert engine.updates[1]["chars_done"] == 30
+
+
+def test_reporter_ignores_unknown_targets_and_never_raises():
+    engine = RecordingEngine(fail=True)
+    reporter = ProgressReporter(engine, 7, {"en-US": 70})
+    reporter.advance("es-ES", 1, 10)  # destino que não começou
+    reporter.start("en-US", 2, 20)  # banco fora do ar: progresso é só informativo
+    reporter.advance("en-US", 2, 20)
+    assert engine.events == []
+
+
+# ---------- listener / limite de clientes ----------
+
+
+def test_listener_caps_clients_and_shares_one_listen_per_channel(monkeypatch):
+    monkeypatch.setattr(progress, "SSE_MAX_CLIENTS", 3)
+    engine, pg = _fake_engine()
+    listener = _Listener(engine)  # sem start(): só a contabilidade das inscrições
+
+    a1 = listener.subscribe("job_progress_1")
+    a2 = listener.subscribe("job_progress_1")
+    b = listener.subscribe("job_progress_2")
+    with pytest.raises(TooManyListeners):
+        listener.subscribe("job_progress_3")
+    assert pg.commands == ["LISTEN job_progress_1", "LISTEN job_progress_2"]
+
+    listener.unsubscribe("job_progress_1", a1)
+    listener.subscribe("job_progress_3")  # liberou uma vaga
+    listener.unsubscribe("job_progress_1", a2)
+    listener.unsubscribe("job_progress_2", b)
+    assert pg.commands[-2:] == ["UNLISTEN job_progress_1", "UNLISTEN job_progress_2"]
+
+
+def test_dead_listen_connection_is_reported_not_hung():
+    engine, pg = _fake_engine()
+    listener = _Listener(engine)
+
+    def broken(sql):
+        raise OSError("server closed the connection unexpectedly")
+
+    pg.execute = broken
+    with pytest.raises(ConnectionError):
+        listener.subscribe("job_progress_1")
+    assert not listener.alive
+
+
+# ---------- rota SSE ----------
+
+
+def _done_job() -> Job:
+    job = Job(status="done", source_lang="pt-BR", target_lang="en-US")
+    db.session.add(job)
+    db.session.flush()
+    db.session.add(JobTarget(job_id=job.id, target_lang="en-US", status="done"))
+    db.session.commit()
+    return job
+
+
+class FlakyListener:
+    """Listener falso: os `dead` primeiros criados estão com a conexão caída."""
+
+    created = 0
+    dead = 0
+
+    def __init__(self, engine):
+        type(self).created += 1
+        self.alive = type(self).created > type(self).dead
+        self.pid = progress.os.getpid()
+
+    def start(self):
+        pass
+
+    def subscribe(self, channel):
+        if not self.alive:
+            raise ConnectionError("listener encerrado")
+        return progress.queue.Queue()
+
+    def unsubscribe(self, channel, q):
+        pass
+
+
+@pytest.fixture
+def flaky_listener(monkeypatch, no_listener):
+    monkeypatch.setattr(progress, "_Listener", FlakyListener)
+    FlakyListener.created = 0
+    return FlakyListener
+
+
+def test_sse_reconnects_once_when_the_shared_listener_died(client, auth_headers, flaky_listener):
+    flaky_listener.dead = 1
+    job = _done_job()
+    resp = client.get(f"/api/jobs/{job.id}/events", headers=auth_headers)
+    assert resp.status_code == 200
+    assert resp.data.decode().startswith("event: job\n")
+    assert flaky_listener.created == 2
+
+
+def test_sse_without_listen_connection_falls_back_to_polling(client, auth_headers, flaky_listener):
+    flaky_listener.dead = 99
+    job = _done_job()
+    resp = client.get(f"/api/jobs/{job.id}/events", headers=auth_headers)
+    assert resp.status_code == 503
+    assert resp.get_json() == {"error": "event stream unavailable"}
+
+
+def test_sse_client_cap_answers_503(client, auth_headers, no_listener, monkeypatch):
+    monkeypatch.setattr(progress, "SSE_MAX_CLIENTS", 0)
+    monkeypatch.setattr(progress, "_Listener", lambda engine: _Listener(_fake_engine()[0]))
+    monkeypatch.setattr(_Listener, "start", lambda self: None)
+    job = _done_job()
+    resp = client.get(f"/api/jobs/{job.id}/events", headers=auth_headers)
+    assert resp.status_code == 503
+    assert resp.get_json() == {"error": "too many event streams"}
+
+
+# ---------- Postgres (LISTEN/NOTIFY de verdade) ----------
+
+
+def _next_event(events) -> str:
+    for chunk in events:
+        if not chunk.startswith(":"):  # pula keepalives
+            return chunk
+    return ""
+
+
+def test_progress_notify_reaches_the_stream_and_survives_a_dropped_listener(pg_app, no_listener):
+    job = Job(status="processing", source_lang="pt-BR", target_lang="en-US")
+    db.session.add(job)
+    db.session.flush()
+    jt = JobTarget(job_id=job.id, target_lang="en-US", status="processing")
+    db.session.add(jt)
+    db.session.commit()
+
+    def snapshot():
+        try:
+            return job_snapshot(db.session, job.id)
+        finally:
+            db.session.close()
+
+    events = iter(stream_job_events(db.engine, job.id, snapshot, keepalive=0.2))
+    assert _next_event(events).startswith("event: job\n")
+
+    ProgressReporter(db.engine, job.id, {"en-US": jt.id}).start("en-US", segments_total=4, chars_total=40)
+    chunk = _next_event(events)
+    assert chunk.startswith("event: progress\n")
+    assert json.loads(chunk.split("data: ", 1)[1])["segments_total"] == 4
+
+    # a conexão LISTEN cai (restart do banco, pgbouncer...): o stream termina e o cliente reconecta
+    db.session.execute(
+        text("SELECT pg_terminate_backend(pid) FROM pg_stat_activity WHERE query LIKE 'LISTEN job_progress_%'")
+    )
+    db.session.commit()
+    assert _next_event(events) == ""
+
+    events = iter(stream_job_events(db.engine, job.id, snapshot, keepalive=0.2))
+    assert _next_event(events).startswith("event: job\n")
@@ -0,0 +1,272 @@
+import time
+
+import pytest
+
+from app.utils import provider_router, translator
+from app.utils.provider_router import (
+    DeadlineExceeded,
+    ProviderUnavailable,
+    TokenBucket,
+    breaker,
+    deadline_scope,
+    send,
+)
+from app.utils.translator import TranslatorError, translate_text
+
+
+@pytest.fixture
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(provider_router, "PROVIDER_BACKOFF_BASE", 0.001)
+    monkeypatch.setattr(provider_router, "PROVIDER_MAX_RETRIES", 5)
+
+
+def test_retry_after_is_honored(deepl_stub, fast_retries):
+    deepl_stub.script.append((429, {"Retry-After": "0.3"}))
+    t0 = time.monotonic()
+    assert translate_text(["olá"], "pt-BR", "en-US") == ["OLÁ"]
+    assert time.monotonic() - t0 >= 0.3
+    assert deepl_stub.hits == 2
+
+
+def test_5xx_storm_opens_the_breaker_and_skips_the_provider(deepl_stub, fast_retries, monkeypatch):
+    monkeypatch.setenv("DEEPL_BREAKER_FAILURES", "3")
+    monkeypatch.setenv("DEEPL_BREAKER_COOLDOWN", "60")
+    deepl_stub.script.extend([(503, {})] * 20)
+
+    with pytest.raises(TranslatorError):
+        translate_text(["olá"], "pt-BR", "en-US")
+    assert deepl_stub.hits == 3
+    assert breaker("deepl").state == "open"
+
+    # circuito aberto: falha na hora, sem rede, e nunca devolve a origem como tradução
+    with pytest.raises(TranslatorError, match="circuit open"):
+        translate_text(["olá"], "pt-BR", "en-US")
+    assert deepl_stub.hits == 3
+
+
+def test_half_open_probe_closes_the_breaker(deepl_stub, fast_retries, monkeypatch):
+    monkeypatch.setenv("DEEPL_BREAKER_FAILURES", "2")
+    monkeypatch.setenv("DEEPL_BREAKER_COOLDOWN", "0.2")
+    deepl_stub.script.extend([(502, {})] * 2)
+    with pytest.raises(TranslatorError):
+        translate_text(["olá"], "pt-BR", "en-US")
+    assert breaker("deepl").state == "open"
+
+    time.sleep(0.25)
+    assert breaker("deepl").state == "half-open"
+    assert translate_text(["olá"], "pt-BR", "en-US") == ["OLÁ"]
+    assert breaker("deepl").state == "closed"
+
+
+def test_auth_or_quota_errors_trip_without_retries(deepl_stub, fast_retries):
+    deepl_stub.script.append((456, {}))  # cota do DeepL esgotada
+    with pytest.raises(TranslatorError, match="456"):
+        translate_text(["olá"], "pt-BR", "en-US")
+    assert deepl_stub.hits == 1
+    assert breaker("deepl").state == "open"
+
+
+def test_retry_after_longer_than_backoff_max_skips_the_provider(deepl_stub, fast_retries):
+    deepl_stub.script.append((429, {"Retry-After": "3600"}))
+    t0 = time.monotonic()
+    with pytest.raises(TranslatorError, match="retry after"):
+        translate_text(["olá"], "pt-BR", "en-US")
+    assert time.monotonic() - t0 < 1
+    assert breaker("deepl").state == "open"
+
+
+def test_failover_to_the_next_provider(deepl_stub, fast_retries, monkeypatch):
+    monkeypatch.setenv("DEEPL_BREAKER_FAILURES", "2")
+    monkeypatch.setattr(translator, "AZURE_KEY", "test-key")
+    monkeypatch.setattr(translator, "AZURE_ENDPOINT", deepl_stub.base_url)
+    monkeypatch.setattr(translator, "TRANSLATOR_FALLBACKS", ["azure"])
+    deepl_stub.script.extend([(503, {})] * 2)
+
+    stats = {}
+    assert translate_text(["olá"], "pt-BR", "en-US", stats=stats) == ["OLÁ"]
+    assert stats["failovers"] == 1
+    assert breaker("deepl").state == "open"
+    assert breaker("azure").state == "closed"
+
+
+def test_token_bucket_limits_the_request_rate(deepl_stub, monkeypatch):
+    monkeypatch.setenv("DEEPL_RATE_PER_SEC", "10")
+    monkeypatch.setenv("DEEPL_RATE_BURST", "1")
+    t0 = time.monotonic()
+    for i in range(6):
+        translate_text([f"texto {i}"], "pt-BR", "en-US")
+    # 1 ficha na rajada + 5 a 10/s
+    assert time.monotonic() - t0 >= 0.45
+    assert deepl_stub.hits == 6
+
+
+def test_token_bucket_gives_up_past_the_timeout():
+    tb = TokenBucket(rate=1, burst=1)
+    assert tb.acquire()
+    t0 = time.monotonic()
+    assert tb.acquire(timeout=0.1) is False
+    assert time.monotonic() - t0 < 0.1
+    assert tb.acquire(timeout=1.5)  # a ficha recusada não foi consumida
+
+
+def test_rate_limit_wait_respects_the_deadline(fresh_providers, monkeypatch):
+    monkeypatch.setenv("STUB_RATE_PER_SEC", "1")
+    monkeypatch.setenv("STUB_RATE_BURST", "1")
+    provider_router.bucket("stub").acquire()
+    with deadline_scope(time.monotonic() + 0.2):
+        with pytest.raises(DeadlineExceeded):
+            send("stub", lambda: pytest.fail("não deveria chamar o provedor"))
+
+
+def test_our_deadline_is_not_a_provider_failure(fresh_providers, monkeypatch):
+    monkeypatch.setenv("STUB_BREAKER_FAILURES", "2")
+
+    def request():
+        raise DeadlineExceeded("deadline exceeded")
+
+    for _ in range(5):
+        with pytest.raises(DeadlineExceeded):
+            send("stub", request)
+    assert breaker("stub").state == "closed"
+
+
+def test_unexpected_error_releases_a_half_open_probe(fresh_providers, monkeypatch):
+    monkeypatch.setenv("STUB_BREAKER_COOLDOWN", "0")
+    breaker("stub").trip(0)
+    with pytest.raises(ValueError):
+        send("stub", lambda: (_ for _ in ()).throw(ValueError("bug")))
+    # a falha reabriu o circuito; sem cooldown, o próximo teste pode passar
+    assert breaker("stub").allow()
+
+
+def test_unavailable_carries_the_reason(fresh_providers, monkeypatch):
+    monkeypatch.setattr(provider_router, "PROVIDER_MAX_RETRIES", 0)
+
+    class Resp:
+        status_code = 503
+        headers = {}
+        text = ""
+
+    with pytest.raises(ProviderUnavailable) as e:
+        send("stub", Resp)
+    assert e.value.provider == "stub"
+    assert "HTTP 503" in e.value.reason
+
+
+def test_timeout_clamped_by_our_deadline_is_not_a_provider_failure(deepl_stub, monkeypatch):
+    monkeypatch.setenv("DEEPL_BREAKER_FAILURES", "1")
+    deepl_stub.delay = 0.5
+    with deadline_scope(time.monotonic() + 0.2):
+        with pytest.raises(TranslatorError, match="deadline exceeded"):
+            translate_text(["olá"], "pt-BR", "en-US")
+    assert breaker("deepl").state == "closed"
+    assert deepl_stub.hits == 1
+
+
+def test_provider_timeout_still_counts_as_a_failure(deepl_stub, monkeypatch):
+    monkeypatch.setenv("DEEPL_BREAKER_FAILURES", "1")
+    monkeypatch.setattr(provider_router, "PROVIDER_TIMEOUT", 0.2)
+    deepl_stub.delay = 0.5
+    with pytest.raises(TranslatorError, match="ReadTimeout"):
+        translate_text(["olá"], "pt-BR", "en-US")
+    assert breaker("deepl").state == "open"
+
+
+# ---------- hedging ----------
+
+
+@pytest.fixture
+def providers(fresh_providers, monkeypatch):
+    """Provedores falsos: `plan[nome] = (segundos, erro ou None)`; `calls` = quem foi chamado."""
+    plan: dict[str, tuple[float, Exception | None]] = {}
+    calls: list[str] = []
+
+    def call(provider, texts, *args):
+        calls.append(provider)
+        seconds, error = plan[provider]
+        time.sleep(seconds)
+        if error is not None:
+            raise error
+        return [f"{provider}:{t}" for t in texts]
+
+    monkeypatch.setattr(translator, "_call_provider", call)
+    return plan, calls
+
+
+_ARGS = (["olá"], "pt-BR", "en-US", None, False)
+
+
+def test_hedge_takes_the_backup_when_the_primary_is_slow(providers):
+    plan, calls = providers
+    plan.update(deepl=(0.6, None), azure=(0.05, None))
+    t0 = time.monotonic()
+    assert translator._hedged("deepl", "azure", 0.1, _ARGS, []) == ("azure", ["azure:olá"])
+    # não espera o mais lento: a resposta dele é descartada
+    assert time.monotonic() - t0 < 0.4
+    assert calls == ["deepl", "azure"]
+
+
+def test_hedge_keeps_the_first_success(providers):
+    plan, calls = providers
+    plan.update(deepl=(0.2, None), azure=(0.6, None))
+    t0 = time.monotonic()
+    assert translator._hedged("deepl", "azure", 0.05, _ARGS, []) == ("deepl", ["deepl:olá"])
+    assert time.monotonic() - t0 < 0.5
+    assert calls == ["deepl", "azure"]
+
+
+def test_hedge_does_not_fire_when_the_primary_is_fast(providers):
+    plan, calls = providers
+    plan.update(deepl=(0.0, None), azure=(0.0, None))
+    assert translator._hedged("deepl", "azure", 0.5, _ARGS, []) == ("deepl", ["deepl:olá"])
+    assert calls == ["deepl"]
+
+
+def test_hedge_fires_at_once_when_the_primary_fails_early(providers):
+    plan, calls = providers
+    plan.update(deepl=(0.0, ProviderUnavailable("deepl", "HTTP 503")), azure=(0.0, None))
+    errors: list[str] = []
+    t0 = time.monotonic()
+    assert translator._hedged("deepl", "azure", 5, _ARGS, errors) == ("azure", ["azure:olá"])
+    assert time.monotonic() - t0 < 1
+    assert errors == ["deepl: HTTP 503"]
+
+
+def test_hedge_ignores_a_failed_backup(providers):
+    plan, _ = providers
+    plan.update(deepl=(0.3, None), azure=(0.0, ProviderUnavailable("azure", "HTTP 502")))
+    errors: list[str] = []
+    assert translator._hedged("deepl", "azure", 0.05, _ARGS, errors) == ("deepl", ["deepl:olá"])
+    assert errors == ["azure: HTTP 502"]
+
+
+def test_hedge_failure_of_both_propagates(providers, monkeypatch):
+    plan, calls = providers
+    plan.update(
+        deepl=(0.2, ProviderUnavailable("deepl", "HTTP 503")),
+        azure=(0.0, ProviderUnavailable("azure", "HTTP 502")),
+    )
+    errors: list[str] = []
+    assert translator._hedged("deepl", "azure", 0.05, _ARGS, errors) is None
+    assert sorted(errors) == ["azure: HTTP 502", "deepl: HTTP 503"]
+
+    # pela cadeia: nenhum provedor atendeu
+    monkeypatch.setattr(translator, "PROVIDER", "deepl")
+    monkeypatch.setattr(translator, "PROVIDER_HEDGE", True)
+    monkeypatch.setattr(translator, "DEEPL_API_KEY", "test-key")
+    monkeypatch.setattr(translator, "AZURE_KEY", "test-key")
+    monkeypatch.setattr(translator, "TRANSLATOR_FALLBACKS", ["azure"])
+    for _ in range(provider_router.LATENCY_MIN_SAMPLES):
+        provider_router.record_latency("deepl", 0.05)
+    calls.clear()
+    with pytest.raises(TranslatorError, match="no translation provider available") as e:
+        translator._translate_provider(*_ARGS)
+    assert "deepl: HTTP 503" in str(e.value) and "azure: HTTP 502" in str(e.value)
+    assert sorted(calls) == ["azure", "deepl"]
+
+
+def test_hedge_errors_other_than_unavailable_propagate(providers):
+    plan, _ = providers
+    plan.update(deepl=(0.0, TranslatorError("deepl error: 400 bad request")), azure=(0.0, None))
+    with pytest.raises(TranslatorError, match="400"):
+        translator._hedged("deepl", "azure", 0.5, _ARGS, [])
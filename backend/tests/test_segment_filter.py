@@ -0,0 +1,85 @@
+import docx
+import pytest
+
+from app.utils import translator
+from app.utils.docx_pipeline import run_to_many
+from app.utils.segment_filter import is_passthrough, split_translatable
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        "   \t",
+        "12",
+        "1.234,56",
+        "15/03/2024",
+        "— 3 —",
+        "0001234-56.2024.8.26.0100",
+        "ABC-123/2024",
+        "§12",
+        "https://exemplo.com.br/contrato?id=7",
+        "www.exemplo.com",
+        "juridico@exemplo.com.br",
+    ],
+)
+def test_non_translatable_segments_pass_through(text):
+    assert is_passthrough(text, "pt-BR", "en-US")
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "Contrato",
+        "Cláusula 3",
+        "O contratante pagará a multa.",
+        "ABC",  # sigla sem dígito pode ser palavra
+        "Art. 5º da Lei",
+    ],
+)
+def test_text_goes_to_the_provider(text):
+    assert not is_passthrough(text, "pt-BR", "en-US")
+
+
+def test_text_already_in_the_target_language_is_kept():
+    english = "The parties agree that this is the end of the agreement."
+    assert is_passthrough(english, "pt-BR", "en-US")
+    # mesma frase, mas o destino é outro: precisa traduzir
+    assert not is_passthrough(english, "pt-BR", "es-ES")
+    # poucas palavras: não dá para afirmar o idioma
+    assert not is_passthrough("The end of it", "pt-BR", "en-US")
+    # origem e destino com a mesma base não desligam a tradução
+    assert not is_passthrough(english, "en-GB", "en-US")
+
+
+def test_split_reports_what_was_saved():
+    keep, stats = split_translatable(["Contrato", "12", "", "multa"], "pt-BR", "en-US")
+    assert keep == [0, 3]
+    assert stats == {"segments_skipped": 2, "chars_saved": 2}
+
+
+def test_skipped_segments_never_reach_the_provider(tmp_path, monkeypatch):
+    sent = []
+
+    def provider(texts, *args):
+        sent.extend(texts)
+        return "", [t.upper() for t in texts]
+
+    monkeypatch.setattr(translator, "_translate_provider", provider)
+    src, out = tmp_path / "in.docx", tmp_path / "out.docx"
+    d = docx.Document()
+    for text in ["Contrato de locação", "2024", "https://exemplo.com", "0001234-56.2024.8.26.0100", ""]:
+        d.add_paragraph(text)
+    d.save(src)
+
+    result = run_to_many(str(src), {"en-US": str(out)}, {}, "pt-BR")["en-US"]
+
+    assert sent == ["Contrato de locação"]
+    assert result["segments_skipped"] == 4
+    assert [p.text for p in docx.Document(out).paragraphs] == [
+        "CONTRATO DE LOCAÇÃO",
+        "2024",
+        "https://exemplo.com",
+        "0001234-56.2024.8.26.0100",
+        "",
+    ]
@@ -0,0 +1,290 @@
+import io
+import socket
+import uuid
+import zipfile
+from pathlib import Path
+
+import pytest
+import requests
+
+from app.extensions import db
+from app.models import Job, JobFile, JobTarget
+from app.paths import OUTPUT_DIR, UPLOAD_DIR
+from app.routes import jobs as jobs_routes
+from app.utils import storage as storage_mod
+from app.utils import zip_stream
+from app.utils.storage import LocalStorage
+from app.utils.zip_stream import BUNDLE_DIR
+
+
+def _write(directory: Path, name: str, data: bytes) -> str:
+    path = directory / f"{uuid.uuid4().hex[:8]}_{name}"
+    path.write_bytes(data)
+    return str(path)
+
+
+def _done_job(storage, outputs: dict[str, bytes]) -> Job:
+    """Job concluído com uma saída publicada por destino ({lang: bytes})."""
+    job = Job(status="done", source_lang="pt-BR", target_lang=",".join(outputs), title="doc.txt")
+    db.session.add(job)
+    db.session.flush()
+    in_key = storage.publish(_write(UPLOAD_DIR, "doc.txt", b"origem"))
+    db.session.add(JobFile(job_id=job.id, filename="doc.txt", input_path=in_key))
+    for lang, data in outputs.items():
+        key = storage.publish(_write(OUTPUT_DIR, f"{job.id}_{lang}_doc.txt", data))
+        db.session.add(JobTarget(job_id=job.id, target_lang=lang, status="done", output_path=key))
+    db.session.commit()
+    return job
+
+
+@pytest.fixture
+def use_storage(monkeypatch):
+    """Troca o backend do processo (get_storage) durante o teste."""
+
+    def use(backend):
+        monkeypatch.setattr(storage_mod, "_storage", backend)
+        return backend
+
+    return use
+
+
+# ---------- local ----------
+
+
+def test_local_download_streams_the_file(client, auth_headers, use_storage):
+    storage = use_storage(LocalStorage(sendfile=""))
+    job = _done_job(storage, {"en-US": b"hello"})
+    resp = client.get(f"/api/jobs/{job.id}/download?lang=en-US", headers=auth_headers)
+    assert resp.status_code == 200
+    assert resp.data == b"hello"
+
+
+def test_x_accel_redirect_leaves_the_bytes_to_nginx(client, auth_headers, use_storage):
+    storage = use_storage(LocalStorage(sendfile="x-accel", accel_prefix="/protected-outputs/"))
+    job = _done_job(storage, {"en-US": b"hello"})
+    key = job.targets[0].output_path
+
+    resp = client.get(f"/api/jobs/{job.id}/download?lang=en-US", headers=auth_headers)
+    assert resp.status_code == 200
+    assert resp.data == b""
+    assert resp.headers["X-Accel-Redirect"] == "/protected-outputs/" + Path(key).name
+    assert "filename*=UTF-8''" in resp.headers["Content-Disposition"]
+
+
+def test_x_sendfile_points_at_the_absolute_path(client, auth_headers, use_storage):
+    storage = use_storage(LocalStorage(sendfile="x-sendfile"))
+    job = _done_job(storage, {"en-US": b"hello"})
+    resp = client.get(f"/api/jobs/{job.id}/download?lang=en-US", headers=auth_headers)
+    assert resp.data == b""
+    assert resp.headers["X-Sendfile"] == str(Path(job.targets[0].output_path).resolve())
+
+
+def test_offloaded_zip_is_built_once_and_served_by_the_proxy(client, auth_headers, use_storage):
+    storage = use_storage(LocalStorage(sendfile="x-accel"))
+    job = _done_job(storage, {"en-US": b"hello", "es-ES": b"hola"})
+
+    first = client.get(f"/api/jobs/{job.id}/download", headers=auth_headers)
+    second = client.get(f"/api/jobs/{job.id}/download", headers=auth_headers)
+    redirect = first.headers["X-Accel-Redirect"]
+    assert redirect.startswith("/protected-outputs/bundles/job_")
+    assert second.headers["X-Accel-Redirect"] == redirect
+
+    with zipfile.ZipFile(OUTPUT_DIR / redirect.removeprefix("/protected-outputs/")) as z:
+        assert sorted(z.read(n) for n in z.namelist()) == [b"hello", b"hola"]
+
+
+def test_signed_link_downloads_without_the_api_token(client, auth_headers, use_storage):
+    storage = use_storage(LocalStorage(sendfile=""))
+    job = _done_job(storage, {"en-US": b"hello"})
+
+    body = client.get(f"/api/jobs/{job.id}/download?lang=en-US&link=1", headers=auth_headers).get_json()
+    assert body["expires_in"] > 0
+    assert client.get(body["url"]).data == b"hello"
+    assert client.get(body["url"][:-2] + "xx").status_code == 403
+
+
+def test_expired_signed_link_is_refused(app, client, use_storage):
+    storage = use_storage(LocalStorage(sendfile=""))
+    job = _done_job(storage, {"en-US": b"hello"})
+    with app.test_request_context():
+        url = storage.signed_url(job.targets[0].output_path, "doc.txt", "text/plain", ttl=-10)
+    assert client.get(url).status_code == 410
+
+
+def test_delete_job_removes_the_stored_outputs(client, auth_headers, use_storage):
+    storage = use_storage(LocalStorage(sendfile=""))
+    job = _done_job(storage, {"en-US": b"hello", "es-ES": b"hola"})
+    keys = [t.output_path for t in job.targets] + [job.files[0].input_path]
+    db.session.expunge_all()  # a rota apaga com a sessão limpa, como numa requisição real
+
+    resp = client.delete(f"/api/jobs/{job.id}", headers=auth_headers)
+    assert resp.status_code == 200
+    assert not any(storage.exists(k) for k in keys)
+
+
+# ---------- zip em streaming (sem proxy) ----------
+
+
+def _bundles(job_id: int) -> list[Path]:
+    return list(BUNDLE_DIR.glob(f"job_{job_id}_*.zip")) + list(BUNDLE_DIR.glob(".bundle-*"))
+
+
+def _entries(data: bytes) -> dict[str, bytes]:
+    with zipfile.ZipFile(io.BytesIO(data)) as z:
+        assert z.testzip() is None
+        return {n.split("_")[2]: z.read(n) for n in z.namelist()}  # {idioma: bytes}
+
+
+def test_iter_zip_streams_block_by_block(tmp_path, monkeypatch):
+    monkeypatch.setattr(zip_stream, "_CHUNK", 1024)
+    txt = tmp_path / "a.txt"
+    txt.write_bytes(b"linha de texto\n" * 2000)  # 30 KB: DEFLATED
+    docx = tmp_path / "b.docx"
+    with zipfile.ZipFile(docx, "w") as z:  # já é zip: STORED
+        z.writestr("[Content_Types].xml", uuid.uuid4().bytes * 1000)
+
+    chunks = list(zip_stream.iter_zip([(str(txt), "a.txt"), (str(docx), "b.docx")]))
+
+    assert len(chunks) > 10  # sai enquanto lê, não no fim
+    assert max(len(c) for c in chunks[:-1]) <= 2048
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as z:
+        assert {i.filename: i.compress_type for i in z.infolist()} == {
+            "a.txt": zipfile.ZIP_DEFLATED,
+            "b.docx": zipfile.ZIP_STORED,
+        }
+        assert z.read("a.txt") == txt.read_bytes() and z.read("b.docx") == docx.read_bytes()
+
+
+@pytest.mark.parametrize("link", [False, True])
+def test_zip_is_streamed_without_a_bundle_when_the_cache_is_off(client, auth_headers, use_storage, monkeypatch, link):
+    monkeypatch.setattr(jobs_routes, "DOWNLOAD_BUNDLE_CACHE", False)
+    storage = use_storage(LocalStorage(sendfile=""))
+    job = _done_job(storage, {"en-US": b"hello", "es-ES": b"hola"})
+
+    url = f"/api/jobs/{job.id}/download"
+    if link:  # o que o frontend faz: pega o link assinado e baixa sem o token
+        body = client.get(url + "?link=1", headers=auth_headers).get_json()
+        assert body["filename"] == f"job_{job.id}_outputs.zip"
+        resp = client.get(body["url"])
+    else:
+        resp = client.get(url, headers=auth_headers)
+
+    assert resp.status_code == 200 and "Content-Length" not in resp.headers  # gerado enquanto sai
+    assert resp.headers["Content-Disposition"] == f'attachment; filename="job_{job.id}_outputs.zip"'
+    assert _entries(resp.data) == {"en-US": b"hello", "es-ES": b"hola"}
+    assert _bundles(job.id) == []  # nada gravado em outputs/bundles
+
+
+def test_zip_link_uses_the_bundle_cache_when_on(client, auth_headers, use_storage, monkeypatch):
+    monkeypatch.setattr(jobs_routes, "DOWNLOAD_BUNDLE_CACHE", True)
+    storage = use_storage(LocalStorage(sendfile=""))
+    job = _done_job(storage, {"en-US": b"hello", "es-ES": b"hola"})
+    link = client.get(f"/api/jobs/{job.id}/download?link=1", headers=auth_headers).get_json()["url"]
+
+    first = client.get(link)
+    assert "Content-Length" not in first.headers
+    first_data = first.data  # consome o stream: só então o pacote é publicado
+    (cached,) = _bundles(job.id)
+
+    second = client.get(link)  # agora do arquivo (send_file)
+    assert second.headers["Content-Length"] == str(cached.stat().st_size)
+    assert second.data == first_data == cached.read_bytes()
+    assert _entries(second.data) == {"en-US": b"hello", "es-ES": b"hola"}
+
+
+def test_zip_link_fails_cleanly_when_an_output_is_gone(client, auth_headers, use_storage):
+    storage = use_storage(LocalStorage(sendfile=""))
+    job = _done_job(storage, {"en-US": b"hello", "es-ES": b"hola"})
+    link = client.get(f"/api/jobs/{job.id}/download?link=1", headers=auth_headers).get_json()["url"]
+    storage.delete(job.targets[0].output_path)
+
+    assert client.get(link).status_code == 404
+
+
+# ---------- S3 (moto server no lugar do MinIO) ----------
+
+
+@pytest.fixture
+def s3_endpoint(monkeypatch):
+    boto3 = pytest.importorskip("boto3")
+    server_mod = pytest.importorskip("moto.server")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "test")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "test")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = server_mod.ThreadedMotoServer(ip_address="127.0.0.1", port=port, verbose=False)
+    server.start()
+    url = f"http://127.0.0.1:{port}"
+    boto3.client("s3", endpoint_url=url).create_bucket(Bucket="translations")
+    yield url
+    server.stop()
+
+
+@pytest.fixture
+def s3(s3_endpoint):
+    from app.utils.storage import S3Storage
+
+    return S3Storage(bucket="translations", endpoint_url=s3_endpoint, prefix="test/")
+
+
+def test_s3_publish_fetch_release(s3):
+    path = _write(OUTPUT_DIR, "out.txt", b"conteudo")
+    key = s3.publish(path)
+
+    assert key == "test/outputs/" + Path(path).name
+    assert not Path(path).exists()  # o local vira cache; o original está no bucket
+    assert s3.exists(key)
+
+    local = s3.fetch(key)
+    assert Path(local).read_bytes() == b"conteudo"
+    s3.release(local)
+    assert not Path(local).exists()
+
+    assert s3.fetch("test/outputs/nao-existe.txt") is None
+    assert not s3.exists("test/outputs/nao-existe.txt")
+
+
+def test_s3_copy_fingerprint_and_delete(s3):
+    key = s3.publish(_write(OUTPUT_DIR, "a.txt", b"a"))
+    copy = s3.copy(key, str(OUTPUT_DIR / "copia_a.txt"))
+    assert s3.exists(copy)
+    assert s3.fingerprint(copy) == s3.fingerprint(key)
+
+    s3.publish(_write(OUTPUT_DIR, "b.txt", b"b"))
+    assert s3.delete_prefix(str(OUTPUT_DIR / "copia_")) == 1
+    assert not s3.exists(copy)
+    assert s3.delete(key) and not s3.exists(key)
+
+
+def test_s3_uploads_are_content_addressed(s3):
+    path = _write(UPLOAD_DIR, "blob.txt", b"blob")
+    key = s3.publish(path)
+    # mesmo nome em uploads/ = mesmo conteúdo: não sobe de novo
+    Path(path).write_bytes(b"outro conteudo")
+    assert s3.publish(path) == key
+    local = s3.fetch(key)
+    assert Path(local).read_bytes() == b"blob"
+    s3.release(local)
+
+
+def test_s3_download_is_a_presigned_redirect(client, auth_headers, use_storage, s3):
+    use_storage(s3)
+    job = _done_job(s3, {"en-US": b"hello", "es-ES": b"hola"})
+
+    resp = client.get(f"/api/jobs/{job.id}/download?lang=es-ES", headers=auth_headers)
+    assert resp.status_code == 302
+    direct = requests.get(resp.headers["Location"], timeout=10)
+    assert direct.content == b"hola"
+    assert "attachment" in direct.headers["Content-Disposition"]
+
+    # vários destinos: o .zip é gerado uma vez, publicado no bucket e baixado de lá
+    resp = client.get(f"/api/jobs/{job.id}/download", headers=auth_headers)
+    assert resp.status_code == 302
+    bundle = requests.get(resp.headers["Location"], timeout=10).content
+    with zipfile.ZipFile(io.BytesIO(bundle)) as z:
+        assert sorted(z.read(n) for n in z.namelist()) == [b"hello", b"hola"]
+
+    # o link assinado do S3 não passa pela rota local
+    assert client.get("/api/jobs/files/qualquer").status_code == 404
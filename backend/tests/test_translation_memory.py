@@ -0,0 +1,105 @@
+import pytest
+
+from app.extensions import db
+from app.models import TranslationMemoryEntry
+from app.utils import translation_memory, translator
+from app.utils.translation_memory import _LRU, TranslationMemory, segment_hash, with_outer_whitespace
+from app.utils.translator import translate_text
+
+KEY = ("deepl", "", "pt-BR", "en-US")
+
+
+@pytest.fixture(autouse=True)
+def empty_lru():
+    """O LRU é do processo: cada teste começa e termina sem nada nele."""
+    translation_memory._lru._data.clear()
+    yield
+    translation_memory._lru._data.clear()
+
+
+def test_key_ignores_spacing_variations():
+    assert segment_hash("o  contrato\n social") == segment_hash(" o contrato social ")
+    assert segment_hash("o contrato") != segment_hash("o contrato social")
+
+
+def test_hit_keeps_the_outer_whitespace_of_the_requested_segment():
+    tm = TranslationMemory()
+    tm.put_many(*KEY, [("o contrato", "the contract")])
+
+    found = tm.get_many(*KEY, [" o contrato", "o  contrato\t", "o contrato"])
+    assert found == {0: " the contract", 1: "the contract\t", 2: "the contract"}
+
+
+def test_with_outer_whitespace():
+    assert with_outer_whitespace("  a \n", " b") == "  b \n"
+    assert with_outer_whitespace("a", "  b  ") == "b"
+    assert with_outer_whitespace("   ", "x") == "x"  # origem só de espaços: nada a copiar
+
+
+def test_lru_evicts_the_least_recently_used():
+    lru = _LRU(2)
+    lru.put("a", "1")
+    lru.put("b", "2")
+    assert lru.get("a") == "1"  # "a" passa a ser o mais recente
+    lru.put("c", "3")
+    assert (lru.get("a"), lru.get("b"), lru.get("c")) == ("1", None, "3")
+
+
+def test_identity_and_empty_translations_are_not_stored():
+    tm = TranslationMemory()
+    tm.put_many(*KEY, [("Contrato", "Contrato"), ("  ", "x"), ("multa", "fine")])
+    assert tm.get_many(*KEY, ["Contrato", "  ", "multa"]) == {2: "fine"}
+
+
+def test_misses_fall_back_to_the_database_and_warm_the_lru(app):
+    db.session.add(
+        TranslationMemoryEntry(
+            provider="deepl",
+            model="",
+            source_lang="pt-BR",
+            target_lang="en-US",
+            segment_hash=segment_hash("cláusula penal"),
+            source_text="cláusula penal",
+            target_text="penalty clause",
+        )
+    )
+    db.session.commit()
+    tm = TranslationMemory(db.engine)
+
+    assert tm.get_many(*KEY, ["cláusula penal ", "outro"]) == {0: "penalty clause "}
+    # segundo acesso vem do LRU, sem banco
+    assert TranslationMemory().get_many(*KEY, ["cláusula penal"]) == {0: "penalty clause"}
+    # outro par de idiomas não casa
+    assert tm.get_many("deepl", "", "pt-BR", "es-ES", ["cláusula penal"]) == {}
+
+
+def test_put_many_persists_and_ignores_conflicts(pg_app):
+    tm = TranslationMemory(db.engine)
+    tm.put_many(*KEY, [("prazo", "deadline")])
+    tm.put_many(*KEY, [("prazo", "term")])  # a chave já existe: fica a primeira
+
+    translation_memory._lru._data.clear()
+    assert tm.get_many(*KEY, ["prazo"]) == {0: "deadline"}
+    assert db.session.query(TranslationMemoryEntry).count() == 1
+
+
+def test_duplicates_in_a_batch_are_sent_once_and_keep_their_spacing(monkeypatch):
+    sent = []
+
+    def provider(texts, *args):
+        sent.extend(texts)
+        return "deepl", [t.upper() for t in texts]
+
+    monkeypatch.setattr(translator, "PROVIDER", "deepl")
+    monkeypatch.setattr(translator, "_translate_provider", provider)
+    stats = {}
+
+    out = translate_text(["multa", " multa ", "prazo"], "pt-BR", "en-US", memory=TranslationMemory(), stats=stats)
+    assert sent == ["multa", "prazo"]
+    assert out == ["MULTA", " MULTA ", "PRAZO"]
+
+    # agora tudo vem da TM
+    out = translate_text(["\tmulta", "prazo "], "pt-BR", "en-US", memory=TranslationMemory(), stats=stats)
+    assert out == ["\tMULTA", "PRAZO "]
+    assert sent == ["multa", "prazo"]
+    assert (stats["tm_hits"], stats["tm_misses"]) == (2, 3)
@@ -0,0 +1,107 @@
+import hashlib
+import io
+import zipfile
+
+import docx
+import pytest
+
+from app.extensions import db
+from app.models import Job, JobFile
+from app.paths import UPLOAD_DIR
+from app.utils import uploads
+from app.utils.content_store import blob_path
+
+
+def _post(client, auth_headers, filename: str, payload: bytes):
+    data = {"file": (io.BytesIO(payload), filename), "source_lang": "pt-BR", "target_langs": ["en-US"]}
+    return client.post("/api/jobs/", data=data, headers=auth_headers, content_type="multipart/form-data")
+
+
+def _docx_bytes() -> bytes:
+    buf = io.BytesIO()
+    d = docx.Document()
+    d.add_paragraph("Contrato de locação.")
+    d.save(buf)
+    return buf.getvalue()
+
+
+def _zip(members: dict[str, bytes]) -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as z:
+        for name, data in members.items():
+            z.writestr(name, data)
+    return buf.getvalue()
+
+
+@pytest.fixture
+def no_leftovers(app):
+    """Nenhum upload recusado pode deixar temporário nem job para trás."""
+    yield
+    assert not list(UPLOAD_DIR.glob(".upload-*"))
+    assert db.session.query(Job).count() == 0
+
+
+def test_content_hash_is_the_sha256_of_the_payload(client, auth_headers):
+    payload = _docx_bytes()
+    resp = _post(client, auth_headers, "contrato.docx", payload)
+    assert resp.status_code == 202
+
+    jf = db.session.query(JobFile).one()
+    assert jf.content_hash == hashlib.sha256(payload).hexdigest()
+    blob = blob_path(jf.content_hash, ".docx")
+    assert blob.read_bytes() == payload
+
+    # o mesmo arquivo de novo: mesmo blob, nada duplicado
+    assert _post(client, auth_headers, "copia.docx", payload).status_code == 202
+    assert {f.input_path for f in db.session.query(JobFile)} == {jf.input_path}
+    assert not list(UPLOAD_DIR.glob(".upload-*"))
+
+
+@pytest.mark.parametrize(
+    "filename, payload",
+    [
+        ("contrato.docx", b"%PDF-1.7\n" + b"x" * 10_000),  # PDF renomeado
+        ("contrato.docx", b"PK"),  # curto demais para ser um zip
+        ("planilha.xlsx", b"PK\x03\x04" + b"\x00" * 100),  # cabeçalho de zip sem diretório central
+        ("contrato.docx", _zip({"word/document.xml": b"<w:document/>"})),  # zip, mas não Office
+        ("termos.xlf", b"\xef\xbb\xbf  not xml"),
+        ("notas.txt", b"texto\x00binario"),
+        ("contrato.pdf", b"%PDF-1.7"),
+    ],
+)
+def test_content_that_does_not_match_the_extension_is_a_415(client, auth_headers, no_leftovers, filename, payload):
+    resp = _post(client, auth_headers, filename, payload)
+    assert resp.status_code == 415, resp.get_json()
+
+
+def test_zip_bomb_is_rejected_before_parsing(client, auth_headers, no_leftovers, monkeypatch):
+    monkeypatch.setattr(uploads, "UPLOAD_MAX_UNCOMPRESSED", 1024 * 1024)
+    bomb = _zip({"[Content_Types].xml": b"<Types/>", "word/document.xml": b"\x00" * (4 * 1024 * 1024)})
+    assert len(bomb) < 10_000  # 4 MiB descompactados em poucos KB
+
+    resp = _post(client, auth_headers, "contrato.docx", bomb)
+
+    assert resp.status_code == 415
+    assert "descompactado" in resp.get_json()["error"]
+
+
+def test_zip_with_too_many_entries_is_rejected(client, auth_headers, no_leftovers, monkeypatch):
+    monkeypatch.setattr(uploads, "UPLOAD_MAX_ZIP_ENTRIES", 10)
+    members = {"[Content_Types].xml": b"<Types/>", **{f"word/media/{i}.bin": b"" for i in range(20)}}
+    resp = _post(client, auth_headers, "contrato.docx", _zip(members))
+    assert resp.status_code == 415
+    assert "entradas" in resp.get_json()["error"]
+
+
+def test_oversized_body_is_a_413(app, client, auth_headers, no_leftovers):
+    app.config["MAX_CONTENT_LENGTH"] = 64 * 1024
+    payload = _docx_bytes() + b"\x00" * (128 * 1024)  # zip válido com lixo no fim: só o tamanho importa
+    resp = _post(client, auth_headers, "contrato.docx", payload)
+    assert resp.status_code == 413
+    assert "limite" in resp.get_json()["error"]
+
+
+def test_empty_file_and_non_multipart_are_a_400(client, auth_headers, no_leftovers):
+    assert _post(client, auth_headers, "contrato.docx", b"").status_code == 400
+    resp = client.post("/api/jobs/", data=_docx_bytes(), headers=auth_headers, content_type="application/octet-stream")
+    assert resp.status_code == 400
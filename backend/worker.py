@@ -0,0 +1,7 @@
+import logging
+
+from app.utils.job_queue import serve
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(processName)s %(levelname)s %(message)s")
+    serve()
@@ -96,4 +96,42 @@ api.interceptors.response.use(
   }
 );
 
+// -------- Server-Sent Events (progresso de jobs) --------
+// EventSource não envia Authorization; usamos fetch + leitura do stream.
+export async function streamJobEvents(jobId, onEvent, { signal } = {}) {
+  const t = getToken();
+  const res = await fetch(`${BASE_URL}/jobs/${jobId}/events`, {
+    headers: {
+      Accept: "text/event-stream",
+      ...(t ? { Authorization: `Bearer ${t}` } : {}),
+    },
+    signal,
+  });
+  if (!res.ok || !res.body) {
+    throw new Error(`SSE HTTP ${res.status}`);
+  }
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buf = "";
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) return;
+    buf += decoder.decode(value, { stream: true });
+
+    let idx;
+    while ((idx = buf.indexOf("\n\n")) >= 0) {
+      const chunk = buf.slice(0, idx);
+      buf = buf.slice(idx + 2);
+      let event = "message";
+      let data = "";
+      for (const line of chunk.split("\n")) {
+        if (line.startsWith("event:")) event = line.slice(6).trim();
+        else if (line.startsWith("data:")) data += line.slice(5).trim();
+      }
+      if (data) onEvent(event, JSON.parse(data));
+    }
+  }
+}
+
 export default api;
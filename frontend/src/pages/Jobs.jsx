@@ -1,6 +1,6 @@
 // frontend/src/pages/Jobs.jsx
 import { useEffect, useMemo, useRef, useState } from "react";
-import api from "@/lib/api";
+import api, { streamJobEvents } from "@/lib/api";
 import { useTranslation } from "react-i18next";
 import {
   LANG_OPTIONS_SORTED as LANG_OPTIONS,
@@ -267,7 +267,53 @@ export default function Jobs() {
     setTargetLangs((langs) => langs.filter((t) => t !== sourceLang));
   }, [sourceLang]);
 
-  /* Poll fino para 1 job específico até concluir */
+  /* Aviso de término de um job */
+  const notifyJobFinished = (jobId, targets) => {
+    const done = targets.filter((t) => t.status === "done").length;
+    const failed = targets.filter((t) => t.status === "failed").length;
+    showToast(
+      t("toast.jobFinished", { id: jobId, done, failed }),
+      failed ? "info" : "success"
+    );
+  };
+
+  /* Acompanha 1 job via SSE (/jobs/<id>/events); cai para polling se falhar */
+  const watchJob = async (jobId) => {
+    let finished = false;
+    try {
+      await streamJobEvents(jobId, (event, data) => {
+        if (event === "progress") {
+          // atualiza o progresso do destino na tabela, sem ir ao servidor
+          setItems((list) =>
+            list.map((j) =>
+              j.id !== jobId
+                ? j
+                : {
+                    ...j,
+                    targets: (j.targets || []).map((tg) =>
+                      tg.id === data.id ? { ...tg, progress: data } : tg
+                    ),
+                  }
+            )
+          );
+          return;
+        }
+        if (
+          event === "job" &&
+          ["done", "failed", "mixed"].includes(data.status)
+        ) {
+          finished = true;
+          fetchJobs();
+          notifyJobFinished(jobId, data.targets || []);
+        }
+      });
+    } catch (e) {
+      console.error("SSE falhou, usando polling:", e);
+    }
+    if (!finished) await pollJobUntilDone(jobId);
+  };
+
+  /* Poll fino para 1 job específico até concluir (fallback do SSE) */
   const pollJobUntilDone = async (
     jobId,
     { maxTries = 60, intervalMs = 1000 } = {}
@@ -289,16 +335,7 @@ export default function Jobs() {
           (!anyRunning && ["mixed", "failed"].includes(data.status));
 
         if (jobDone) {
-          const done = targets.filter(
-            (t) => t.status === "done"
-          ).length;
-          const failed = targets.filter(
-            (t) => t.status === "failed"
-          ).length;
-          showToast(
-            t("toast.jobFinished", { id: jobId, done, failed }),
-            failed ? "info" : "success"
-          );
+          notifyJobFinished(jobId, targets);
           return;
         }
       } catch (e) {
@@ -359,10 +396,10 @@ export default function Jobs() {
       setPage(1);
       await fetchJobs();
 
-      // Poll fino do job criado
+      // Acompanha o job criado (SSE, com fallback para polling)
       const newJobId = data?.id;
       if (newJobId) {
-        pollJobUntilDone(newJobId);
+        watchJob(newJobId);
       }
     } catch (e) {
       console.error("Falha ao criar job:", e);
@@ -377,24 +414,26 @@ export default function Jobs() {
     }
   };
 
+  /* Baixa por link assinado: o navegador busca o arquivo direto (proxy/bucket) */
+  const openDownloadLink = (url, filename) => {
+    const base = /^https?:/.test(api.defaults.baseURL || "")
+      ? api.defaults.baseURL
+      : window.location.origin;
+    const a = document.createElement("a");
+    a.href = new URL(url, base).toString();
+    a.download = filename;
+    document.body.appendChild(a);
+    a.click();
+    a.remove();
+  };
+
   /* Download (todos os destinos -> zip OU único destino) */
   const onDownload = async (job) => {
-    const targets = job.targets || job.destinos || [];
     try {
       const { data } = await api.get(`${JOBS}${job.id}/download`, {
-        responseType: "blob",
+        params: { link: 1 },
       });
-      const blobUrl = window.URL.createObjectURL(data);
-      const a = document.createElement("a");
-      a.href = blobUrl;
-      a.download =
-        targets.length > 1
-          ? `job_${job.id}_outputs.zip`
-          : job.title || `output_${job.id}.docx`;
-      document.body.appendChild(a);
-      a.click();
-      a.remove();
-      window.URL.revokeObjectURL(blobUrl);
+      openDownloadLink(data.url, data.filename);
     } catch (e) {
       console.error("Falha no download:", e);
       alert(
@@ -409,22 +448,16 @@ export default function Jobs() {
   /* Download por idioma */
   const onDownloadLang = async (job, lang) => {
     try {
-      const { data } = await api.get(
-        `${JOBS}${job.id}/download`,
-        {
-          params: { lang },
-          responseType: "blob",
-        }
-      );
-      const url = window.URL.createObjectURL(data);
-      const a = document.createElement("a");
+      const { data } = await api.get(`${JOBS}${job.id}/download`, {
+        params: { lang, link: 1 },
+      });
       const base = job.title || `output_${job.id}.docx`;
-      a.href = url;
-      a.download = base.replace(/\.docx$/i, `_${lang}.docx`);
-      document.body.appendChild(a);
-      a.click();
-      a.remove();
-      window.URL.revokeObjectURL(url);
+      openDownloadLink(
+        data.url,
+        /\.[^.]+$/.test(base)
+          ? base.replace(/(\.[^.]+)$/, `_${lang}$1`)
+          : `${base}_${lang}`
+      );
     } catch (e) {
       console.error(e);
       alert(
@@ -507,7 +540,7 @@ export default function Jobs() {
             <input
               ref={fileRef}
               type="file"
-              accept=".docx,application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+              accept=".docx,.xlsx,.pptx,.txt,.xlf,.xliff"
               onChange={(e) =>
                 setFile(e.target.files?.[0] || null)
               }